@@ -1,20 +1,66 @@
+import hmac
+import importlib
+import os
 import streamlit as st
 from sidebar import show_sidebar
-from my_pages import availability, tracker_bbm, dapot
+from utils.datasets import start_dataset_warmup, start_dataset_watcher
+from utils.kpi import show_kpi_strip
+from utils.perf import start_metrics_exporter, timer
+
+# Page modules are imported only when their page is selected, so a cold start
+# doesn't load plotly, the Google API clients, etc. for pages nobody opened.
+# Run `python -m utils.import_report` to see what each page costs to import.
+PAGES = {
+    "📅 CDC Availability": "my_pages.availability",
+    "⛽ Tracker Pengisian BBM": "my_pages.tracker_bbm",
+    "🏗️ Dapot Asset CDC": "my_pages.dapot",
+    "🛰️ Site 360": "my_pages.site360",
+}
+
+# Hidden pages, opened with ?admin=<page>&key=<admin key> and not listed in the sidebar
+ADMIN_PAGES = {
+    "perf": "my_pages.perf_admin",
+}
+# The admin key comes from this environment variable or ADMIN_KEY in .streamlit/secrets.toml;
+# without one the admin pages are disabled
+ADMIN_KEY_ENV = "CDCDASH_ADMIN_KEY"
+
+def admin_page_module():
+    """Module of the admin page requested in the URL, or None unless the URL carries the admin key."""
+    page_module = ADMIN_PAGES.get(st.query_params.get("admin"))
+    if not page_module:
+        return None
+    admin_key = os.environ.get(ADMIN_KEY_ENV)
+    if not admin_key:
+        try:
+            admin_key = st.secrets.get("ADMIN_KEY")
+        except FileNotFoundError:
+            admin_key = None
+    given_key = st.query_params.get("key", "")
+    if admin_key and hmac.compare_digest(given_key.encode(), str(admin_key).encode()):
+        return page_module
+    return None
 
 # Set page config
 st.set_page_config(page_title="Dashboard CDC", layout="wide")
 
+# Reload data files that change on disk, and preload all datasets in the background,
+# once per server process
+start_dataset_watcher()
+start_dataset_warmup()
+start_metrics_exporter()
+
 # Title
 st.title("📊 Dashboard CDC")
 
+# Area / Regional KPI header (shown once the warm-up has built the rollups)
+show_kpi_strip()
+
 # Show sidebar and get selected page
 selected_page = show_sidebar()
 
-# Load selected page
-if selected_page == "📅 CDC Availability":
-    availability.show()
-elif selected_page == "⛽ Tracker Pengisian BBM":
-    tracker_bbm.show()
-elif selected_page == "🏗️ Dapot Asset CDC":
-    dapot.show()
\ No newline at end of file
+# Load selected page (or a hidden admin page)
+page_module = admin_page_module() or PAGES.get(selected_page)
+if page_module:
+    with timer(f"page.{page_module.split('.')[-1]}", kind="page"):
+        importlib.import_module(page_module).show()
\ No newline at end of file
@@ -0,0 +1,305 @@
+# --- bench/fakes.py ---
+"""
+Stand-ins for the Google Sheets (gspread) and Drive clients.
+
+install_fake_google() patches utils.sheets_utils.get_gspread_client and
+utils.drive_utils.get_drive_service, so loaders and pages run unchanged without
+credentials. By default the fakes live in-process; with server_url they are
+HTTP clients of a FakeGoogleServer, so every call is a real blocking round-trip
+to another process. An optional per-call latency imitates the network.
+"""
+import itertools
+import json
+import threading
+import time
+import urllib.parse
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+
+class FakeWorksheet:
+    def __init__(self, df, latency=0.0):
+        self._lock = threading.Lock()
+        self._header = list(df.columns)
+        self._rows = df.astype(object).where(df.notna(), "").values.tolist()
+        self.latency = latency
+
+    def _wait(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+    def get_all_records(self):
+        self._wait()
+        with self._lock:
+            return [dict(zip(self._header, row)) for row in self._rows]
+
+    def row_values(self, row):
+        self._wait()
+        with self._lock:
+            if row == 1:
+                return list(self._header)
+            # Rows past the last one are empty, as in gspread
+            return list(self._rows[row - 2]) if 2 <= row < len(self._rows) + 2 else []
+
+    def append_row(self, values, value_input_option=None):
+        self._wait()
+        with self._lock:
+            self._rows.append(list(values) + [""] * (len(self._header) - len(values)))
+
+    def __len__(self):
+        return len(self._rows)
+
+class FakeSpreadsheet:
+    def __init__(self, worksheets, latency=0.0):
+        self._worksheets = worksheets
+        self.latency = latency
+
+    def worksheet(self, name):
+        if self.latency:
+            time.sleep(self.latency)
+        return self._worksheets[name]
+
+class FakeGspreadClient:
+    """Subset of gspread.Client used by utils.sheets_utils."""
+
+    def __init__(self, spreadsheets, latency=0.0):
+        self._spreadsheets = spreadsheets
+        self.latency = latency
+
+    def open_by_key(self, key):
+        if self.latency:
+            time.sleep(self.latency)
+        return self._spreadsheets[key]
+
+class _FakeRequest:
+    def __init__(self, fn, latency):
+        self._fn = fn
+        self._latency = latency
+
+    def execute(self):
+        if self._latency:
+            time.sleep(self._latency)
+        return self._fn()
+
+class FakeDriveService:
+    """Subset of the Drive v3 service used by utils.drive_utils; uploads are kept in memory."""
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.files_created = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def files(self):
+        return self
+
+    def permissions(self):
+        return self
+
+    def create(self, body=None, media_body=None, fields=None, fileId=None):
+        def run():
+            if fileId is not None:  # permissions().create
+                return {"id": f"perm-{fileId}"}
+            data = media_body.getbytes(0, media_body.size()) if media_body is not None else b""
+            with self._lock:
+                file_id = f"fake-{next(self._ids)}"
+                self.files_created[file_id] = (body.get("name"), len(data))
+            return {
+                "id": file_id,
+                "webContentLink": f"https://drive.example/{file_id}?export=download",
+                "webViewLink": f"https://drive.example/{file_id}/view",
+            }
+        return _FakeRequest(run, self.latency)
+
+class FakeGoogleServer:
+    """
+    Local HTTP server holding one fake refill worksheet and the uploaded photos.
+
+    Requests are served on their own threads after sleeping `latency` seconds.
+    in_flight_peak records how many API calls were waiting at the same time.
+
+        GET  /sheets/<key>/<worksheet>/records
+        GET  /sheets/<key>/<worksheet>/rows/<n>      values of row n (1 is the header)
+        POST /sheets/<key>/<worksheet>/rows          JSON list of values
+        POST /drive/files?name=<file name>           file bytes
+        POST /drive/files/<file id>/permissions
+    """
+
+    def __init__(self, refills, latency=0.0, host="127.0.0.1", port=0):
+        from utils.data_loader import BBM_SHEET_ID, BBM_WORKSHEET_NAME
+
+        if isinstance(refills, str):
+            refills = pd.read_csv(refills)
+        self.worksheets = {(BBM_SHEET_ID, BBM_WORKSHEET_NAME): FakeWorksheet(refills)}
+        self.drive = FakeDriveService()
+        self.latency = latency
+        self.requests = 0
+        self.in_flight = 0
+        self.in_flight_peak = 0
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="fake-google", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _reply(self, payload, status=200):
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _handle(self, method):
+                with server._lock:
+                    server.requests += 1
+                    server.in_flight += 1
+                    server.in_flight_peak = max(server.in_flight_peak, server.in_flight)
+                try:
+                    if server.latency:
+                        time.sleep(server.latency)
+                    url = urllib.parse.urlsplit(self.path)
+                    parts = [urllib.parse.unquote(part) for part in url.path.strip("/").split("/")]
+                    body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                    self._reply(*server.route(method, parts, urllib.parse.parse_qs(url.query), body))
+                finally:
+                    with server._lock:
+                        server.in_flight -= 1
+
+            def do_GET(self):
+                self._handle("GET")
+
+            def do_POST(self):
+                self._handle("POST")
+
+        return Handler
+
+    def route(self, method, parts, query, body):
+        """(payload, status) for one request."""
+        if parts[0] == "sheets" and len(parts) == 5 and method == "GET" and parts[3] == "rows":
+            worksheet = self.worksheets.get((parts[1], parts[2]))
+            if worksheet is None:
+                return {"error": "worksheet not found"}, 404
+            try:
+                return worksheet.row_values(int(parts[4])), 200
+            except ValueError:
+                return {"error": "row must be a number"}, 400
+        if parts[0] == "sheets" and len(parts) == 4:
+            worksheet = self.worksheets.get((parts[1], parts[2]))
+            if worksheet is None:
+                return {"error": "worksheet not found"}, 404
+            if method == "GET" and parts[3] == "records":
+                return worksheet.get_all_records(), 200
+            if method == "POST" and parts[3] == "rows":
+                worksheet.append_row(json.loads(body))
+                return {}, 200
+        if parts[0] == "drive" and method == "POST":
+            if len(parts) == 2:
+                with self.drive._lock:
+                    file_id = f"fake-{next(self.drive._ids)}"
+                    self.drive.files_created[file_id] = (query.get("name", [""])[0], len(body))
+                return {"id": file_id, "webContentLink": f"https://drive.example/{file_id}?export=download"}, 200
+            if len(parts) == 4 and parts[3] == "permissions":
+                return {"id": f"perm-{parts[2]}"}, 200
+        return {"error": "not found"}, 404
+
+def _http(method, url, payload=None, data=None, content_type="application/json"):
+    if payload is not None:
+        data = json.dumps(payload).encode("utf-8")
+    request = urllib.request.Request(url, data=data, method=method, headers={"Content-Type": content_type})
+    with urllib.request.urlopen(request) as response:
+        return json.loads(response.read())
+
+class HttpWorksheet:
+    def __init__(self, url):
+        self.url = url
+
+    def get_all_records(self):
+        return _http("GET", f"{self.url}/records")
+
+    def row_values(self, row):
+        return _http("GET", f"{self.url}/rows/{int(row)}")
+
+    def append_row(self, values, value_input_option=None):
+        _http("POST", f"{self.url}/rows", payload=list(values))
+
+class HttpSpreadsheet:
+    def __init__(self, url):
+        self.url = url
+
+    def worksheet(self, name):
+        return HttpWorksheet(f"{self.url}/{urllib.parse.quote(name)}")
+
+class HttpGspreadClient:
+    """gspread.Client subset backed by a FakeGoogleServer."""
+
+    def __init__(self, server_url):
+        self.server_url = server_url
+
+    def open_by_key(self, key):
+        return HttpSpreadsheet(f"{self.server_url}/sheets/{urllib.parse.quote(key)}")
+
+class HttpDriveService(FakeDriveService):
+    """Drive service subset backed by a FakeGoogleServer."""
+
+    def __init__(self, server_url):
+        super().__init__()
+        self.server_url = server_url
+
+    def create(self, body=None, media_body=None, fields=None, fileId=None):
+        if fileId is not None:
+            url = f"{self.server_url}/drive/files/{urllib.parse.quote(fileId)}/permissions"
+            return _FakeRequest(lambda: _http("POST", url, payload={}), 0)
+        data = media_body.getbytes(0, media_body.size()) if media_body is not None else b""
+        url = f"{self.server_url}/drive/files?name={urllib.parse.quote(body.get('name', ''))}"
+        return _FakeRequest(lambda: _http("POST", url, data=data, content_type="application/octet-stream"), 0)
+
+def install_fake_google(refills=None, latency=0.0, server_url=None):
+    """
+    Route Sheets and Drive calls to fakes.
+
+    Args:
+        refills: DataFrame (or CSV path) served as the BBM refill worksheet (in-process fakes)
+        latency: Seconds slept per API call (in-process fakes)
+        server_url: URL of a running FakeGoogleServer; used instead of the in-process fakes
+
+    Returns:
+        (gspread client, Drive service)
+    """
+    import utils.drive_utils as drive_utils
+    import utils.sheets_utils as sheets_utils
+    from utils.data_loader import BBM_SHEET_ID, BBM_WORKSHEET_NAME
+
+    if server_url:
+        client, drive = HttpGspreadClient(server_url), HttpDriveService(server_url)
+    else:
+        if isinstance(refills, str):
+            refills = pd.read_csv(refills)
+        worksheet = FakeWorksheet(refills, latency)
+        client = FakeGspreadClient({BBM_SHEET_ID: FakeSpreadsheet({BBM_WORKSHEET_NAME: worksheet}, latency)}, latency)
+        drive = FakeDriveService(latency)
+
+    sheets_utils.get_gspread_client = lambda: client
+    drive_utils.get_drive_service = lambda: drive
+    return client, drive
@@ -0,0 +1,388 @@
+# --- bench/loadtest.py ---
+"""
+Concurrent-session load test.
+
+Starts `streamlit run bench/loadtest_app.py` on synthetic data, with Google
+Sheets/Drive served by a local FakeGoogleServer (so every API call is a blocking
+HTTP round-trip with configurable latency). Then N simulated users connect over
+Streamlit's websocket protocol and click through pages, sections, filters and
+searches with think time in between, like regional users in a browser.
+
+Reported: latency percentiles per action, errors, peak RSS, thread count, CPU
+and the peak number of Google API calls waiting at the same time.
+
+    python -m bench.loadtest --sessions 20 --actions 15 --latency 0.3
+    python -m bench.loadtest --scale 10 --sessions 50 --json loadtest.json
+
+Needs the `websockets` package (pip install -r bench/requirements.txt).
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+
+import numpy as np
+import pandas as pd
+
+from bench.fakes import FakeGoogleServer
+from bench.run_benchmarks import DEFAULT_DATA_ROOT, REPO_ROOT
+from bench.synthetic_data import generate
+
+ENTRY_SCRIPT = os.path.join(REPO_ROOT, "bench", "loadtest_app.py")
+LOADING_MARKER = "⏳"  # shown by utils.datasets.show_loading_state
+WIDGET_KINDS = {"button", "radio", "selectbox", "text_input"}  # widgets the simulated users operate
+
+# Relative weight of each simulated user action
+ACTION_WEIGHTS = {
+    "navigate": 2,
+    "section": 3,
+    "filter": 4,
+    "search": 2,
+    "clear_cache": 0.2,  # "Clear cache": drops every st.cache_resource entry (datasets, background threads) for everyone
+}
+
+class Widget:
+    __slots__ = ("kind", "id", "label", "options", "fragment_id", "in_sidebar")
+
+    def __init__(self, kind, proto, fragment_id, in_sidebar):
+        self.kind = kind
+        self.id = proto.id
+        self.label = proto.label
+        self.options = list(getattr(proto, "options", []))
+        self.fragment_id = fragment_id
+        self.in_sidebar = in_sidebar
+
+class StreamlitSession:
+    """One simulated browser tab talking to the server over /_stcore/stream."""
+
+    def __init__(self, ws, timeout, site_ids=()):
+        self.ws = ws
+        self.timeout = timeout
+        self.site_ids = list(site_ids)
+        self.widgets = {}  # (kind, label) -> Widget, as rendered by the last run
+        self.values = {}  # widget id -> WidgetState sent with every rerun
+        self.alerts = []
+        self.exceptions = []
+
+    def _widget_state(self, widget, value=None, trigger=False):
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+        state = WidgetState(id=widget.id)
+        if trigger:
+            state.trigger_value = True
+        else:
+            state.string_value = value
+        return state
+
+    def rerun(self, trigger=None, fragment_id=""):
+        """
+        Send a rerun and read until the run finishes.
+
+        Returns:
+            (seconds, bytes received)
+        """
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        msg = BackMsg()
+        msg.rerun_script.fragment_id = fragment_id
+        msg.rerun_script.widget_states.widgets.extend(list(self.values.values()) + ([trigger] if trigger else []))
+
+        if not fragment_id:
+            self.widgets = {}
+        self.alerts, self.exceptions = [], []
+
+        start = time.perf_counter()
+        self.ws.send(msg.SerializeToString())
+        received = 0
+        while True:
+            data = self.ws.recv(timeout=self.timeout)
+            received += len(data)
+            forward = ForwardMsg()
+            forward.ParseFromString(data)
+            kind = forward.WhichOneof("type")
+
+            if kind == "delta" and forward.delta.WhichOneof("type") == "new_element":
+                element = forward.delta.new_element
+                element_type = element.WhichOneof("type")
+                proto = getattr(element, element_type)
+                if element_type == "alert":
+                    self.alerts.append(proto.body)
+                elif element_type == "exception":
+                    self.exceptions.append(proto.message)
+                elif element_type in WIDGET_KINDS:
+                    in_sidebar = forward.metadata.delta_path[0] == 1
+                    widget = Widget(element_type, proto, forward.delta.fragment_id, in_sidebar)
+                    self.widgets[(element_type, widget.label)] = widget
+
+            elif kind == "script_finished" and forward.script_finished != ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                return time.perf_counter() - start, received
+
+    def clear_cache(self):
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+
+        self.ws.send(BackMsg(clear_cache=True).SerializeToString())
+
+    def find(self, kind, sidebar=None):
+        return [w for w in self.widgets.values() if w.kind == kind and (sidebar is None or w.in_sidebar == sidebar)]
+
+    def click(self, widget):
+        return self.rerun(trigger=self._widget_state(widget, trigger=True), fragment_id=widget.fragment_id)
+
+    def set_value(self, widget, value):
+        self.values[widget.id] = self._widget_state(widget, value)
+        return self.rerun(fragment_id=widget.fragment_id)
+
+    @property
+    def loading(self):
+        return any(LOADING_MARKER in alert for alert in self.alerts)
+
+def pick_action(session, rng):
+    """(action name, callable) for the next user step, from what is on screen."""
+    site_ids = session.site_ids
+    choices = {
+        "navigate": session.find("button", sidebar=True),
+        "section": [w for w in session.find("radio", sidebar=False) if w.label == "Section"],
+        "filter": [w for w in session.find("selectbox", sidebar=False) if w.options],
+        "search": [w for w in session.find("text_input", sidebar=False) if "search" in w.label.lower()],
+        "clear_cache": [None],
+    }
+    names = [name for name, widgets in choices.items() if widgets]
+    name = rng.choices(names, weights=[ACTION_WEIGHTS[n] for n in names])[0]
+    widget = rng.choice(choices[name])
+
+    if name == "navigate":
+        return name, lambda: session.click(widget)
+    if name == "section":
+        return name, lambda: session.set_value(widget, rng.choice(widget.options))
+    if name == "filter":
+        return name, lambda: session.set_value(widget, rng.choice(widget.options))
+    if name == "search":
+        query = rng.choice(site_ids)[:rng.randint(2, 5)] if site_ids else ""
+        return name, lambda: session.set_value(widget, query)
+
+    def clear_and_rerun():
+        session.clear_cache()
+        return session.rerun()
+    return name, clear_and_rerun
+
+def run_user(url, user_id, n_actions, think_time, site_ids, results, timeout, seed):
+    from websockets.sync.client import connect
+
+    rng = random.Random(seed + user_id)
+    try:
+        with connect(url, subprotocols=["streamlit"], max_size=None, open_timeout=timeout) as ws:
+            session = StreamlitSession(ws, timeout, site_ids)
+            started = time.monotonic()
+            seconds, received = session.rerun()
+            results.append((user_id, "open", seconds, received, len(session.exceptions), started))
+
+            for _ in range(n_actions):
+                time.sleep(think_time * rng.uniform(0.5, 1.5))
+                name, action = pick_action(session, rng)
+                started = time.monotonic()
+                seconds, received = action()
+                results.append((user_id, name, seconds, received, len(session.exceptions), started))
+    except Exception as e:
+        results.append((user_id, f"failed: {type(e).__name__}: {e}", None, 0, 1, None))
+
+class ProcessMonitor:
+    """Samples RSS, thread count and CPU time of a process from /proc."""
+
+    def __init__(self, pid, interval=0.25):
+        self.pid = pid
+        self.interval = interval
+        self.samples = []  # (time, rss bytes, threads, cpu seconds)
+        self.peak_rss = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="process-monitor", daemon=True)
+        self._clock_ticks = os.sysconf("SC_CLK_TCK")
+
+    def sample(self):
+        status = {}
+        with open(f"/proc/{self.pid}/status") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                status[key] = value.strip()
+        with open(f"/proc/{self.pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        cpu_seconds = (int(fields[11]) + int(fields[12])) / self._clock_ticks  # utime + stime
+        rss = int(status["VmRSS"].split()[0]) * 1024
+        self.peak_rss = max(self.peak_rss, int(status.get("VmHWM", "0 kB").split()[0]) * 1024)
+        self.samples.append((time.monotonic(), rss, int(status["Threads"]), cpu_seconds))
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.sample()
+            except (OSError, KeyError, IndexError):
+                return
+
+    def start(self):
+        self.sample()
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def summary(self, since=None):
+        samples = [s for s in self.samples if since is None or s[0] >= since] or self.samples[-1:]
+        threads = [s[2] for s in samples]
+        wall = samples[-1][0] - samples[0][0]
+        cpu = samples[-1][3] - samples[0][3]
+        return {
+            "rss_start_mb": samples[0][1] / 2**20,
+            "rss_end_mb": samples[-1][1] / 2**20,
+            "rss_peak_mb": self.peak_rss / 2**20,
+            "threads_peak": max(threads),
+            "threads_mean": float(np.mean(threads)),
+            "cpu_percent": 100 * cpu / wall if wall > 0 else 0.0,
+        }
+
+def peak_concurrency(intervals):
+    """Largest number of (start, seconds) intervals that overlap."""
+    events = sorted([(start, 1) for start, _ in intervals] + [(start + seconds, -1) for start, seconds in intervals])
+    peak = current = 0
+    for _, change in events:
+        current += change
+        peak = max(peak, current)
+    return peak
+
+def latency_summary(seconds):
+    values = np.asarray(seconds, dtype=float)
+    if not len(values):
+        return {"count": 0}
+    p50, p90, p95, p99 = np.percentile(values, [50, 90, 95, 99])
+    return {"count": len(values), "p50_s": p50, "p90_s": p90, "p95_s": p95, "p99_s": p99, "max_s": values.max()}
+
+def start_server(data_dir, port, fake_google_url):
+    env = dict(os.environ, CDCDASH_FAKE_GOOGLE_URL=fake_google_url)
+    cmd = [
+        sys.executable, "-m", "streamlit", "run", ENTRY_SCRIPT,
+        "--server.headless", "true", "--server.port", str(port),
+        "--server.fileWatcherType", "none", "--browser.gatherUsageStats", "false",
+    ]
+    return subprocess.Popen(cmd, cwd=data_dir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+def wait_until_healthy(port, timeout):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise TimeoutError("Streamlit server did not start")
+
+def prime(url, timeout):
+    """Open the app once and wait until the dataset warm-up is done."""
+    from websockets.sync.client import connect
+
+    with connect(url, subprotocols=["streamlit"], max_size=None, open_timeout=timeout) as ws:
+        session = StreamlitSession(ws, timeout)
+        deadline = time.monotonic() + timeout
+        session.rerun()
+        for button in session.find("button", sidebar=True):
+            session.click(button)
+            while session.loading and time.monotonic() < deadline:
+                time.sleep(0.5)
+                session.rerun()
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the dashboard with concurrent simulated sessions.")
+    parser.add_argument("--sessions", type=int, default=10)
+    parser.add_argument("--actions", type=int, default=10, help="Actions per session after opening the app")
+    parser.add_argument("--think-time", type=float, default=1.0, help="Mean seconds between actions")
+    parser.add_argument("--ramp-up", type=float, default=5.0, help="Seconds over which sessions connect")
+    parser.add_argument("--latency", type=float, default=0.2, help="Seconds per fake Google API call")
+    parser.add_argument("--scale", type=int, default=1)
+    parser.add_argument("--data-root", default=DEFAULT_DATA_ROOT)
+    parser.add_argument("--port", type=int, default=8599)
+    parser.add_argument("--timeout", type=float, default=300)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="Also write the report to this file")
+    args = parser.parse_args()
+
+    data_dir = os.path.join(args.data_root, f"scale_{args.scale}")
+    if not os.path.exists(os.path.join(data_dir, "all_site_master.csv")):
+        print(f"Generating scale {args.scale} data in {data_dir} ...")
+        generate(data_dir, args.scale)
+    site_ids = pd.read_csv(os.path.join(data_dir, "all_site_master.csv"))["site_id"].dropna().astype(str).tolist()
+
+    google = FakeGoogleServer(os.path.join(data_dir, "pengisian_bbm_streamlit.csv"), latency=args.latency).start()
+    server = start_server(data_dir, args.port, google.url)
+    url = f"ws://127.0.0.1:{args.port}/_stcore/stream"
+    try:
+        wait_until_healthy(args.port, args.timeout)
+        monitor = ProcessMonitor(server.pid).start()
+        prime(url, args.timeout)
+
+        results = []
+        google.in_flight_peak = 0
+        started = time.monotonic()
+        users = []
+        for user_id in range(args.sessions):
+            user = threading.Thread(
+                target=run_user, name=f"user-{user_id}",
+                args=(url, user_id, args.actions, args.think_time, site_ids, results, args.timeout, args.seed)
+            )
+            user.start()
+            users.append(user)
+            time.sleep(args.ramp_up / max(args.sessions, 1))
+        for user in users:
+            user.join()
+        duration = time.monotonic() - started
+        monitor.stop()
+    finally:
+        server.terminate()
+        server.wait()
+        google.stop()
+
+    completed = [r for r in results if r[2] is not None]
+    report = {
+        "sessions": args.sessions,
+        "actions": len(completed),
+        "duration_s": duration,
+        "throughput_per_s": len(completed) / duration if duration else 0.0,
+        "errors": sum(r[4] for r in results),
+        "failed_sessions": sorted({r[1] for r in results if r[2] is None}),
+        "latency": latency_summary([r[2] for r in completed]),
+        "latency_by_action": {
+            name: latency_summary([r[2] for r in completed if r[1] == name])
+            for name in sorted({r[1] for r in completed})
+        },
+        "received_mb": sum(r[3] for r in results) / 2**20,
+        "server": monitor.summary(since=started),
+        "runs_in_flight_peak": peak_concurrency([(r[5], r[2]) for r in completed]),
+        "google_api": {"requests": google.requests, "in_flight_peak": google.in_flight_peak},
+    }
+
+    lat = report["latency"]
+    print(f"\n{args.sessions} sessions, {report['actions']} actions in {duration:.1f}s "
+          f"({report['throughput_per_s']:.1f}/s), {report['errors']} errors")
+    if report["failed_sessions"]:
+        print("Failed sessions:", "; ".join(report["failed_sessions"]))
+    print(f"{'action':<14} {'count':>6} {'p50 s':>8} {'p90 s':>8} {'p99 s':>8} {'max s':>8}")
+    for name, stats in [("all", lat)] + list(report["latency_by_action"].items()):
+        if stats["count"]:
+            print(f"{name:<14} {stats['count']:>6} {stats['p50_s']:8.3f} {stats['p90_s']:8.3f} {stats['p99_s']:8.3f} {stats['max_s']:8.3f}")
+    srv = report["server"]
+    print(f"\nServer RSS: {srv['rss_start_mb']:.0f} MB at start, {srv['rss_end_mb']:.0f} MB at end, "
+          f"{srv['rss_peak_mb']:.0f} MB peak")
+    print(f"Server threads: peak {srv['threads_peak']}, mean {srv['threads_mean']:.1f}; CPU {srv['cpu_percent']:.0f}%; "
+          f"peak {report['runs_in_flight_peak']} script runs waiting at once")
+    print(f"Google API: {google.requests} calls, peak {google.in_flight_peak} in flight")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, default=float)
+
+if __name__ == "__main__":
+    main()
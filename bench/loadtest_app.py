@@ -0,0 +1,20 @@
+# --- bench/loadtest_app.py ---
+"""
+Streamlit entry point used by bench.loadtest: routes Google calls to the
+FakeGoogleServer given in CDCDASH_FAKE_GOOGLE_URL, then runs app.py.
+
+    CDCDASH_FAKE_GOOGLE_URL=http://127.0.0.1:8765 streamlit run bench/loadtest_app.py
+"""
+import os
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from bench.fakes import install_fake_google
+
+install_fake_google(server_url=os.environ["CDCDASH_FAKE_GOOGLE_URL"])
+
+with open(os.path.join(REPO_ROOT, "app.py"), encoding="utf-8") as f:
+    exec(compile(f.read(), os.path.join(REPO_ROOT, "app.py"), "exec"))
@@ -0,0 +1,211 @@
+# --- bench/run_benchmarks.py ---
+"""
+Benchmark suite for the loaders, indexes and page compute paths.
+
+For every scale the synthetic datasets are generated (see bench.synthetic_data),
+then each scale is benchmarked in its own process with that data directory as
+the working directory and Google Sheets/Drive replaced by the fakes in
+bench.fakes. Pages are driven through Streamlit's AppTest, section by section.
+
+Results are medians in seconds. They are compared with bench/baseline.json and
+the run fails (exit code 1) when a benchmark is slower than its baseline by more
+than --tolerance and --min-delta.
+
+    python -m bench.run_benchmarks                      # scale 1, compare with baseline
+    python -m bench.run_benchmarks --scales 1 10 100
+    python -m bench.run_benchmarks --update-baseline    # store the current results
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_PATH = os.path.join(REPO_ROOT, "bench", "baseline.json")
+DEFAULT_DATA_ROOT = os.path.join(tempfile.gettempdir(), "cdcdash_bench")
+
+DEFAULT_TOLERANCE = 0.5  # fail when more than 50% slower than baseline...
+DEFAULT_MIN_DELTA = 0.05  # ...and by more than 50 ms
+APPTEST_TIMEOUT = 600
+
+def slug(text):
+    """'📅 CDC Monthly Summary' -> 'cdc_monthly_summary'"""
+    return re.sub(r"[^a-z0-9]+", "_", text.encode("ascii", "ignore").decode().lower()).strip("_")
+
+def measure(fn, repeat, setup=None):
+    """Median wall time of fn() over repeat runs; setup() runs untimed before each."""
+    times = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+def wait_for_warmup(timeout=APPTEST_TIMEOUT):
+    from utils.datasets import start_dataset_warmup
+
+    warmup = start_dataset_warmup()
+    deadline = time.monotonic() + timeout
+    while not warmup.is_ready(*warmup.datasets) and time.monotonic() < deadline:
+        time.sleep(0.1)
+
+def bench_loaders(repeat):
+    """Every dataset loader with an empty cache."""
+    from utils.datasets import DATASETS
+
+    results = {}
+    for name, (loader, _) in DATASETS.items():
+        results[f"loader.{name}"] = measure(loader, repeat, setup=loader.clear)
+    return results
+
+def bench_compute(repeat):
+    """Status, search and spatial index computations over the (cached) datasets."""
+    from utils.bbm_alerts import compute_bbm_status
+    from utils.data_loader import (
+        load_bbm_data, load_cdc_po_data, load_dapot_alpro_data, load_dapot_df, load_availability_data, load_site_master
+    )
+    from utils.site_index import build_site_join_index
+    from utils.site_search import build_site_search_index
+    from utils.spatial_index import SiteSpatialIndex
+
+    refills = load_bbm_data()
+    search_frames = {
+        "Availability": load_availability_data(), "PO": load_cdc_po_data(),
+        "Dapot": load_dapot_alpro_data(), "Site Master": load_site_master(),
+    }
+    dapot_df = load_dapot_df()
+
+    return {
+        "compute.bbm_status": measure(lambda: compute_bbm_status(refills), repeat),
+        "compute.site_search_index": measure(lambda: build_site_search_index(search_frames), repeat),
+        "compute.site_join_index": measure(build_site_join_index, repeat),
+        "compute.spatial_index": measure(lambda: SiteSpatialIndex(dapot_df, "LATTITUDE", "LONGITUDE", "SITE ID"), repeat),
+    }
+
+def bench_pages(repeat):
+    """
+    Every page section through AppTest, with the datasets cached but the figure
+    cache emptied before each run, so figure building is included.
+    """
+    from streamlit.testing.v1 import AppTest
+    from utils.figure_cache import get_figure_cache
+
+    at = AppTest.from_file(os.path.join(REPO_ROOT, "app.py"), default_timeout=APPTEST_TIMEOUT)
+    at.run()
+    wait_for_warmup()
+
+    def run_checked():
+        at.run()
+        if at.exception:
+            raise RuntimeError(at.exception[0].value)
+
+    results = {}
+    for page in [button.label for button in at.sidebar.button]:
+        at.session_state["page"] = page
+        run_checked()
+        sections = at.radio[0].options if at.radio else [None]
+        for section in sections:
+            if section is not None:
+                at.radio[0].set_value(section)
+            run_checked()  # first run creates the section's cache_resource objects
+            name = f"page.{slug(page)}" + (f".{slug(section)}" if section else "")
+            results[name] = measure(run_checked, repeat, setup=lambda: get_figure_cache().clear())
+    return results
+
+def run_scale(data_dir, repeat, latency, skip_pages=False):
+    """Benchmark one data directory in this process. Returns {benchmark: seconds}."""
+    sys.path.insert(0, REPO_ROOT)
+    os.chdir(data_dir)
+
+    from bench.fakes import install_fake_google
+    install_fake_google("pengisian_bbm_streamlit.csv", latency=latency)
+
+    results = bench_loaders(repeat)
+    results.update(bench_compute(repeat))
+    if not skip_pages:
+        results.update(bench_pages(repeat))
+    return results
+
+def compare(results, baseline, tolerance, min_delta):
+    """Rows of (name, seconds, baseline seconds, ratio, regressed)."""
+    rows = []
+    for name, seconds in sorted(results.items()):
+        base = baseline.get(name)
+        ratio = seconds / base if base else None
+        regressed = base is not None and seconds > base * (1 + tolerance) and seconds - base > min_delta
+        rows.append((name, seconds, base, ratio, regressed))
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the CDC dashboard benchmarks.")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1], help="Data sizes as multiples of the sample data")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--data-root", default=DEFAULT_DATA_ROOT, help="Where the synthetic datasets are written")
+    parser.add_argument("--regenerate", action="store_true", help="Regenerate data that already exists")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds per fake Google API call")
+    parser.add_argument("--skip-pages", action="store_true")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--min-delta", type=float, default=DEFAULT_MIN_DELTA)
+    parser.add_argument("--worker", help=argparse.SUPPRESS)  # data dir benchmarked by a child process
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_scale(args.worker, args.repeat, args.latency, args.skip_pages)))
+        return
+
+    from bench.synthetic_data import generate
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    failed = False
+    for scale in args.scales:
+        data_dir = os.path.join(args.data_root, f"scale_{scale}")
+        if args.regenerate or not os.path.exists(os.path.join(data_dir, "all_site_master.csv")):
+            print(f"Generating scale {scale} data in {data_dir} ...")
+            generate(data_dir, scale)
+
+        # One process per scale: caches, indexes and background threads start clean
+        cmd = [sys.executable, "-m", "bench.run_benchmarks", "--worker", data_dir,
+               "--repeat", str(args.repeat), "--latency", str(args.latency)]
+        if args.skip_pages:
+            cmd.append("--skip-pages")
+        proc = subprocess.run(cmd, cwd=REPO_ROOT, capture_output=True, text=True)
+        if proc.returncode != 0:
+            print(proc.stderr[-3000:])
+            sys.exit(proc.returncode)
+        results = json.loads(proc.stdout.strip().splitlines()[-1])
+
+        print(f"\n=== scale {scale} ===")
+        print(f"{'benchmark':<55} {'median s':>9} {'baseline':>9} {'ratio':>6}")
+        for name, seconds, base, ratio, regressed in compare(results, baseline.get(str(scale), {}), args.tolerance, args.min_delta):
+            base_text = f"{base:9.3f}" if base is not None else f"{'-':>9}"
+            ratio_text = f"{ratio:6.2f}" if ratio is not None else f"{'-':>6}"
+            print(f"{name:<55} {seconds:9.3f} {base_text} {ratio_text}{'  REGRESSION' if regressed else ''}")
+            failed |= regressed
+
+        if args.update_baseline:
+            baseline[str(scale)] = {name: round(seconds, 4) for name, seconds in results.items()}
+
+    if args.update_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"\nBaseline written to {args.baseline}")
+    elif failed:
+        print("\nBenchmarks regressed against the baseline.")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
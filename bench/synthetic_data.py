@@ -0,0 +1,165 @@
+# --- bench/synthetic_data.py ---
+"""
+Synthetic CDC datasets at a multiple of the sample data size.
+
+Writes a directory that mirrors the repo's data layout, so the app can be run
+or benchmarked with that directory as the working directory:
+
+    <out>/data/CDC_Availability_2025_194.xlsx   (sheet "Ava CDC", one column per day)
+    <out>/data/ESTIMASIPO2025.xlsx              (one sheet per month, header on row 2)
+    <out>/data/Dapot_Alpro_CDC_2025.xlsx        (one sheet per region, header on row 2)
+    <out>/all_site_master.csv
+    <out>/pengisian_bbm_streamlit.csv
+
+The sample files in the repo are the template: every site is cloned `scale`
+times under a new site ID, with its numbers jittered, so layouts, dtypes and
+category mixes stay the same as in production data.
+
+    python -m bench.synthetic_data --scale 10 --out /tmp/cdcdash_bench/scale_10
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+AVAILABILITY_FILE = "data/CDC_Availability_2025_194.xlsx"
+CDC_PO_FILE = "data/ESTIMASIPO2025.xlsx"
+DAPOT_FILE = "data/Dapot_Alpro_CDC_2025.xlsx"
+SITE_MASTER_FILE = "all_site_master.csv"
+REFILLS_FILE = "pengisian_bbm_streamlit.csv"
+
+PO_MONTH_SHEETS = ["JANUARI", "FEBRUARI", "MARET", "APRIL", "MEI", "JUNI",
+                   "JULI", "AGUSTUS", "SEPTEMBER", "OKTOBER", "NOVEMBER", "DESEMBER"]
+DAPOT_SHEETS = ["Sumbagsel", "Sumbagteng", "Jawa Timur", "Bali Nusra", "Kalimantan", "Puma", "Sulawesi"]
+
+AVAILABILITY_DAYS = 194
+AVAILABILITY_START = "2025-01-01"
+TARGET_BY_CLASS = {"Diamond": 99.4, "Platinum": 99.4, "Gold": 99.0, "Silver": 97.5, "Bronze": 97.5}
+
+def clone_site_id(site_id, copy):
+    """Site ID of the copy-th clone of a template site (copy 0 keeps the original ID)."""
+    return site_id if copy == 0 else f"{site_id}{copy:02d}"
+
+def _clone(df, id_col, scale, rng, jitter=None):
+    """
+    Concatenate scale copies of df with cloned site IDs.
+
+    Args:
+        jitter: {column: relative noise} applied to numeric columns of the clones
+    """
+    copies = []
+    for copy in range(scale):
+        part = df.copy()
+        part[id_col] = part[id_col].map(lambda value: clone_site_id(value, copy) if isinstance(value, str) else value)
+        if copy and jitter:
+            for col, noise in jitter.items():
+                if col in part.columns and pd.api.types.is_numeric_dtype(part[col]):
+                    part[col] = part[col] * (1 + rng.normal(0, noise, len(part)))
+        copies.append(part)
+    return pd.concat(copies, ignore_index=True)
+
+def _write_sheets(path, sheets, startrow=1):
+    """Write {sheet name: DataFrame} with the header on row startrow + 1."""
+    with pd.ExcelWriter(path, engine="xlsxwriter") as writer:
+        for name, df in sheets.items():
+            df.to_excel(writer, sheet_name=name, index=False, startrow=startrow)
+
+def build_site_master(scale, rng):
+    template = pd.read_csv(os.path.join(REPO_ROOT, SITE_MASTER_FILE))
+    return _clone(template, "site_id", scale, rng)
+
+def build_refills(scale, rng):
+    template = pd.read_csv(os.path.join(REPO_ROOT, REFILLS_FILE))
+    return _clone(template, "site_id", scale, rng)
+
+def build_dapot(scale, rng):
+    template = pd.read_excel(os.path.join(REPO_ROOT, DAPOT_FILE), sheet_name=DAPOT_SHEETS, header=1)
+    sheets = {}
+    for name in DAPOT_SHEETS:
+        df = template[name]
+        df = _clone(df, "Site ID", scale, rng, jitter={"Longitude": 0.002, "Lattitude": 0.05})
+        if "No" in df.columns:
+            df["No"] = np.arange(1, len(df) + 1)
+        sheets[name] = df
+    return sheets
+
+def build_cdc_po(scale, rng):
+    xls = pd.ExcelFile(os.path.join(REPO_ROOT, CDC_PO_FILE))
+    sheets = {}
+    for month in PO_MONTH_SHEETS:
+        if month not in xls.sheet_names:
+            continue
+        df = _clone(pd.read_excel(xls, sheet_name=month, header=1), "Site Id", scale, rng, jitter={"Avaibility": 0.02})
+        df["Avaibility"] = df["Avaibility"].clip(upper=1.0)
+        df["No"] = np.arange(1, len(df) + 1)
+        sheets[month] = df
+    return sheets
+
+def build_availability(site_master, dapot_sheets, rng, days=AVAILABILITY_DAYS):
+    """Wide availability sheet: the site attributes, then one column per day (dd-Mon-yy)."""
+    dapot = pd.concat(dapot_sheets.values(), ignore_index=True)
+    site_class = dapot.drop_duplicates("Site ID").set_index("Site ID")["Site Class"].astype(str).str.strip().str.title()
+
+    df = pd.DataFrame({
+        "Area": site_master["area"],
+        "Site ID": site_master["site_id"],
+        "Regional": site_master["regional"],
+        "Site Name": site_master["site_name"],
+        "NS": "NS",
+        "Cluster": "C",
+        "On Service / Cut OFF": rng.choice(["On Service", "Cut Off"], size=len(site_master), p=[0.95, 0.05]),
+        "Site Class": site_master["site_id"].map(site_class).fillna("Gold").to_numpy(),
+    })
+    df["Target AVA"] = df["Site Class"].map(TARGET_BY_CLASS).fillna(99.0)
+
+    dates = pd.date_range(AVAILABILITY_START, periods=days, freq="D").strftime("%d-%b-%y")
+    # Mostly 100%, with outage days drawn from a skewed distribution
+    values = 100 - rng.exponential(3.0, size=(len(df), days)) * (rng.random((len(df), days)) < 0.7)
+    values = np.clip(values, 0, 100).round(2)
+    return pd.concat([df, pd.DataFrame(values, columns=dates)], axis=1)
+
+def generate(out_dir, scale=1, seed=0):
+    """
+    Write the synthetic datasets for scale into out_dir.
+
+    Returns:
+        {file: row count} of what was written
+    """
+    rng = np.random.default_rng(seed)
+    os.makedirs(os.path.join(out_dir, "data"), exist_ok=True)
+
+    site_master = build_site_master(scale, rng)
+    refills = build_refills(scale, rng)
+    dapot = build_dapot(scale, rng)
+    cdc_po = build_cdc_po(scale, rng)
+    availability = build_availability(site_master, dapot, rng)
+
+    site_master.to_csv(os.path.join(out_dir, SITE_MASTER_FILE), index=False)
+    refills.to_csv(os.path.join(out_dir, REFILLS_FILE), index=False)
+    _write_sheets(os.path.join(out_dir, DAPOT_FILE), dapot)
+    _write_sheets(os.path.join(out_dir, CDC_PO_FILE), cdc_po)
+    _write_sheets(os.path.join(out_dir, AVAILABILITY_FILE), {"Ava CDC": availability}, startrow=0)
+
+    return {
+        SITE_MASTER_FILE: len(site_master),
+        REFILLS_FILE: len(refills),
+        DAPOT_FILE: sum(len(df) for df in dapot.values()),
+        CDC_PO_FILE: sum(len(df) for df in cdc_po.values()),
+        AVAILABILITY_FILE: len(availability),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic CDC datasets.")
+    parser.add_argument("--scale", type=int, default=1, help="Multiple of the sample data size (1, 10, 100, ...)")
+    parser.add_argument("--out", required=True, help="Output directory")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    for path, rows in generate(args.out, args.scale, args.seed).items():
+        print(f"{path:<40} {rows:>9,} rows")
+
+if __name__ == "__main__":
+    main()
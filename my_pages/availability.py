@@ -4,426 +4,659 @@ import io
 import plotly.graph_objects as go
 import pandas as pd
 import random
-from utils.data_loader import load_availability_data, load_cdc_po_data
-
-def show():
-    st.title("\U0001F4C5 CDC Availability")
-
-    melted_df = load_availability_data()
+from utils.data_loader import (
+    load_availability_data, load_cdc_po_data, dataset_version, AVAILABILITY_PATH, CDC_PO_PATH
+)
+from utils.chart_utils import downsample_series
+from utils.figure_cache import cached_figure
+from utils.site_search import filter_site_options
+from utils.table_style import use_styler, availability_style_matrix, number_column_config, CDC_COLUMN_FORMATS
+from utils.datasets import require_datasets
+from utils.perf import instrument, timer
+from utils.reports import (
+    add_month_year, availability_summary_pivot, write_availability_summary_excel, write_excel,
+    CDC_EXPORT_COLUMNS
+)
+from utils.query import get_query_engine, filter_rows, active_filter, Between
+from utils.penalty import get_penalty_projection
+from utils.sla import get_sla_engine, SLA_WINDOW, WINDOWS, SLA_BREACH, SLA_AT_RISK, SLA_OK, SLA_NO_DATA
+from utils.anomaly import get_anomaly_detector, top_offenders, BASELINE_DAYS, Z_THRESHOLD, MIN_DROP
+
+# Max points drawn on the Daily Tracker chart before series are downsampled (LTTB)
+DAILY_CHART_POINT_BUDGET = 20000
+MIN_POINTS_PER_SITE = 60
+
+# Non-month columns of the INAP summary pivot
+SUMMARY_ID_COLUMNS = ['No', 'Area', 'Regional', 'Site ID', 'Site Name', 'Target AVA']
+
+def build_monthly_trend_figure(filtered_df, selected_site, selected_site_name):
+    fig1 = go.Figure()
+
+    for site_id, group in filtered_df.groupby('Site Id'):
+        target_value = group['Target Availability (%)'].iloc[0] if not group['Target Availability (%)'].isnull().all() else 0
+        target_label = f"Target: {int(target_value * 100)}%" if target_value % 0.01 == 0 else f"Target: {target_value * 100:.1f}%"
+
+        fig1.add_trace(go.Scatter(
+            x=group['Month_Year'], y=group['Avaibility'], mode='lines+markers+text',
+            name=site_id, text=group['Avaibility'].apply(lambda x: f"{x:.2%}"),
+            textposition='bottom center', showlegend=True
+        ))
+        fig1.add_trace(go.Scatter(
+            x=group['Month_Year'], y=group['Target Availability (%)'], mode='lines+markers+text',
+            name=target_label, text=group['Target Availability (%)'].apply(lambda x: f"{x:.2%}"),
+            textposition='bottom center', line=dict(dash='dash'), showlegend=True
+        ))
+
+    fig1.update_layout(
+        title=dict(text=f"Availability Site {selected_site} - {selected_site_name}", x=0.5, xanchor='center', font=dict(size=18)),
+        yaxis_title="Availability", hovermode='closest', yaxis_tickformat=".0%",
+        yaxis=dict(range=[0, 1], tickmode="linear", tick0=0, dtick=0.1),
+        legend=dict(orientation="h", yanchor="top", y=-0.3, xanchor="center", x=0.5)
+    )
+    return fig1
+
+def build_po_penalty_figure(filtered_df, selected_site, selected_site_name):
+    fig2 = go.Figure()
+
+    for site_id, group in filtered_df.groupby('Site Id'):
+        fig2.add_trace(go.Scatter(
+            x=group['Month_Year'], y=group['Nominal PO'], mode='lines+markers+text',
+            name=f'{site_id} - PO', line=dict(color='green'),
+            text=group['Nominal PO'].apply(lambda x: f"{x:,.0f}"),
+            textposition='top center', textfont=dict(color='green', size=10)
+        ))
+        fig2.add_trace(go.Scatter(
+            x=group['Month_Year'], y=group['Nilai Penalty'], mode='lines+markers+text',
+            name=f'{site_id} - Penalty', line=dict(color='red'),
+            fill='tozeroy', fillcolor='rgba(255, 0, 0, 0.2)',
+            text=group['Nilai Penalty'].apply(lambda x: f"{x:,.0f}"),
+            textposition='top center', textfont=dict(color='red', size=10)
+        ))
+
+    fig2.update_layout(
+        title=dict(text=f"{selected_site} - {selected_site_name}", x=0.5, xanchor='center', font=dict(size=18)),
+        yaxis_title="IDR", hovermode='closest',
+        legend=dict(orientation="h", yanchor="top", y=-0.3, xanchor="center", x=0.5)
+    )
+    return fig2
+
+def build_daily_tracker_figure(filtered_df, chart_title, selected_date):
+    fig = go.Figure()
+
+    # One grouped pass over the sites; downsample each series once the total passes the budget
+    n_sites = filtered_df['Site ID'].nunique()
+    max_points_per_site = max(MIN_POINTS_PER_SITE, DAILY_CHART_POINT_BUDGET // n_sites)
+    downsample = len(filtered_df) > DAILY_CHART_POINT_BUDGET
+
+    for site_id, site_data in filtered_df.sort_values('Date').groupby('Site ID', sort=False):
+        x = site_data['Date'].to_numpy()
+        y = site_data['Availability'].to_numpy(dtype='float64')
+        if downsample:
+            x, y = downsample_series(x, y, max_points_per_site)
+
+        fig.add_trace(go.Scattergl(
+            x=x,
+            y=y,
+            mode='lines+markers',
+            name=site_id,
+            hovertemplate=
+                "<b>Site ID:</b> " + site_id + "<br>" +
+                "<b>Date:</b> %{x}<br>" +
+                "<b>Availability:</b> %{y:.2f}%<br>" +
+                "<extra></extra>"
+        ))
+
+    # Add Target Line (two points spanning the date range)
+    target_x = [filtered_df['Date'].min(), filtered_df['Date'].max()]
+    if n_sites == 1:
+        target_value = filtered_df['Target AVA'].iloc[0]
+        fig.add_trace(go.Scattergl(x=target_x, y=[target_value] * 2,
+                                mode='lines', name=f"Target: {target_value:.1f}%",
+                                line=dict(dash='dash', color='red')))
+    else:
+        target_value = filtered_df['Target AVA'].mean()
+        fig.add_trace(go.Scattergl(x=target_x, y=[target_value] * 2,
+                                mode='lines', name=f"Avg Target: {target_value:.2f}%",
+                                line=dict(dash='dash', color='red')))
+
+    fig.update_layout(
+        title=chart_title,
+        xaxis_title="Date",
+        yaxis_title="Availability (%)",
+        showlegend=True,
+        hovermode='closest',
+        plot_bgcolor='white',
+        xaxis=dict(range=[selected_date[0], selected_date[1]])
+    )
+    return fig
+
+@st.fragment
+@instrument("page.availability.monthly_summary", kind="page")
+def show_monthly_summary():
     cdc_df = load_cdc_po_data()
+    po_version = dataset_version(CDC_PO_PATH)
+
+    st.subheader("📅 CDC Monthly Summary")
+
+    if cdc_df.empty:
+        st.warning("No CDC Monthly data available.")
+    else:
+        def style_cdc(df):
+            return df.style.format({
+                'Target Availability (%)': '{:.2%}',
+                'Avaibility': '{:.2%}',
+                'Persentase Penalty': '{:.2%}',
+                'Nominal PO': 'Rp {:,.0f}',
+                'Nilai Penalty': 'Rp {:,.0f}',
+                'Nilai BAST': 'Rp {:,.0f}',
+                'Nilai BAST dikurangi Penalty': 'Rp {:,.0f}'
+            })
+
+        col1, col2, col3, col4, col5 = st.columns(5)
 
-    tab1, tab2, tab3 = st.tabs(["📅 CDC Monthly Summary", "📈 Availability Daily Tracker", "📊 Availability Summary (INAP)"])
-
-    with tab1:
-        st.subheader("📅 CDC Monthly Summary")
-
-        if cdc_df.empty:
-            st.warning("No CDC Monthly data available.")
-        else:
-            def style_cdc(df):
-                return df.style.format({
-                    'Target Availability (%)': '{:.2%}',
-                    'Avaibility': '{:.2%}',
-                    'Persentase Penalty': '{:.2%}',
-                    'Nominal PO': 'Rp {:,.0f}',
-                    'Nilai Penalty': 'Rp {:,.0f}',
-                    'Nilai BAST': 'Rp {:,.0f}',
-                    'Nilai BAST dikurangi Penalty': 'Rp {:,.0f}'
-                })
-
-            cdc_df['Site Id'] = cdc_df['Site Id'].astype(str).str.strip()
-
-            col1, col2, col3, col4 = st.columns(4)
-
-            with col1:
-                selected_month = st.selectbox("Select Month", ["All"] + sorted(cdc_df["Month"].dropna().unique().tolist()))
-
-            with col2:
-                selected_year = st.selectbox("Select Year", ["All"] + sorted(cdc_df["Year"].dropna().unique()))
-
-            with col3:
-                selected_regional = st.selectbox("Select Regional", ["All"] + sorted(cdc_df["Regional TI"].dropna().unique()))
-
-            site_filter_df = cdc_df.copy()
-            if selected_month != "All":
-                site_filter_df = site_filter_df[site_filter_df["Month"] == selected_month]
-            if selected_year != "All":
-                site_filter_df = site_filter_df[site_filter_df["Year"] == selected_year]
-            if selected_regional != "All":
-                site_filter_df = site_filter_df[site_filter_df["Regional TI"] == selected_regional]
-
-            available_sites = sorted(site_filter_df["Site Id"].dropna().unique().tolist())
-            site_choices = ["All"] + available_sites
-
-            if "default_site_index" not in st.session_state:
-                st.session_state.default_site_index = random.randint(1, len(site_choices) - 1) if len(site_choices) > 1 else 0
-
-            with col4:
-                safe_index = st.session_state.default_site_index if st.session_state.default_site_index < len(site_choices) else 0
-                selected_site = st.selectbox("Select Site ID", options=site_choices, index=safe_index)
-
-            #with col5:
-            #    search_site = st.text_input("🔍 Search Site ID")
-
-            # --- Apply Filters ---
-            filtered_df = cdc_df.copy()
-            if selected_month != "All":
-                filtered_df = filtered_df[filtered_df["Month"] == selected_month]
-            if selected_year != "All":
-                filtered_df = filtered_df[filtered_df["Year"] == selected_year]
-            if selected_regional != "All":
-                filtered_df = filtered_df[filtered_df["Regional TI"] == selected_regional]
-            if selected_site != "All":
-                filtered_df = filtered_df[filtered_df["Site Id"] == selected_site]
-            #if search_site:
-            #    filtered_df = filtered_df[filtered_df["Site Id"].str.contains(search_site)]
-
-            selected_site_name = ""
-            if selected_site != "All":
-                site_name_match = filtered_df[filtered_df["Site Id"] == selected_site]["Site Name"]
-                if not site_name_match.empty:
-                    selected_site_name = site_name_match.iloc[0]
-
-            if not filtered_df.empty:
-                month_translation = {
-                    'JANUARI': 'January', 'FEBRUARI': 'February', 'MARET': 'March',
-                    'APRIL': 'April', 'MEI': 'May', 'JUNI': 'June', 'JULI': 'July',
-                    'AGUSTUS': 'August', 'SEPTEMBER': 'September', 'OKTOBER': 'October',
-                    'NOVEMBER': 'November', 'DESEMBER': 'December'
-                }
-
-                filtered_df['Month_Eng'] = filtered_df['Month'].str.upper().map(month_translation)
-                filtered_df['Month_Num'] = pd.to_datetime(filtered_df['Month_Eng'], format='%B').dt.month
-                filtered_df['Month_Year'] = filtered_df['Month_Eng'] + " - " + filtered_df['Year'].astype(str)
-                filtered_df = filtered_df.sort_values(by=['Year', 'Month_Num'])
-
-                chart_col1, chart_col2 = st.columns(2)
-
-                with chart_col1:
-                    st.markdown("#### 📈 Site Monthly Availability Trend")
-                    fig1 = go.Figure()
-
-                    for site_id, group in filtered_df.groupby('Site Id'):
-                        target_value = group['Target Availability (%)'].iloc[0] if not group['Target Availability (%)'].isnull().all() else 0
-                        target_label = f"Target: {int(target_value * 100)}%" if target_value % 0.01 == 0 else f"Target: {target_value * 100:.1f}%"
-
-                        fig1.add_trace(go.Scatter(
-                            x=group['Month_Year'], y=group['Avaibility'], mode='lines+markers+text',
-                            name=site_id, text=group['Avaibility'].apply(lambda x: f"{x:.2%}"),
-                            textposition='bottom center', showlegend=True
-                        ))
-                        fig1.add_trace(go.Scatter(
-                            x=group['Month_Year'], y=group['Target Availability (%)'], mode='lines+markers+text',
-                            name=target_label, text=group['Target Availability (%)'].apply(lambda x: f"{x:.2%}"),
-                            textposition='bottom center', line=dict(dash='dash'), showlegend=True
-                        ))
-
-                    fig1.update_layout(
-                        title=dict(text=f"Availability Site {selected_site} - {selected_site_name}", x=0.5, xanchor='center', font=dict(size=18)),
-                        yaxis_title="Availability", hovermode='closest', yaxis_tickformat=".0%",
-                        yaxis=dict(range=[0, 1], tickmode="linear", tick0=0, dtick=0.1),
-                        legend=dict(orientation="h", yanchor="top", y=-0.3, xanchor="center", x=0.5)
-                    )
-                    st.plotly_chart(fig1, use_container_width=True)
-
-            with chart_col2:
-                st.markdown("#### 💰 Nominal PO vs Penalty")
-                fig2 = go.Figure()
-
-                for site_id, group in filtered_df.groupby('Site Id'):
-                    fig2.add_trace(go.Scatter(
-                        x=group['Month_Year'], y=group['Nominal PO'], mode='lines+markers+text',
-                        name=f'{site_id} - PO', line=dict(color='green'),
-                        text=group['Nominal PO'].apply(lambda x: f"{x:,.0f}"),
-                        textposition='top center', textfont=dict(color='green', size=10)
-                    ))
-                    fig2.add_trace(go.Scatter(
-                        x=group['Month_Year'], y=group['Nilai Penalty'], mode='lines+markers+text',
-                        name=f'{site_id} - Penalty', line=dict(color='red'),
-                        fill='tozeroy', fillcolor='rgba(255, 0, 0, 0.2)',
-                        text=group['Nilai Penalty'].apply(lambda x: f"{x:,.0f}"),
-                        textposition='top center', textfont=dict(color='red', size=10)
-                    ))
-
-                fig2.update_layout(
-                    title=dict(text=f"{selected_site} - {selected_site_name}", x=0.5, xanchor='center', font=dict(size=18)),
-                    yaxis_title="IDR", hovermode='closest',
-                    legend=dict(orientation="h", yanchor="top", y=-0.3, xanchor="center", x=0.5)
-                )
-                st.plotly_chart(fig2, use_container_width=True)
-
-        if not filtered_df.empty:
-            desired_columns = [
-                'No', 'Month_Year', 'Regional TI', 'Site Id', 'Site Name', 'Daya PO',
-                'Periode Tagihan (Awal)', 'Periode Tagihan (Akhir)', 'Jumlah Periode (Bulan)',
-                'Nominal PO', 'Index BBM', 'Class Site', 'Target Availability (%)', 'Avaibility',
-                'Persentase Penalty', 'Nilai Penalty', 'Nilai BAST', 'Nilai BAST dikurangi Penalty',
-                'Ava Achievement'
-            ]
-
-            filtered_df = filtered_df[desired_columns]
-            st.dataframe(style_cdc(filtered_df))
-
-            output = io.BytesIO()
-            with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-                filtered_df.to_excel(writer, index=False, sheet_name='Filtered Data')
-            output.seek(0)
-
-            st.download_button(
-                label="📥 Download Filtered Data as Excel",
-                data=output,
-                file_name="filtered_data.xlsx",
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-            )
-
-            if 'Ava Achievement' in filtered_df.columns:
-                st.markdown("### 🎯 Achievement Summary")
-                st.dataframe(
-                    filtered_df['Ava Achievement']
-                        .value_counts()
-                        .reset_index()
-                        .rename(columns={'index': 'Achievement', 'Ava Achievement': 'Count'})
-                )
-            else:
-                st.info("'Ava Achievement' column not available in the data.")
-
-    with tab2:
-        st.subheader('📈 CDC Site Availability')
-
-        # Create a single row for all filters (removing Search Site ID input)
-        col1, col2, col3, col4 = st.columns(4)
-
-        # --- Area filter ---
         with col1:
-            area_options = ["Show All"] + list(melted_df['Area'].dropna().unique())
-            selected_area = st.selectbox("Area", options=area_options)
-
-        # --- Regional options based on selected area ---
-        filtered_by_area = melted_df[melted_df['Area'] == selected_area] if selected_area != "Show All" else melted_df.copy()
+            selected_month = st.selectbox("Select Month", ["All"] + sorted(cdc_df["Month"].dropna().unique().tolist()))
 
         with col2:
-            regional_options = ["Show All"] + list(filtered_by_area['Regional'].dropna().unique())
-            selected_regional = st.selectbox("Regional", options=regional_options)
+            selected_year = st.selectbox("Select Year", ["All"] + sorted(cdc_df["Year"].dropna().unique()))
 
-        # --- Date Range Picker ---
         with col3:
-            valid_dates = melted_df['Date'].dropna()
-            if not valid_dates.empty:
-                selected_date = st.date_input(
-                    "Date Range",
-                    [valid_dates.min(), valid_dates.max()]
-                )
-            else:
-                st.warning("No valid dates available.")
-                selected_date = [None, None]
+            selected_regional = st.selectbox("Select Regional", ["All"] + sorted(cdc_df["Regional TI"].dropna().unique()))
 
-        # --- Site ID selection ---
-        filtered_by_regional = filtered_by_area[filtered_by_area['Regional'] == selected_regional] if selected_regional != "Show All" else filtered_by_area.copy()
-        site_id_options = filtered_by_regional['Site ID'].dropna().unique()
-        site_id_options = ["Show All"] + list(site_id_options)
+        site_filters = {
+            "Month": active_filter(selected_month),
+            "Year": active_filter(selected_year),
+            "Regional TI": active_filter(selected_regional)
+        }
+        site_filter_df = filter_rows(cdc_df, site_filters)
 
-        with col4:
-            selected_site = st.selectbox("Site ID", options=site_id_options)
+        with col5:
+            search_site = st.text_input("🔍 Search Site ID")
 
-        # --- Get Site Name after Site ID selection ---
-        selected_site_name = ""
-        if selected_site and selected_site != "Show All":
-            site_name_series = filtered_by_regional[filtered_by_regional['Site ID'] == selected_site]['Site Name']
-            if not site_name_series.empty:
-                selected_site_name = site_name_series.iloc[0]
-                st.write(f"Selected Site Name: {selected_site_name}")
+        available_sites = sorted(site_filter_df["Site Id"].dropna().unique().tolist())
+        available_sites = filter_site_options(search_site, available_sites)
+        site_choices = ["All"] + available_sites
+
+        if "default_site_index" not in st.session_state:
+            st.session_state.default_site_index = random.randint(1, len(site_choices) - 1) if len(site_choices) > 1 else 0
+
+        with col4:
+            safe_index = st.session_state.default_site_index if st.session_state.default_site_index < len(site_choices) else 0
+            if search_site:
+                safe_index = 1 if len(site_choices) > 1 else 0  # best match
+            selected_site = st.selectbox("Select Site ID", options=site_choices, index=safe_index)
 
         # --- Apply Filters ---
-        filtered_df = melted_df.copy()
+        filtered_df = filter_rows(site_filter_df, {"Site Id": active_filter(selected_site)})
 
-        if selected_area != "Show All":
-            filtered_df = filtered_df[filtered_df['Area'] == selected_area]
+        selected_site_name = ""
+        if selected_site != "All":
+            site_name_match = filtered_df["Site Name"]
+            if not site_name_match.empty:
+                selected_site_name = site_name_match.iloc[0]
 
-        if selected_regional != "Show All":
-            filtered_df = filtered_df[filtered_df['Regional'] == selected_regional]
+        if not filtered_df.empty:
+            filtered_df = add_month_year(filtered_df)
 
-        if selected_site != "Show All":
-            filtered_df = filtered_df[filtered_df['Site ID'] == selected_site]
+            monthly_filters = (selected_month, selected_year, selected_regional, selected_site)
+            chart_col1, chart_col2 = st.columns(2)
 
-        if selected_date[0] and selected_date[1]:
-            filtered_df = filtered_df[
-                (filtered_df['Date'] >= pd.to_datetime(selected_date[0])) &
-                (filtered_df['Date'] <= pd.to_datetime(selected_date[1]))
-            ]
+            with chart_col1:
+                st.markdown("#### 📈 Site Monthly Availability Trend")
+                fig1 = cached_figure(
+                    po_version, "monthly_trend", monthly_filters,
+                    lambda: build_monthly_trend_figure(filtered_df, selected_site, selected_site_name)
+                )
+                st.plotly_chart(fig1, use_container_width=True)
 
-        # --- Chart ---
-        if filtered_df.empty:
-            st.warning("No data available for selected filters.")
-        else:
-            fig = go.Figure()
-
-            for site_id in filtered_df['Site ID'].unique():
-                site_data = filtered_df[filtered_df['Site ID'] == site_id]
-                fig.add_trace(go.Scatter(
-                    x=site_data['Date'],
-                    y=site_data['Availability'],
-                    mode='lines+markers',
-                    name=site_id,
-                    hovertemplate=
-                        "<b>Site ID:</b> " + site_id + "<br>" +
-                        "<b>Date:</b> %{x}<br>" +
-                        "<b>Availability:</b> %{y:.2f}%<br>" +
-                        "<extra></extra>"
-                ))
-
-            # Add Target Line
-            if filtered_df['Site ID'].nunique() == 1:
-                target_value = filtered_df['Target AVA'].iloc[0]
-                fig.add_trace(go.Scatter(x=filtered_df['Date'], y=[target_value] * len(filtered_df),
-                                        mode='lines', name=f"Target: {target_value:.1f}%",
-                                        line=dict(dash='dash', color='red')))
-            else:
-                target_value = filtered_df['Target AVA'].mean()
-                fig.add_trace(go.Scatter(x=filtered_df['Date'], y=[target_value] * len(filtered_df),
-                                        mode='lines', name=f"Avg Target: {target_value:.2f}%",
-                                        line=dict(dash='dash', color='red')))
-
-            # Chart Title
-            chart_title = f"Availability for Site ID: {selected_site} - {selected_site_name}" if selected_site != "Show All" and selected_site_name else "Availability Overview"
-
-            fig.update_layout(
-                title=chart_title,
-                xaxis_title="Date",
-                yaxis_title="Availability (%)",
-                showlegend=True,
-                hovermode='closest',
-                plot_bgcolor='white',
-                xaxis=dict(range=[selected_date[0], selected_date[1]])
+        with chart_col2:
+            st.markdown("#### 💰 Nominal PO vs Penalty")
+            fig2 = cached_figure(
+                po_version, "po_vs_penalty", monthly_filters,
+                lambda: build_po_penalty_figure(filtered_df, selected_site, selected_site_name)
             )
+            st.plotly_chart(fig2, use_container_width=True)
 
-            st.plotly_chart(fig)
+    if not filtered_df.empty:
+        filtered_df = filtered_df[CDC_EXPORT_COLUMNS]
+        if use_styler(filtered_df):
+            st.dataframe(style_cdc(filtered_df))
+        else:
+            st.dataframe(filtered_df, column_config=number_column_config(CDC_COLUMN_FORMATS))
 
-            # Download filtered data
+        with timer("export.availability.cdc_monthly", kind="export") as t:
+            output = io.BytesIO()
+            write_excel(filtered_df, output, 'Filtered Data')
+            output.seek(0)
+            t.rows, t.bytes = len(filtered_df), output.getbuffer().nbytes
+
+        st.download_button(
+            label="📥 Download Filtered Data as Excel",
+            data=output,
+            file_name="filtered_data.xlsx",
+            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        )
+
+        if 'Ava Achievement' in filtered_df.columns:
+            st.markdown("### 🎯 Achievement Summary")
+            st.dataframe(
+                filtered_df['Ava Achievement']
+                    .value_counts()
+                    .reset_index()
+                    .rename(columns={'index': 'Achievement', 'Ava Achievement': 'Count'})
+            )
+        else:
+            st.info("'Ava Achievement' column not available in the data.")
+
+    if not cdc_df.empty and require_datasets("availability"):
+        show_penalty_projection(selected_regional, selected_site)
+
+def show_penalty_projection(selected_regional, selected_site):
+    """Month-to-date penalty projection for the CDC Monthly Summary's regional / site selection."""
+    month, projection = get_penalty_projection()
+
+    st.markdown(f"### 🔮 Projected Penalty {month.strftime('%B %Y')} (month-to-date)")
+    projection = filter_rows(projection, {
+        "Regional TI": active_filter(selected_regional),
+        "Site Id": active_filter(selected_site)
+    })
+    if projection.empty:
+        st.info("No month-to-date availability for the selected sites.")
+        return
+
+    st.caption(
+        f"Based on {int(projection['Days Counted'].max())} day(s) of daily availability, "
+        "with the target, BAST and penalty rules of the PO workbook."
+    )
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Not Achieved", f"{(projection['Ava Achievement'] == 'Not Achieved').sum()} / {len(projection)} site")
+    col2.metric("Projected Nilai Penalty", f"Rp {projection['Nilai Penalty'].sum():,.0f}")
+    col3.metric("Projected BAST dikurangi Penalty", f"Rp {projection['Nilai BAST dikurangi Penalty'].sum():,.0f}")
+
+    st.dataframe(
+        projection,
+        hide_index=True,
+        column_config=number_column_config({**CDC_COLUMN_FORMATS, 'Projected Availability': 'percent'})
+    )
+
+@st.fragment
+@instrument("page.availability.daily_tracker", kind="page")
+def show_daily_tracker():
+    try:
+        melted_df = load_availability_data()
+    except RuntimeError as e:
+        st.error(str(e))
+        st.stop()
+    availability_version = dataset_version(AVAILABILITY_PATH)
+
+    st.subheader('📈 CDC Site Availability')
+
+    # Create a single row for all filters (removing Search Site ID input)
+    col1, col2, col3, col4 = st.columns(4)
+
+    # --- Area filter ---
+    with col1:
+        area_options = ["Show All"] + list(melted_df['Area'].dropna().unique())
+        selected_area = st.selectbox("Area", options=area_options)
+
+    # --- Regional options based on selected area ---
+    filtered_by_area = filter_rows(melted_df, {'Area': active_filter(selected_area)})
+
+    with col2:
+        regional_options = ["Show All"] + list(filtered_by_area['Regional'].dropna().unique())
+        selected_regional = st.selectbox("Regional", options=regional_options)
+
+    # --- Date Range Picker ---
+    with col3:
+        date_min, date_max = melted_df['Date'].min(), melted_df['Date'].max()
+        if pd.notna(date_min):
+            selected_date = st.date_input(
+                "Date Range",
+                [date_min, date_max]
+            )
+        else:
+            st.warning("No valid dates available.")
+            selected_date = [None, None]
+
+    # --- Site ID selection ---
+    filtered_by_regional = filter_rows(filtered_by_area, {'Regional': active_filter(selected_regional)})
+    site_id_options = filtered_by_regional['Site ID'].dropna().unique()
+
+    with col4:
+        site_query = st.text_input("🔍 Search Site", key="daily_site_search")
+        site_id_options = ["Show All"] + filter_site_options(site_query, site_id_options)
+        selected_site = st.selectbox(
+            "Site ID", options=site_id_options,
+            index=1 if site_query and len(site_id_options) > 1 else 0
+        )
+
+    # --- Get Site Name after Site ID selection ---
+    selected_site_name = ""
+    if selected_site and selected_site != "Show All":
+        site_name_series = filtered_by_regional[filtered_by_regional['Site ID'] == selected_site]['Site Name']
+        if not site_name_series.empty:
+            selected_site_name = site_name_series.iloc[0]
+            st.write(f"Selected Site Name: {selected_site_name}")
+
+    # --- Apply Filters ---
+    date_range = None
+    if selected_date[0] and selected_date[1]:
+        date_range = Between(pd.to_datetime(selected_date[0]), pd.to_datetime(selected_date[1]))
+
+    filtered_df = filter_rows(filtered_by_regional, {
+        'Site ID': active_filter(selected_site),
+        'Date': date_range
+    })
+
+    # --- Chart ---
+    if filtered_df.empty:
+        st.warning("No data available for selected filters.")
+    else:
+        # Chart Title
+        chart_title = f"Availability for Site ID: {selected_site} - {selected_site_name}" if selected_site != "Show All" and selected_site_name else "Availability Overview"
+
+        fig = cached_figure(
+            availability_version, "daily_tracker",
+            (selected_area, selected_regional, selected_site, tuple(selected_date)),
+            lambda: build_daily_tracker_figure(filtered_df, chart_title, selected_date)
+        )
+
+        st.plotly_chart(fig)
+
+        # Download filtered data
+        with timer("export.availability.daily_tracker", kind="export") as t:
             csv_buffer = io.StringIO()
             filtered_df.to_csv(csv_buffer, index=False)
             csv_data = csv_buffer.getvalue()
-
-            st.download_button(
-                label="⬇️ Download Filtered Data as CSV",
-                data=csv_data,
-                file_name='filtered_site_availability.csv',
-                mime='text/csv'
-            )
-
-    with tab3:
-        st.subheader('📊 Site Availability Summary')
-
-        # --- Create cascading filters: Area → Regional → Site ID ---
-        col1, col2, col3 = st.columns(3)
-
-        # Area filter
-        with col1:
-            selected_area_summary = st.selectbox("Select Area", 
-                                                options=['Show All'] + sorted(melted_df['Area'].dropna().unique().tolist()), 
-                                                key="summary_area")
-
-        # Filter Regional options based on selected Area
-        if selected_area_summary == 'Show All':
-            regional_options = ['Show All'] + sorted(melted_df['Regional'].dropna().unique().tolist())
-            filtered_df = melted_df.copy()
+            t.rows, t.bytes = len(filtered_df), len(csv_data)
+
+        st.download_button(
+            label="⬇️ Download Filtered Data as CSV",
+            data=csv_data,
+            file_name='filtered_site_availability.csv',
+            mime='text/csv'
+        )
+
+@st.fragment
+@instrument("page.availability.inap_summary", kind="page")
+def show_inap_summary():
+    # Filter options come from the shared query engine (DuckDB when installed)
+    engine = get_query_engine()
+
+    st.subheader('📊 Site Availability Summary')
+
+    # --- Create cascading filters: Area → Regional → Site ID ---
+    col1, col2, col3 = st.columns(3)
+
+    # Area filter
+    with col1:
+        selected_area_summary = st.selectbox("Select Area", 
+                                            options=['Show All'] + engine.distinct("availability", "Area"), 
+                                            key="summary_area")
+
+    # Filter Regional options based on selected Area
+    where = {"Area": active_filter(selected_area_summary)}
+    regional_options = ['Show All'] + engine.distinct("availability", "Regional", where=where)
+
+    with col2:
+        selected_regional_summary = st.selectbox("Select Regional", options=regional_options, key="summary_regional")
+
+    where["Regional"] = active_filter(selected_regional_summary)
+
+    # Site ID options based on filters above
+    site_id_options = ['Show All'] + engine.distinct("availability", "Site ID", where=where)
+    with col3:
+        selected_site_summary = st.selectbox("Select Site ID", options=site_id_options, key="summary_site")
+
+    where["Site ID"] = active_filter(selected_site_summary)
+
+    filtered_df = filter_rows(load_availability_data(), where)
+
+    # Warn if no data after filtering
+    if filtered_df.empty:
+        st.warning("No data available for selected filters.")
+    else:
+        # Monthly average per site, one column per month ('Apr-25' etc.); the same pivot
+        # as the report CLI, so the page and the exported report show the same numbers
+        monthly_summary_pivot = availability_summary_pivot(filtered_df)
+
+        month_columns = [col for col in monthly_summary_pivot.columns if col not in SUMMARY_ID_COLUMNS]
+        if use_styler(monthly_summary_pivot):
+            styled_df = monthly_summary_pivot.style.apply(
+                availability_style_matrix, axis=None, value_columns=month_columns
+            ).format(precision=2)
+            st.dataframe(styled_df, height=500)
         else:
-            regional_options = ['Show All'] + sorted(melted_df[melted_df['Area'] == selected_area_summary]['Regional'].dropna().unique().tolist())
-            filtered_df = melted_df[melted_df['Area'] == selected_area_summary]
-
-        with col2:
-            selected_regional_summary = st.selectbox("Select Regional", options=regional_options, key="summary_regional")
-
-        if selected_regional_summary != 'Show All':
-            filtered_df = filtered_df[filtered_df['Regional'] == selected_regional_summary]
-
-        # Site ID options based on filters above
-        site_id_options = ['Show All'] + sorted(filtered_df['Site ID'].dropna().unique().tolist())
-        with col3:
-            selected_site_summary = st.selectbox("Select Site ID", options=site_id_options, key="summary_site")
+            # Too many cells for Styler: plain formatted columns without highlighting
+            st.caption("Highlighting is turned off for large tables; narrow the filters to see achieved/not achieved colors.")
+            st.dataframe(
+                monthly_summary_pivot,
+                height=500,
+                column_config=number_column_config({col: "%.2f" for col in month_columns})
+            )
 
-        if selected_site_summary != 'Show All':
-            filtered_df = filtered_df[filtered_df['Site ID'] == selected_site_summary]
+        # --- Download Button ---
+        with timer("export.availability.inap_summary", kind="export") as t:
+            excel_buffer = io.BytesIO()
+            write_availability_summary_excel(monthly_summary_pivot, excel_buffer)
+            t.rows, t.bytes = len(monthly_summary_pivot), excel_buffer.getbuffer().nbytes
+
+        st.download_button(
+            label="📥 Download Summary as Excel",
+            data=excel_buffer.getvalue(),
+            file_name="site_availability_summary.xlsx",
+            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        )
+
+def build_sla_trend_figure(history, selected_site, selected_site_name):
+    fig = go.Figure()
+    fig.add_trace(go.Scattergl(
+        x=history['Date'], y=history['Availability'], mode='markers', name='Daily',
+        marker=dict(size=5, color='lightgray')
+    ))
+    for window in WINDOWS:
+        fig.add_trace(go.Scattergl(
+            x=history['Date'], y=history[f'Avail {window}D'], mode='lines', name=f'Trailing {window} days'
+        ))
+    fig.add_trace(go.Scattergl(
+        x=history['Date'], y=history['Target AVA'], mode='lines', name='Target',
+        line=dict(dash='dash', color='red')
+    ))
+    fig.update_layout(
+        title=dict(text=f"{selected_site} - {selected_site_name}", x=0.5, xanchor='center'),
+        xaxis_title="Date", yaxis_title="Availability (%)", hovermode='x unified',
+        legend=dict(orientation="h", yanchor="top", y=-0.2, xanchor="center", x=0.5)
+    )
+    return fig
+
+@st.fragment
+@instrument("page.availability.sla_risk", kind="page")
+def show_sla_risk():
+    sla_engine = get_sla_engine()
+    availability_version = dataset_version(AVAILABILITY_PATH)
+
+    st.subheader('🚨 SLA Risk')
+    st.caption(
+        f"Trailing {SLA_WINDOW}-day availability vs Target AVA. "
+        f"Breach: {SLA_WINDOW}-day average below target. At Risk: only the {min(WINDOWS)}-day average below target."
+    )
+
+    if not len(sla_engine.dates):
+        st.warning("No availability data.")
+        return
+
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        area_options = ["Show All"] + sorted(sla_engine.sites['Area'].dropna().unique().tolist())
+        selected_area = st.selectbox("Area", options=area_options, key="sla_area")
+    with col2:
+        regional_sites = filter_rows(sla_engine.sites, {'Area': active_filter(selected_area)})
+        regional_options = ["Show All"] + sorted(regional_sites['Regional'].dropna().unique().tolist())
+        selected_regional = st.selectbox("Regional", options=regional_options, key="sla_regional")
+    with col3:
+        selected_status = st.multiselect(
+            "SLA Status", options=[SLA_BREACH, SLA_AT_RISK, SLA_OK, SLA_NO_DATA],
+            default=[SLA_BREACH, SLA_AT_RISK], key="sla_status"
+        )
+    with col4:
+        as_of = st.date_input(
+            "As of", value=sla_engine.dates[-1].date(),
+            min_value=sla_engine.dates[0].date(), max_value=sla_engine.dates[-1].date(), key="sla_as_of"
+        )
+
+    snapshot = filter_rows(sla_engine.snapshot(as_of), {
+        'Area': active_filter(selected_area),
+        'Regional': active_filter(selected_regional)
+    })
+
+    # Status counts over the area/regional selection
+    status_counts = snapshot['SLA Status'].value_counts()
+    metric_cols = st.columns(4)
+    for metric_col, status in zip(metric_cols, [SLA_BREACH, SLA_AT_RISK, SLA_OK, SLA_NO_DATA]):
+        metric_col.metric(status, int(status_counts.get(status, 0)))
+
+    risk_df = filter_rows(snapshot, {'SLA Status': selected_status or None})
+    if risk_df.empty:
+        st.info("No sites match the selected filters.")
+        return
+
+    avail_columns = ['Availability'] + [f'Avail {window}D' for window in WINDOWS]
+    if use_styler(risk_df):
+        st.dataframe(
+            risk_df.style.apply(
+                availability_style_matrix, axis=None, value_columns=avail_columns
+            ).format(precision=2, subset=avail_columns),
+            hide_index=True
+        )
+    else:
+        st.dataframe(
+            risk_df, hide_index=True,
+            column_config=number_column_config({col: "%.2f" for col in avail_columns})
+        )
+
+    with timer("export.availability.sla_risk", kind="export") as t:
+        excel_buffer = io.BytesIO()
+        write_excel(risk_df, excel_buffer, 'SLA Risk')
+        t.rows, t.bytes = len(risk_df), excel_buffer.getbuffer().nbytes
+
+    st.download_button(
+        label="📥 Download SLA Risk as Excel",
+        data=excel_buffer.getvalue(),
+        file_name=f"sla_risk_{as_of:%Y%m%d}.xlsx",
+        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    )
+
+    # Trend of one site, worst first
+    st.markdown("#### 📉 Site SLA Trend")
+    selected_site = st.selectbox("Site ID", options=risk_df['Site ID'].tolist(), key="sla_site")
+    history = sla_engine.site_history(selected_site)
+    history = history[history['Date'] <= pd.Timestamp(as_of)]
+    selected_site_name = risk_df.loc[risk_df['Site ID'] == selected_site, 'Site Name'].iloc[0]
+    fig = cached_figure(
+        availability_version, "sla_trend", (selected_site, str(as_of)),
+        lambda: build_sla_trend_figure(history, selected_site, selected_site_name)
+    )
+    st.plotly_chart(fig, use_container_width=True)
+
+@st.fragment
+@instrument("page.availability.anomalies", kind="page")
+def show_anomalies():
+    detector = get_anomaly_detector()
+
+    st.subheader('⚠️ Availability Anomalies')
+    st.caption(
+        f"Days at least {Z_THRESHOLD:g} standard deviations and {MIN_DROP:g} points below the site's "
+        f"previous {BASELINE_DAYS} days. Updated with every new day in the availability file."
+    )
+
+    if detector.last_date is None:
+        st.warning("No availability data.")
+        return
+
+    anomalies = detector.anomalies
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        area_options = ["Show All"] + sorted(detector.sites['Area'].dropna().unique().tolist())
+        selected_area = st.selectbox("Area", options=area_options, key="anomaly_area")
+    with col2:
+        regional_sites = filter_rows(detector.sites, {'Area': active_filter(selected_area)})
+        regional_options = ["Show All"] + sorted(regional_sites['Regional'].dropna().unique().tolist())
+        selected_regional = st.selectbox("Regional", options=regional_options, key="anomaly_regional")
+    with col3:
+        since = st.date_input(
+            "Since", value=(detector.last_date - pd.Timedelta(days=29)).date(),
+            max_value=detector.last_date.date(), key="anomaly_since"
+        )
+    with col4:
+        top_n = st.number_input("Top sites", min_value=5, max_value=200, value=20, step=5, key="anomaly_top_n")
+
+    anomalies = filter_rows(anomalies, {
+        'Area': active_filter(selected_area),
+        'Regional': active_filter(selected_regional),
+        'Date': Between(pd.Timestamp(since), None)
+    })
+
+    metric_cols = st.columns(3)
+    metric_cols[0].metric("Anomalous site-days", f"{len(anomalies):,}")
+    metric_cols[1].metric("Sites affected", f"{anomalies['Site ID'].nunique():,}")
+    metric_cols[2].metric("Latest day scored", f"{detector.last_date:%d %b %Y}")
+
+    if anomalies.empty:
+        st.info("No anomalies for the selected filters.")
+        return
+
+    st.markdown("#### 🏴 Top Offenders")
+    offenders = top_offenders(anomalies, n=int(top_n))
+    st.dataframe(
+        offenders, hide_index=True,
+        column_config=number_column_config({'Worst Z-Score': "%.1f", 'Largest Drop': "%.2f"})
+    )
+
+    with st.expander(f"📋 {len(anomalies):,} anomalous site-days, worst first"):
+        st.dataframe(
+            anomalies, hide_index=True,
+            column_config=number_column_config({
+                'Availability': "%.2f", 'Baseline': "%.2f", 'Baseline Std': "%.2f",
+                'Drop': "%.2f", 'Z-Score': "%.1f"
+            })
+        )
+
+    with timer("export.availability.anomalies", kind="export") as t:
+        excel_buffer = io.BytesIO()
+        write_excel(anomalies, excel_buffer, 'Anomalies')
+        t.rows, t.bytes = len(anomalies), excel_buffer.getbuffer().nbytes
+
+    st.download_button(
+        label="📥 Download Anomalies as Excel",
+        data=excel_buffer.getvalue(),
+        file_name=f"availability_anomalies_{detector.last_date:%Y%m%d}.xlsx",
+        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    )
+
+# Page sections; only the selected one is executed (and loads its data) on each run
+SECTIONS = {
+    "📅 CDC Monthly Summary": show_monthly_summary,
+    "📈 Availability Daily Tracker": show_daily_tracker,
+    "📊 Availability Summary (INAP)": show_inap_summary,
+    "🚨 SLA Risk": show_sla_risk,
+    "⚠️ Anomalies": show_anomalies,
+}
+
+# Datasets each section needs before it can render
+SECTION_DATASETS = {
+    "📅 CDC Monthly Summary": ["po"],
+    "📈 Availability Daily Tracker": ["availability"],
+    "📊 Availability Summary (INAP)": ["availability"],
+    "🚨 SLA Risk": ["availability"],
+    "⚠️ Anomalies": ["availability"],
+}
 
-        # Warn if no data after filtering
-        if filtered_df.empty:
-            st.warning("No data available for selected filters.")
-        else:
-            # Ensure 'Date' is in datetime format
-            filtered_df['Date'] = pd.to_datetime(filtered_df['Date'], errors='coerce')
-            filtered_df['Month_Year'] = filtered_df['Date'].dt.to_period('M')
-
-            # Monthly average availability
-            monthly_summary = filtered_df.groupby(['Area', 'Regional', 'Site ID', 'Site Name', 'Target AVA', 'Month_Year']).agg(
-                avg_availability=('Availability', 'mean')
-            ).reset_index()
-
-            # Pivot table
-            monthly_summary_pivot = monthly_summary.pivot_table(
-                index=['Area', 'Regional', 'Site ID', 'Site Name', 'Target AVA'],
-                columns='Month_Year',
-                values='avg_availability'
-            ).reset_index()
-
-            # Format columns as 'Apr-25' etc.
-            def format_columns(columns):
-                formatted_columns = []
-                for col in columns:
-                    try:
-                        if isinstance(col, (str, pd.Timestamp)):
-                            period_col = pd.to_datetime(col).to_period('M')
-                            formatted_columns.append(period_col.strftime('%b-%y'))
-                        elif isinstance(col, pd.Period):
-                            formatted_columns.append(col.strftime('%b-%y'))
-                        else:
-                            formatted_columns.append(str(col))
-                    except Exception:
-                        formatted_columns.append(str(col))
-                return formatted_columns
-
-            monthly_summary_pivot = monthly_summary_pivot.round(2) 
-            monthly_summary_pivot.columns = format_columns(monthly_summary_pivot.columns)
-            monthly_summary_pivot.reset_index(drop=True, inplace=True)
-            monthly_summary_pivot.insert(0, 'No', range(1, len(monthly_summary_pivot) + 1))
-
-            def highlight_availability(row):
-                styles = []
-                target = row['Target AVA']
-                for i, col in enumerate(monthly_summary_pivot.columns):
-                    if col in ['Area', 'Regional', 'Site ID', 'Site Name', 'Target AVA']:
-                        styles.append('')  # No style for non-month columns
-                    else:
-                        val = row[col]
-                        if pd.isnull(val):
-                            styles.append('')
-                        elif val >= target:
-                            styles.append('background-color: #C4D79B; color: black')
-                        else:
-                            styles.append('background-color: #FFB7B7; color: black')
-                return styles
-
-            styled_df = monthly_summary_pivot.style.apply(highlight_availability, axis=1).format(precision=2)
-            
-            st.dataframe(styled_df, height=500)
+def show():
+    st.title("\U0001F4C5 CDC Availability")
 
-            # --- Download Button ---
-            excel_buffer = io.BytesIO()
-            with pd.ExcelWriter(excel_buffer, engine='xlsxwriter') as writer:
-                monthly_summary_pivot.to_excel(writer, index=False, sheet_name='Summary')
-
-                workbook  = writer.book
-                worksheet = writer.sheets['Summary']
-
-                # Define format for two decimal places
-                two_dec_format = workbook.add_format({'num_format': '0.00'})
-
-                # Apply format to data columns (starting from 6th column = index 5)
-                for col_num, value in enumerate(monthly_summary_pivot.columns.values):
-                    if col_num >= 5:  # skip Area, Regional, Site ID, Site Name, Target AVA
-                        worksheet.set_column(col_num, col_num, 12, two_dec_format)
-
-            st.download_button(
-                label="📥 Download Summary as Excel",
-                data=excel_buffer.getvalue(),
-                file_name="site_availability_summary.xlsx",
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-            )
\ No newline at end of file
+    selected_section = st.radio(
+        "Section", options=list(SECTIONS), horizontal=True,
+        label_visibility="collapsed", key="availability_section"
+    )
+    if require_datasets(*SECTION_DATASETS[selected_section]):
+        SECTIONS[selected_section]()
@@ -1,144 +1,245 @@
 # --- my_pages/dapot.py ---
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-from utils.data_loader import load_dapot_alpro_data
+from utils.data_loader import load_dapot_df, dataset_version, DAPOT_PATH
+from utils.figure_cache import cached_figure
+from utils.spatial_index import SiteSpatialIndex
+from utils.site_search import filter_site_options
+from utils.datasets import require_datasets
+from utils.perf import instrument
+from utils.query import filter_rows, active_filter
+
+# Below this map zoom level sites are drawn as server-side clusters
+CLUSTER_MAX_ZOOM = 7
+
+def build_status_donut(filtered_df):
+    import plotly.express as px
+
+    status_count = filtered_df["STATUS"].value_counts().reset_index()
+    status_count.columns = ["STATUS", "count"]  # Rename columns properly
+
+    status_chart = px.pie(
+        status_count,
+        names="STATUS",  # ✅ Use correct column name
+        values="count",  # ✅ Count of each status
+        hole=0.5,
+        color_discrete_sequence=px.colors.qualitative.Pastel
+    )
+    status_chart.update_traces(textinfo='value')  # or 'label+value' for both
+    return status_chart
+
+def build_class_donut(filtered_df):
+    import plotly.express as px
+
+    class_count = filtered_df["SITE CLASS"].value_counts().reset_index()
+    class_count.columns = ["SITE CLASS", "count"]
+    class_chart = px.pie(
+        class_count,
+        names="SITE CLASS",
+        values="count",
+        hole=0.5,
+        color_discrete_sequence=px.colors.qualitative.Set2
+    )
+    class_chart.update_traces(textinfo='value')  # or 'label+value' for both
+    return class_chart
+
+@st.fragment
+@instrument("page.dapot.site_details", kind="page")
+def show_site_details():
+    dapot_df = load_dapot_df()
+
+    st.subheader("🔍 Site Detail Viewer")
+
+    if not dapot_df.empty:
+        site_query = st.text_input("🔍 Search Site ID / Name", key="dapot_site_search")
+        site_ids = filter_site_options(site_query, sorted(dapot_df['SITE ID'].dropna().unique().tolist()))
+        selected_site = st.selectbox("Select Site ID", site_ids)
+
+        site_details = dapot_df[dapot_df['SITE ID'] == selected_site]
+
+        if not site_details.empty:
+            st.markdown(f"### Details for Site ID: `{selected_site}`")
+
+            # Extract first row info (assuming one row per site or using first record)
+            site_row = site_details.iloc[0]
+
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric("Area", site_row.get("AREA", "N/A"))
+            with col2:
+                st.metric("Regional", site_row.get("REGIONAL", "N/A"))
+            with col3:
+                st.metric("Status", site_row.get("STATUS", "N/A"))
+            # Second row of metrics
+            col4, col5, col6 = st.columns(3)
+            with col4:
+                st.metric("Kapasitas (KVA)", site_row.get("KAPASITAS (KVA)", "N/A"))
+            with col5:
+                st.metric("Kapasitas Batere (Bank)", site_row.get("KAPASITAS BATERE (BANK)", "N/A"))
+            with col6:
+                st.metric("Jumlah Modul Rectifier", site_row.get("JUMLAH MODUL RECTIFIER", "N/A"))
+
+            # Optionally show more info in expandable section
+            with st.expander("📄 Full Site Record"):
+                 st.dataframe(site_details, use_container_width=True)
+                #site_row = site_details.iloc[0]
+
+                #st.markdown(f"""
+                #```text
+                #Site ID     : {site_row.get("SITE ID", "N/A")}
+                #Site Name   : {site_row.get("SITE NAME", "N/A")}
+                #Site Class  : {site_row.get("SITE CLASS", "N/A")}
+                #Area        : {site_row.get("AREA", "N/A")}
+                #Regional    : {site_row.get("REGIONAL", "N/A")}
+                #""")
+        else:
+            st.warning("No data found for the selected Site ID.")
+    else:
+        st.info("Dapot Alpro data is empty or failed to load.")
+
+@st.fragment
+@instrument("page.dapot.dapot_table", kind="page")
+def show_dapot_table():
+    dapot_df = load_dapot_df()
+    dapot_version = dataset_version(DAPOT_PATH)
+
+    st.subheader("📋 Tabel Dapot Asset CDC")
+
+    # Filter UI (1 row, 3 columns)
+    col1, col2, col3 = st.columns(3)
+
+    with col1:
+        selected_area = st.selectbox("Area", options=["All"] + sorted(dapot_df["AREA"].dropna().unique().tolist()))
+
+    with col2:
+        if selected_area != "All":
+            regional_options = dapot_df[dapot_df["AREA"] == selected_area]["REGIONAL"].dropna().unique().tolist()
+        else:
+            regional_options = dapot_df["REGIONAL"].dropna().unique().tolist()
+        selected_regional = st.selectbox("Regional", options=["All"] + sorted(regional_options))
+
+    with col3:
+        filtered_for_sites = filter_rows(dapot_df, {
+            "AREA": active_filter(selected_area),
+            "REGIONAL": active_filter(selected_regional)
+        })
+
+        site_options = filtered_for_sites["SITE ID"].dropna().unique().tolist()
+        selected_site_id = st.selectbox("Site ID", options=["All"] + sorted(site_options))
+
+    # Apply filters to the main DataFrame
+    filtered_df = filter_rows(filtered_for_sites, {"SITE ID": active_filter(selected_site_id)})
+
+    dapot_filters = (selected_area, selected_regional, selected_site_id)
+    chart_col1, chart_col2, chart_col3 = st.columns(3)
+
+    with chart_col1:
+        st.markdown("#### 🟢 Status Distribution")
+        status_chart = cached_figure(
+            dapot_version, "status_donut", dapot_filters,
+            lambda: build_status_donut(filtered_df)
+        )
+        st.plotly_chart(status_chart, use_container_width=True)
+
+    with chart_col2:
+        st.markdown("#### 🟣 Site Class Distribution")
+        class_chart = cached_figure(
+            dapot_version, "class_donut", dapot_filters,
+            lambda: build_class_donut(filtered_df)
+        )
+        st.plotly_chart(class_chart, use_container_width=True)
+
+    with chart_col3:
+        st.markdown("#### 🔧 Add your chart here")
+        # Optional third chart (leave empty or add e.g. battery capacity bar, etc.)
+        pass
+
+    # Start the index from 1 instead of 0 (a new frame: filtered_df may be the shared cached one)
+    filtered_df = filtered_df.set_axis(pd.RangeIndex(1, len(filtered_df) + 1))
+
+    # Show filtered table
+    st.dataframe(filtered_df, use_container_width=True)
+
+# Built once per Dapot file version and shared by all sessions
+@st.cache_resource(max_entries=2)
+def get_spatial_index(dapot_version):
+    return SiteSpatialIndex(load_dapot_df(), lat_col="LATTITUDE", lon_col="LONGITUDE", id_col="SITE ID")
+
+@st.fragment
+@instrument("page.dapot.site_map", kind="page")
+def show_site_map():
+    st.subheader("🗺️ Peta Site CDC")
+
+    index = get_spatial_index(dataset_version(DAPOT_PATH))
+    if not len(index):
+        st.info("No site coordinates available in Dapot data.")
+        return
+
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        origin_site = st.selectbox("Outage Site ID", sorted(index.sites["SITE ID"].dropna().unique().tolist()))
+    with col2:
+        k = st.number_input("Nearest sites", min_value=1, max_value=50, value=5)
+    with col3:
+        radius_km = st.number_input("Radius (km)", min_value=1.0, max_value=1000.0, value=50.0, step=10.0)
+    with col4:
+        zoom = st.slider("Map zoom", min_value=3, max_value=12, value=4)
+
+    origin = index.sites[index.sites["SITE ID"] == origin_site].iloc[0]
+    lat, lon = origin["LATTITUDE"], origin["LONGITUDE"]
+
+    nearest = index.nearest(lat, lon, k=k + 1)
+    nearest = nearest[nearest["SITE ID"] != origin_site].head(k)
+    in_radius = index.within_radius(lat, lon, radius_km)
+
+    # Low zoom: clustered markers for all sites. High zoom: only the sites in view.
+    if zoom < CLUSTER_MAX_ZOOM:
+        markers = index.clusters(zoom)
+    else:
+        half_span = 180.0 / (2 ** zoom)
+        visible = index.within_bbox(lat - half_span, lon - 2 * half_span, lat + half_span, lon + 2 * half_span)
+        markers = pd.DataFrame({
+            "lat": visible["LATTITUDE"], "lon": visible["LONGITUDE"],
+            "count": 1, "label": visible["SITE ID"].astype(str)
+        })
+
+    import plotly.express as px
+
+    site_map = px.scatter_map(
+        markers, lat="lat", lon="lon", size="count", hover_name="label",
+        size_max=30, zoom=zoom, center=dict(lat=lat, lon=lon), height=550
+    )
+    site_map.add_scattermap(
+        lat=nearest["LATTITUDE"], lon=nearest["LONGITUDE"], mode="markers",
+        marker=dict(size=12, color="orange"), text=nearest["SITE ID"], name="Nearest"
+    )
+    site_map.add_scattermap(
+        lat=[lat], lon=[lon], mode="markers",
+        marker=dict(size=16, color="red"), text=[origin_site], name="Outage"
+    )
+    site_map.update_layout(margin=dict(l=0, r=0, t=0, b=0), legend=dict(orientation="h"))
+    st.plotly_chart(site_map, use_container_width=True)
+
+    display_cols = ["distance_km", "SITE ID", "SITE NAME", "AREA", "REGIONAL", "STATUS"]
+    st.markdown(f"#### 📍 {len(nearest)} Nearest Sites to `{origin_site}`")
+    st.dataframe(nearest[[c for c in display_cols if c in nearest.columns]].round({"distance_km": 1}), hide_index=True, use_container_width=True)
+
+    with st.expander(f"📡 {len(in_radius)} sites within {radius_km:.0f} km"):
+        st.dataframe(in_radius[[c for c in display_cols if c in in_radius.columns]].round({"distance_km": 1}), hide_index=True, use_container_width=True)
+
+# Page sections; only the selected one is executed on each run
+SECTIONS = {
+    "🔍 Site Details": show_site_details,
+    "📋 Tabel Dapot": show_dapot_table,
+    "🗺️ Peta Site": show_site_map,
+}
 
 def show():
-    dapot_df = load_dapot_alpro_data()
-
-    # Ensure column names are consistent
-    dapot_df.columns = dapot_df.columns.str.strip().str.upper()
-    # ✅ Add this cleaning line here
-    dapot_df['LATTITUDE'] = pd.to_numeric(dapot_df['LATTITUDE'].astype(str).str.replace("'", ""), errors='coerce')
-    dapot_df['LONGITUDE'] = pd.to_numeric(dapot_df['LONGITUDE'].astype(str).str.replace("'", ""), errors='coerce')
-    
     st.title("🏗️ Dapot Asset CDC")
 
-    tab1, tab2 = st.tabs(["🔍 Site Details", "📋 Tabel Dapot"])
-    with tab1:
-        st.subheader("🔍 Site Detail Viewer")
-
-        if not dapot_df.empty:
-            site_ids = sorted(dapot_df['SITE ID'].dropna().unique().tolist())
-            selected_site = st.selectbox("Select Site ID", site_ids)
-
-            site_details = dapot_df[dapot_df['SITE ID'] == selected_site]
-
-            if not site_details.empty:
-                st.markdown(f"### Details for Site ID: `{selected_site}`")
-
-                # Extract first row info (assuming one row per site or using first record)
-                site_row = site_details.iloc[0]
-
-                col1, col2, col3 = st.columns(3)
-                with col1:
-                    st.metric("Area", site_row.get("AREA", "N/A"))
-                with col2:
-                    st.metric("Regional", site_row.get("REGIONAL", "N/A"))
-                with col3:
-                    st.metric("Status", site_row.get("STATUS", "N/A"))
-                # Second row of metrics
-                col4, col5, col6 = st.columns(3)
-                with col4:
-                    st.metric("Kapasitas (KVA)", site_row.get("KAPASITAS (KVA)", "N/A"))
-                with col5:
-                    st.metric("Kapasitas Batere (Bank)", site_row.get("KAPASITAS BATERE (BANK)", "N/A"))
-                with col6:
-                    st.metric("Jumlah Modul Rectifier", site_row.get("JUMLAH MODUL RECTIFIER", "N/A"))
-
-                # Optionally show more info in expandable section
-                with st.expander("📄 Full Site Record"):
-                     st.dataframe(site_details, use_container_width=True)
-                    #site_row = site_details.iloc[0]
-
-                    #st.markdown(f"""
-                    #```text
-                    #Site ID     : {site_row.get("SITE ID", "N/A")}
-                    #Site Name   : {site_row.get("SITE NAME", "N/A")}
-                    #Site Class  : {site_row.get("SITE CLASS", "N/A")}
-                    #Area        : {site_row.get("AREA", "N/A")}
-                    #Regional    : {site_row.get("REGIONAL", "N/A")}
-                    #""")
-            else:
-                st.warning("No data found for the selected Site ID.")
-        else:
-            st.info("Dapot Alpro data is empty or failed to load.")
-
-    with tab2:
-        st.subheader("📋 Tabel Dapot Asset CDC")
-
-        # Filter UI (1 row, 3 columns)
-        col1, col2, col3 = st.columns(3)
-
-        with col1:
-            selected_area = st.selectbox("Area", options=["All"] + sorted(dapot_df["AREA"].dropna().unique().tolist()))
-        
-        with col2:
-            if selected_area != "All":
-                regional_options = dapot_df[dapot_df["AREA"] == selected_area]["REGIONAL"].dropna().unique().tolist()
-            else:
-                regional_options = dapot_df["REGIONAL"].dropna().unique().tolist()
-            selected_regional = st.selectbox("Regional", options=["All"] + sorted(regional_options))
-
-        with col3:
-            # Build filter step-by-step to avoid KeyError
-            filtered_for_sites = dapot_df
-            if selected_area != "All":
-                filtered_for_sites = filtered_for_sites[filtered_for_sites["AREA"] == selected_area]
-            if selected_regional != "All":
-                filtered_for_sites = filtered_for_sites[filtered_for_sites["REGIONAL"] == selected_regional]
-
-            site_options = filtered_for_sites["SITE ID"].dropna().unique().tolist()
-            selected_site_id = st.selectbox("Site ID", options=["All"] + sorted(site_options))
-
-        # Apply filters to the main DataFrame
-        filtered_df = dapot_df.copy()
-        if selected_area != "All":
-            filtered_df = filtered_df[filtered_df["AREA"] == selected_area]
-        if selected_regional != "All":
-            filtered_df = filtered_df[filtered_df["REGIONAL"] == selected_regional]
-        if selected_site_id != "All":
-            filtered_df = filtered_df[filtered_df["SITE ID"] == selected_site_id]
-
-        chart_col1, chart_col2, chart_col3 = st.columns(3)
-
-        with chart_col1:
-            st.markdown("#### 🟢 Status Distribution")
-            status_count = filtered_df["STATUS"].value_counts().reset_index()
-            status_count.columns = ["STATUS", "count"]  # Rename columns properly
-
-            status_chart = px.pie(
-                status_count,
-                names="STATUS",  # ✅ Use correct column name
-                values="count",  # ✅ Count of each status
-                hole=0.5,
-                color_discrete_sequence=px.colors.qualitative.Pastel
-            )
-            status_chart.update_traces(textinfo='value')  # or 'label+value' for both
-            st.plotly_chart(status_chart, use_container_width=True)
-
-        with chart_col2:
-            st.markdown("#### 🟣 Site Class Distribution")
-            class_count = filtered_df["SITE CLASS"].value_counts().reset_index()
-            class_count.columns = ["SITE CLASS", "count"]
-            class_chart = px.pie(
-                class_count,
-                names="SITE CLASS",
-                values="count",
-                hole=0.5,
-                color_discrete_sequence=px.colors.qualitative.Set2
-            )
-            status_chart.update_traces(textinfo='value')  # or 'label+value' for both
-            st.plotly_chart(class_chart, use_container_width=True)
-
-        with chart_col3:
-            st.markdown("#### 🔧 Add your chart here")
-            # Optional third chart (leave empty or add e.g. battery capacity bar, etc.)
-            pass
-
-        # Start the index from 1 instead of 0
-        filtered_df.index += 1
-
-        # Show filtered table
-        st.dataframe(filtered_df, use_container_width=True)
+    selected_section = st.radio(
+        "Section", options=list(SECTIONS), horizontal=True,
+        label_visibility="collapsed", key="dapot_section"
+    )
+    if require_datasets("dapot"):
+        SECTIONS[selected_section]()
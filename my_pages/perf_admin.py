@@ -0,0 +1,56 @@
+# --- my_pages/perf_admin.py ---
+# Hidden admin panel, opened with ?admin=perf&key=<admin key> (see ADMIN_KEY_ENV in app.py)
+import streamlit as st
+import pandas as pd
+from utils.perf import REGISTRY, PERCENTILES, METRICS_JSON_PATH, METRICS_PROM_PATH
+from utils.datasets import start_dataset_warmup, start_dataset_watcher
+
+def show():
+    st.title("⏱️ Performance Metrics")
+    st.caption(f"Rolling percentiles per metric. Also written to `{METRICS_JSON_PATH}` and `{METRICS_PROM_PATH}`.")
+
+    metrics = pd.DataFrame(REGISTRY.snapshot())
+    if metrics.empty:
+        st.info("No metrics recorded yet.")
+    else:
+        kinds = st.multiselect("Kind", options=sorted(metrics["kind"].unique()), default=[])
+        if kinds:
+            metrics = metrics[metrics["kind"].isin(kinds)]
+
+        # Seconds -> milliseconds for display
+        time_cols = ["mean_s", "max_s"] + [f"p{pct}_s" for pct in PERCENTILES]
+        display = metrics.drop(columns=["sum_s"]).sort_values("p90_s", ascending=False)
+        display[time_cols] = display[time_cols] * 1000
+        display = display.rename(columns={col: col[:-2] + " (ms)" for col in time_cols})
+        st.dataframe(
+            display, hide_index=True, use_container_width=True,
+            column_config={
+                col: st.column_config.NumberColumn(format="%.1f")
+                for col in display.columns if col.endswith("(ms)")
+            }
+        )
+
+    col1, col2 = st.columns(2)
+    with col1:
+        if st.button("💾 Write metrics files now"):
+            REGISTRY.write()
+            st.success("Metrics written.")
+    with col2:
+        if st.button("🗑️ Reset metrics"):
+            REGISTRY.reset()
+            st.rerun()
+
+    st.markdown("#### 🔥 Dataset warm-up")
+    st.dataframe(
+        pd.DataFrame.from_dict(start_dataset_warmup().status(), orient="index"),
+        use_container_width=True
+    )
+
+    watcher = start_dataset_watcher()
+    st.markdown("#### 🔄 Dataset reloads")
+    st.caption(f"Watching {len(watcher.paths)} files ({watcher.mode}).")
+    history = pd.DataFrame(watcher.history())
+    if history.empty:
+        st.info("No data file has changed since the server started.")
+    else:
+        st.dataframe(history.iloc[::-1], hide_index=True, use_container_width=True)
@@ -0,0 +1,109 @@
+# --- my_pages/site360.py ---
+import streamlit as st
+import pandas as pd
+import plotly.graph_objects as go
+from utils.site_index import get_site_join_index
+from utils.site_search import filter_site_options
+from utils.table_style import number_column_config, CDC_COLUMN_FORMATS
+from utils.datasets import require_datasets, DATASETS
+
+def first_value(*candidates, default="N/A"):
+    """First non-empty value from (DataFrame, column) pairs."""
+    for df, column in candidates:
+        if column in df.columns:
+            values = df[column].dropna()
+            if not values.empty:
+                return values.iloc[0]
+    return default
+
+def show():
+    st.title("🛰️ Site 360")
+
+    if not require_datasets(*DATASETS):
+        return
+
+    index = get_site_join_index()
+
+    col1, col2 = st.columns([1, 2])
+    with col1:
+        site_query = st.text_input("🔍 Search Site ID / Name", key="site360_search")
+    with col2:
+        site_keys = filter_site_options(site_query, index.site_keys)
+        selected_site = st.selectbox("Site ID", options=site_keys)
+
+    if not selected_site:
+        st.info("No site matches the search.")
+        return
+
+    # Indexed lookups into every dataset
+    master = index.lookup("site_master", selected_site)
+    dapot = index.lookup("dapot", selected_site)
+    po = index.lookup("po", selected_site)
+    ava = index.lookup("availability", selected_site)
+    refills = index.lookup("refills", selected_site)
+
+    site_name = first_value((master, "site_name"), (dapot, "Site Name"), (po, "Site Name"), (ava, "Site Name"), default="")
+    st.markdown(f"### `{selected_site}` - {site_name}")
+    st.caption("Found in: " + ", ".join(index.datasets_for(selected_site)))
+
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Area", first_value((master, "area"), (dapot, "Area"), (ava, "Area")))
+    with col2:
+        st.metric("Regional", first_value((master, "regional"), (dapot, "Regional"), (po, "Regional TI"), (ava, "Regional")))
+    with col3:
+        st.metric("Site Class", first_value((dapot, "Site Class"), (po, "Class Site"), (ava, "Site Class")))
+    with col4:
+        st.metric("Status", first_value((dapot, "STATUS"), (ava, "On Service / Cut OFF")))
+
+    # --- Assets ---
+    st.markdown("#### 🏗️ Assets (Dapot)")
+    if dapot.empty:
+        st.info("Site not found in Dapot data.")
+    else:
+        asset_row = dapot.iloc[0].dropna()
+        st.dataframe(
+            pd.DataFrame({"Field": asset_row.index, "Value": asset_row.astype(str).values}),
+            hide_index=True, use_container_width=True, height=300
+        )
+
+    # --- Daily availability ---
+    st.markdown("#### 📈 Daily Availability")
+    if ava.empty:
+        st.info("No daily availability data for this site.")
+    else:
+        ava = ava.sort_values("Date")
+        target_value = ava["Target AVA"].iloc[0]
+        fig = go.Figure()
+        fig.add_trace(go.Scattergl(x=ava["Date"], y=ava["Availability"], mode="lines+markers", name=selected_site))
+        fig.add_trace(go.Scattergl(
+            x=[ava["Date"].min(), ava["Date"].max()], y=[target_value] * 2,
+            mode="lines", name=f"Target: {target_value:.1f}%", line=dict(dash="dash", color="red")
+        ))
+        fig.update_layout(xaxis_title="Date", yaxis_title="Availability (%)", plot_bgcolor="white", height=350)
+        st.plotly_chart(fig, use_container_width=True)
+
+    # --- PO / penalty history ---
+    st.markdown("#### 💰 PO / Penalty History")
+    if po.empty:
+        st.info("No PO data for this site.")
+    else:
+        po_cols = [
+            "Month", "Year", "Nominal PO", "Class Site", "Target Availability (%)", "Avaibility",
+            "Persentase Penalty", "Nilai Penalty", "Nilai BAST dikurangi Penalty", "Ava Achievement"
+        ]
+        po = po.sort_values("Periode Tagihan (Awal)") if "Periode Tagihan (Awal)" in po.columns else po
+        st.dataframe(
+            po[[c for c in po_cols if c in po.columns]],
+            hide_index=True, use_container_width=True,
+            column_config=number_column_config(CDC_COLUMN_FORMATS)
+        )
+
+    # --- Refill history ---
+    st.markdown("#### ⛽ Riwayat Pengisian BBM")
+    if refills.empty:
+        st.info("No BBM refill records for this site.")
+    else:
+        refills = refills.sort_values("tanggal_pengisian", ascending=False)
+        refill_cols = ["tanggal_pengisian", "jumlah_pengisian_liter", "liter_per_hari"]
+        st.dataframe(refills[[c for c in refill_cols if c in refills.columns]], hide_index=True, use_container_width=True)
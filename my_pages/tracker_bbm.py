@@ -6,377 +6,371 @@ import os
 import base64
 import datetime
 import json
-import pytz
-from utils.drive_utils import upload_photo_to_drive, get_photo_download_link
-from utils.sheets_utils import append_row_to_sheet, read_sheet_as_dataframe
+from utils.drive_utils import upload_photo_to_drive
+from utils.bbm_store import append_refill
+from utils.data_loader import load_bbm_refill_data, load_bbm_data, load_site_master
+from utils.bbm_alerts import BBMAlertScheduler, load_latest_snapshots, crossed_thresholds
+from utils.site_index import clear_site_join_index
+from utils.datasets import require_datasets
+from utils.perf import instrument, timer
+from utils.query import filter_rows, active_filter
+from utils.reports import bbm_status_table, write_excel, BBM_STATUS_COLUMNS
 
-def show():
-    st.title("\u26FD Tracker Pengisian BBM")
-    tab1, tab2, tab3 = st.tabs(["📝 Form Pengisian BBM", "📊 Tracker Pengisian BBM", "🗂️ Riwayat Pengisian BBM"])
-    
-    # Cache the data loading function
-    @st.cache_data
-    def load_bbm_data():
-        sheet_id = "13A8ckogwxlMYDXKXrW84h0XkWOIbIMUWiePK6uTRzfc"
-        worksheet_name = "pengisian_bbm"
-        df_pengisian = read_sheet_as_dataframe(sheet_id, worksheet_name)
-        df_pengisian["tanggal_pengisian"] = pd.to_datetime(df_pengisian["tanggal_pengisian"], errors='coerce')
-    
-        site_master = pd.read_csv("all_site_master.csv")
-    
-        # Merge the two dataframes
-        df = pd.merge(df_pengisian, site_master, on="site_id", how="left")
-        
-        return df
-    
-    MAX_PHOTOS = 3
-    STATIC_PHOTO_DIR = "static/bbm_photos"
-    os.makedirs(STATIC_PHOTO_DIR, exist_ok=True)
+# One scheduler per server process keeps the fuel status snapshots up to date;
+# clearing the cache stops it before the next run starts a new one
+@st.cache_resource(on_release=lambda scheduler: scheduler.stop())
+def get_bbm_alert_scheduler():
+    return BBMAlertScheduler(load_bbm_refill_data).start()
 
-    # =========================
-    # TAB 1: FORM PENGISIAN BBM
-    # =========================
-    with tab1:
-        st.header("📝 Input Data Pengisian BBM")
-
-        try:
-            site_master = pd.read_csv("all_site_master.csv")
-            site_options = sorted(site_master['site_id'].unique().tolist())
-        except FileNotFoundError:
-            site_options = []
-
-        with st.form("form_pengisian"):
-            site_id = st.selectbox("Pilih Site ID", site_options) if site_options else st.text_input("Site ID")
-            tanggal_pengisian = st.date_input("Tanggal Pengisian", value=datetime.date.today())
-            jumlah_pengisian = st.number_input("Jumlah Pengisian (Liter)", min_value=0.0, step=10.0, format="%.2f")
-
-            uploaded_photos = st.file_uploader(
-                "Upload Foto Evidence (max 3, max size 2MB each)",
-                type=["jpg", "jpeg", "png"],
-                accept_multiple_files=True,
-                key="foto_pengisian"
-            )
+MAX_PHOTOS = 3
+STATIC_PHOTO_DIR = "static/bbm_photos"
+
+# Define helper to create Google Drive viewable URL
+def get_photo_download_link(file_id):
+    return f"https://drive.google.com/file/d/{file_id}/view?usp=sharing"
 
-            submitted = st.form_submit_button("Simpan")
-
-            if submitted:
-                if not site_id:
-                    st.warning("❗ Site ID tidak boleh kosong.")
-                elif jumlah_pengisian <= 0:
-                    st.warning("❗ Jumlah pengisian harus lebih dari 0 liter.")
-                elif not uploaded_photos:
-                    st.warning("❗ Harap upload minimal 1 foto sebagai bukti.")
-                elif len(uploaded_photos) > MAX_PHOTOS:
-                    st.warning(f"❗ Maksimum upload adalah {MAX_PHOTOS} foto.")
-                elif any(photo.size > 2 * 1024 * 1024 for photo in uploaded_photos):
-                    st.warning("❗ Ukuran setiap file harus maksimal 2MB.")
-                else:
-                    # 1. Upload photos to Google Drive and collect metadata
-                    folder_id = "1ih1JXOS6-BGfVPBT-vSMSg07XnBPuoME"  # set your Google Drive folder ID here
-
-                    uploaded_file_ids = []
-                    for i, photo in enumerate(uploaded_photos):
-                        photo_ext = photo.name.split(".")[-1]
-                        # Define timezone GMT+7
-                        tz = pytz.timezone('Asia/Bangkok')  # GMT+7 timezone
-                        # Get current time in GMT+7
-                        now_gmt7 = datetime.datetime.now(tz)
-                        timestamp = now_gmt7.strftime("%Y-%m-%d_%H-%M-%S")
-                        unique_suffix = f"{i+1}"
-                        photo_filename = f"{site_id}_{timestamp}_{unique_suffix}.{photo_ext}"
-                    
-                        file_id, web_link = upload_photo_to_drive(photo, photo_filename, folder_id)
-                        uploaded_file_ids.append({"filename": photo_filename, "file_id": file_id, "web_link": web_link})
-                    
-                        st.success(f"✅ Uploaded {photo_filename} to Google Drive")
-            
-                    new_row = {
-                        "site_id": site_id,
-                        "tanggal_pengisian": tanggal_pengisian.strftime("%Y-%m-%d"),
-                        "jumlah_pengisian_liter": jumlah_pengisian,
-                        "foto_evidence_drive": json.dumps(uploaded_file_ids),
-                        # Add more fields as needed
-                    }
-                               
-                    # 3. Append the new row to Google Sheets
-                    sheet_id = "13A8ckogwxlMYDXKXrW84h0XkWOIbIMUWiePK6uTRzfc"
-                    worksheet_name = "pengisian_bbm"
-                    
-                    # append_row_to_sheet(sheet_id, worksheet_name, row_list)
-                    append_row_to_sheet(sheet_id, worksheet_name, new_row)
-            
-                    st.success(f"✅ Data dan foto untuk site {site_id} berhasil disimpan.")
-                    st.cache_data.clear()
-                    st.rerun()
-
-    # Define helper to create Google Drive viewable URL
-    def get_photo_download_link(file_id):
-        return f"https://drive.google.com/file/d/{file_id}/view?usp=sharing"
-            
-    # Function to convert photo metadata JSON to clickable links
-    def get_photo_links_drive(foto_evidence_drive_json):
-        try:
-            if pd.isna(foto_evidence_drive_json):
-                return "-"
-            foto_list = json.loads(foto_evidence_drive_json)
-        except Exception:
+# Function to convert photo metadata JSON to clickable links
+def get_photo_links_drive(foto_evidence_drive_json):
+    try:
+        if pd.isna(foto_evidence_drive_json):
             return "-"
-    
-        links = []
-        for item in foto_list:
-            filename = item.get("filename", "photo")
-            file_id = item.get("file_id")
-            if file_id:
-                url = get_photo_download_link(file_id)
-                href = f'<a href="{url}" target="_blank">📷 {filename}</a>'
-                links.append(href)
-    
-        return "<br>".join(links) if links else "-"
-    # Tab 2: Dashboard Status BBM
-    with tab2:
-        st.header("📊 Tracker Pengisian BBM")
-    
-        try:
-            # Load data from Google Sheets and merge with site master
-            df = load_bbm_data()
-    
-            # Apply cascading filters
-            col1, col2, col3 = st.columns(3)
-            with col1:
-                area_options = df["area"].dropna().unique()
-                selected_area = st.selectbox("Pilih Area", options=["All"] + sorted(area_options.tolist()))
-            if selected_area != "All":
-                df = df[df["area"] == selected_area]
-    
-            with col2:
-                regional_options = df["regional"].dropna().unique()
-                if selected_area != "All":
-                    regional_options = df[df["area"] == selected_area]["regional"].dropna().unique()
-                selected_regional = st.selectbox("Pilih Regional", options=["All"] + sorted(regional_options.tolist()))
-            if selected_regional != "All":
-                df = df[df["regional"] == selected_regional]
-    
-            with col3:
-                site_options = df["site_id"].dropna().unique()
-                if selected_regional != "All":
-                    site_options = df[df["regional"] == selected_regional]["site_id"].dropna().unique()
-                selected_site = st.selectbox("Pilih Site ID", options=["All"] + sorted(site_options.tolist()))
-            if selected_site != "All":
-                df = df[df["site_id"] == selected_site]
-    
-            # Convert numeric columns and datetime
-            df["jumlah_pengisian_liter"] = pd.to_numeric(df["jumlah_pengisian_liter"], errors="coerce")
-            df["liter_per_hari"] = pd.to_numeric(df["liter_per_hari"], errors="coerce")
-            df["tanggal_pengisian"] = pd.to_datetime(df["tanggal_pengisian"], errors='coerce')
-    
-            # Process latest record per site_id
-            df_latest = (
-                df.sort_values("tanggal_pengisian", ascending=False)
-                  .groupby("site_id", as_index=False)
-                  .first()
-            )
-    
-            # Calculate tanggal_habis based on usage rate
-            df_latest["tanggal_habis"] = df_latest["tanggal_pengisian"] + pd.to_timedelta(
-                df_latest["jumlah_pengisian_liter"] / df_latest["liter_per_hari"], unit="D"
+        foto_list = json.loads(foto_evidence_drive_json)
+    except Exception:
+        return "-"
+
+    links = []
+    for item in foto_list:
+        filename = item.get("filename", "photo")
+        file_id = item.get("file_id")
+        if file_id:
+            url = get_photo_download_link(file_id)
+            href = f'<a href="{url}" target="_blank">📷 {filename}</a>'
+            links.append(href)
+
+    return "<br>".join(links) if links else "-"
+
+@st.fragment
+@instrument("page.tracker_bbm.form", kind="page")
+def show_form():
+    st.header("📝 Input Data Pengisian BBM")
+
+    try:
+        site_master = load_site_master()
+        site_options = sorted(site_master['site_id'].unique().tolist())
+    except FileNotFoundError:
+        site_options = []
+
+    with st.form("form_pengisian"):
+        site_id = st.selectbox("Pilih Site ID", site_options) if site_options else st.text_input("Site ID")
+        tanggal_pengisian = st.date_input("Tanggal Pengisian", value=datetime.date.today())
+        jumlah_pengisian = st.number_input("Jumlah Pengisian (Liter)", min_value=0.0, step=10.0, format="%.2f")
+
+        uploaded_photos = st.file_uploader(
+            "Upload Foto Evidence (max 3, max size 2MB each)",
+            type=["jpg", "jpeg", "png"],
+            accept_multiple_files=True,
+            key="foto_pengisian"
+        )
+
+        submitted = st.form_submit_button("Simpan")
+
+        if submitted:
+            if not site_id:
+                st.warning("❗ Site ID tidak boleh kosong.")
+            elif jumlah_pengisian <= 0:
+                st.warning("❗ Jumlah pengisian harus lebih dari 0 liter.")
+            elif not uploaded_photos:
+                st.warning("❗ Harap upload minimal 1 foto sebagai bukti.")
+            elif len(uploaded_photos) > MAX_PHOTOS:
+                st.warning(f"❗ Maksimum upload adalah {MAX_PHOTOS} foto.")
+            elif any(photo.size > 2 * 1024 * 1024 for photo in uploaded_photos):
+                st.warning("❗ Ukuran setiap file harus maksimal 2MB.")
+            else:
+                # 1. Upload photos to Google Drive and collect metadata
+                folder_id = "1ih1JXOS6-BGfVPBT-vSMSg07XnBPuoME"  # set your Google Drive folder ID here
+
+                import pytz
+
+                uploaded_file_ids = []
+                for i, photo in enumerate(uploaded_photos):
+                    photo_ext = photo.name.split(".")[-1]
+                    # Define timezone GMT+7
+                    tz = pytz.timezone('Asia/Bangkok')  # GMT+7 timezone
+                    # Get current time in GMT+7
+                    now_gmt7 = datetime.datetime.now(tz)
+                    timestamp = now_gmt7.strftime("%Y-%m-%d_%H-%M-%S")
+                    unique_suffix = f"{i+1}"
+                    photo_filename = f"{site_id}_{timestamp}_{unique_suffix}.{photo_ext}"
+
+                    file_id, web_link = upload_photo_to_drive(photo, photo_filename, folder_id)
+                    uploaded_file_ids.append({"filename": photo_filename, "file_id": file_id, "web_link": web_link})
+
+                    st.success(f"✅ Uploaded {photo_filename} to Google Drive")
+
+                new_row = {
+                    "site_id": site_id,
+                    "tanggal_pengisian": tanggal_pengisian.strftime("%Y-%m-%d"),
+                    "jumlah_pengisian_liter": jumlah_pengisian,
+                    "foto_evidence_drive": json.dumps(uploaded_file_ids),
+                    # Add more fields as needed
+                }
+
+                # 3. Append the new row to the refill store (Google Sheets or local)
+                append_refill(new_row)
+
+                st.success(f"✅ Data dan foto untuk site {site_id} berhasil disimpan.")
+                load_bbm_data.clear()
+                clear_site_join_index()
+                # Recompute the status snapshot so the tracker and the KPI header show the new refill
+                get_bbm_alert_scheduler().run_once()
+                st.rerun()
+
+# Tab 2: Dashboard Status BBM
+@st.fragment
+@instrument("page.tracker_bbm.tracker", kind="page")
+def show_tracker():
+    st.header("📊 Tracker Pengisian BBM")
+
+    try:
+        # Read the precomputed status snapshot instead of recomputing it per session
+        scheduler = get_bbm_alert_scheduler()
+        computed_at, df_latest, df_previous = load_latest_snapshots(scheduler.snapshot_dir)
+        if df_latest is None:
+            scheduler.run_once()
+            computed_at, df_latest, df_previous = load_latest_snapshots(scheduler.snapshot_dir)
+
+        st.caption(f"Status dihitung pada {computed_at:%Y-%m-%d %H:%M:%S}")
+        crossed = crossed_thresholds(df_previous, df_latest)
+
+        # Apply cascading filters
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            area_options = df_latest["area"].dropna().unique()
+            selected_area = st.selectbox("Pilih Area", options=["All"] + sorted(area_options.tolist()))
+        if selected_area != "All":
+            df_latest = df_latest[df_latest["area"] == selected_area]
+            crossed = crossed[crossed["area"] == selected_area]
+
+        with col2:
+            regional_options = df_latest["regional"].dropna().unique()
+            selected_regional = st.selectbox("Pilih Regional", options=["All"] + sorted(regional_options.tolist()))
+        if selected_regional != "All":
+            df_latest = df_latest[df_latest["regional"] == selected_regional]
+            crossed = crossed[crossed["regional"] == selected_regional]
+
+        with col3:
+            site_options = df_latest["site_id"].dropna().unique()
+            selected_site = st.selectbox("Pilih Site ID", options=["All"] + sorted(site_options.tolist()))
+        if selected_site != "All":
+            df_latest = df_latest[df_latest["site_id"] == selected_site]
+            crossed = crossed[crossed["site_id"] == selected_site]
+
+        # Sites that crossed the 80% / 90% threshold since the previous snapshot
+        if not crossed.empty:
+            st.warning(f"⚠️ {len(crossed)} site melewati batas BBM sejak snapshot sebelumnya")
+            st.dataframe(
+                crossed[["area", "regional", "site_id", "site_name", "previous_status_bbm", "status_bbm"]],
+                hide_index=True,
+                use_container_width=True
             )
-    
-            # Calculate liters used and percentage used
-            hari_berjalan = (pd.to_datetime("today") - df_latest["tanggal_pengisian"]).dt.days
-            df_latest["liter_terpakai"] = hari_berjalan * df_latest["liter_per_hari"]
-            df_latest["persentase_float"] = df_latest["liter_terpakai"] / df_latest["jumlah_pengisian_liter"]
-            df_latest["persentase_terpakai"] = df_latest["persentase_float"].apply(
-                lambda x: f"{x:.2%}" if pd.notnull(x) else "-"
+
+        df_latest = bbm_status_table(df_latest)
+
+        # Ensure 'foto_evidence_drive' column exists
+        if "foto_evidence_drive" not in df_latest.columns:
+            df_latest["foto_evidence_drive"] = None
+
+        # Convert photo metadata JSON into clickable links
+        df_latest["foto_evidence"] = df_latest["foto_evidence_drive"].apply(get_photo_links_drive)
+
+        # Columns to display
+        display_cols = BBM_STATUS_COLUMNS + ["foto_evidence"]
+        display_cols = [col for col in display_cols if col in df_latest.columns]
+        df_display = df_latest[display_cols]
+        df_display["foto_evidence"] = df_display["foto_evidence"].fillna("")
+
+        # Add row number
+        df_display.reset_index(drop=True, inplace=True)
+        df_display.insert(0, "No.", df_display.index + 1)
+
+        # Show styled table with photo links clickable
+        st.markdown(
+            df_display.to_html(escape=False, index=False),
+            unsafe_allow_html=True
+        )
+
+        # Export Excel without photo links
+        export_cols = [col for col in display_cols if col != "foto_evidence"]
+        with timer("export.tracker_bbm.tracker", kind="export") as t:
+            excel_buffer = BytesIO()
+            write_excel(df_latest[export_cols], excel_buffer, "BBM Data")
+            t.rows, t.bytes = len(df_latest), excel_buffer.getbuffer().nbytes
+
+        st.download_button(
+            label="📥 Export Data as Excel File",
+            data=excel_buffer.getvalue(),
+            file_name="bbm_data.xlsx",
+            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        )
+
+    except Exception as e:
+        st.warning("Gagal menampilkan dashboard: " + str(e))
+
+# Tab 3: Riwayat Pengisian BBM
+@st.fragment
+@instrument("page.tracker_bbm.history", kind="page")
+def show_history():
+    st.header("🗂️ Riwayat Pengisian BBM")
+
+    try:
+        # Call the cached function to load the merged data
+        df_hist = load_bbm_data()
+
+        # Buat tiga kolom untuk filter sejajar dalam satu baris
+        col1, col2, col3 = st.columns(3)
+
+        # Filter Area
+        with col1:
+            area_options = df_hist["area"].dropna().unique()
+            selected_area = st.selectbox(
+                "Pilih Area", 
+                options=["All"] + sorted(area_options.tolist()), 
+                key="select_area"
             )
-    
-            # Define status column with emojis
-            def warnacol(row):
-                if row["persentase_float"] >= 0.9:
-                    return "🔴 Segera Isi BBM (90%+)"
-                elif row["persentase_float"] >= 0.8:
-                    return "🟠 Peringatan BBM Low (80%+)"
-                else:
-                    return "🟢 Aman"
-    
-            df_latest["status_bbm"] = df_latest.apply(warnacol, axis=1)
-            df_latest["tanggal_pengisian"] = df_latest["tanggal_pengisian"].dt.date
-            df_latest["tanggal_habis"] = df_latest["tanggal_habis"].dt.date
-            
-            # Ensure 'foto_evidence_drive' column exists
-            if "foto_evidence_drive" not in df_latest.columns:
-                df_latest["foto_evidence_drive"] = None
-                       
-            # Convert photo metadata JSON into clickable links
-            df_latest["foto_evidence"] = df_latest["foto_evidence_drive"].apply(get_photo_links_drive)
-            
-            # Columns to display
-            display_cols = [
-                "area", "regional", "site_id", "site_name", "tanggal_pengisian",
-                "jumlah_pengisian_liter", "liter_per_hari", "liter_terpakai",
-                "persentase_terpakai", "tanggal_habis", "status_bbm", "foto_evidence"
-            ]
-            display_cols = [col for col in display_cols if col in df_latest.columns]
-            df_display = df_latest[display_cols].copy()
-            df_display["foto_evidence"] = df_display["foto_evidence"].fillna("")
-            
-            # Add row number
-            df_display.reset_index(drop=True, inplace=True)
-            df_display.insert(0, "No.", df_display.index + 1)
-            
-            # Show styled table with photo links clickable
-            st.markdown(
-                df_display.to_html(escape=False, index=False),
-                unsafe_allow_html=True
+
+        # Apply Area filter
+        df_hist = filter_rows(df_hist, {"area": active_filter(selected_area)})
+
+        # Filter Regional (based on Area filter if applied)
+        with col2:
+            regional_options = df_hist["regional"].dropna().unique()
+            selected_regional = st.selectbox(
+                "Pilih Regional", 
+                options=["All"] + sorted(regional_options.tolist()), 
+                key="select_regional"
             )
 
-            # Export Excel without photo links
-            export_cols = [col for col in display_cols if col != "foto_evidence"]
-            excel_buffer = BytesIO()
-            with pd.ExcelWriter(excel_buffer, engine="xlsxwriter") as writer:
-                df_latest[export_cols].to_excel(writer, index=False, sheet_name="BBM Data")
-    
-            st.download_button(
-                label="📥 Export Data as Excel File",
-                data=excel_buffer.getvalue(),
-                file_name="bbm_data.xlsx",
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        # Apply Regional filter
+        df_hist = filter_rows(df_hist, {"regional": active_filter(selected_regional)})
+
+        # Filter Site ID (based on Area and Regional filters if applied)
+        with col3:
+            site_options = df_hist["site_id"].dropna().unique()
+            selected_site = st.selectbox(
+                "Pilih Site ID", 
+                options=["All"] + sorted(site_options.tolist()), 
+                key="select_site"
             )
-    
-        except Exception as e:
-            st.warning("Gagal menampilkan dashboard: " + str(e))
-    
-    # Tab 3: Riwayat Pengisian BBM
-    with tab3:
-        st.header("🗂️ Riwayat Pengisian BBM")
-
-        try:
-            # Call the cached function to load the merged data
-            df_hist = load_bbm_data()
-
-            # Buat tiga kolom untuk filter sejajar dalam satu baris
-            col1, col2, col3 = st.columns(3)
-
-            # Filter Area
-            with col1:
-                area_options = df_hist["area"].dropna().unique()
-                selected_area = st.selectbox(
-                    "Pilih Area", 
-                    options=["All"] + sorted(area_options.tolist()), 
-                    key="select_area"
-                )
-
-            # Apply Area filter
-            if selected_area != "All":
-                df_hist = df_hist[df_hist["area"] == selected_area]
-
-            # Filter Regional (based on Area filter if applied)
-            with col2:
-                regional_options = df_hist["regional"].dropna().unique()
-                selected_regional = st.selectbox(
-                    "Pilih Regional", 
-                    options=["All"] + sorted(regional_options.tolist()), 
-                    key="select_regional"
-                )
-
-            # Apply Regional filter
-            if selected_regional != "All":
-                df_hist = df_hist[df_hist["regional"] == selected_regional]
-
-            # Filter Site ID (based on Area and Regional filters if applied)
-            with col3:
-                site_options = df_hist["site_id"].dropna().unique()
-                selected_site = st.selectbox(
-                    "Pilih Site ID", 
-                    options=["All"] + sorted(site_options.tolist()), 
-                    key="select_site"
-                )
-
-            # Apply Site ID filter
-            if selected_site != "All":
-                df_hist = df_hist[df_hist["site_id"] == selected_site]
-
-            # Konversi kolom numerik
-            df_hist["jumlah_pengisian_liter"] = pd.to_numeric(df_hist["jumlah_pengisian_liter"], errors="coerce")
-
-            # Urutkan berdasarkan tanggal_pengisian (terbaru di atas) dan site_id
-            df_hist = df_hist.sort_values(by=["tanggal_pengisian", "site_id"], ascending=[False, True])
-
-            # Format jadi hanya tanggal (untuk ditampilkan)
-            df_hist["tanggal_pengisian"] = df_hist["tanggal_pengisian"].dt.date
-
-            # Generate foto_evidence links column
-            if "foto_evidence_drive" in df_hist.columns:
-                df_hist["foto_evidence"] = df_hist["foto_evidence_drive"].apply(get_photo_links_drive)
-            else:
-                df_hist["foto_evidence"] = ""
-            
-            # st.dataframe(df_hist[["area", "regional", "site_id", "site_name", "tanggal_pengisian", "jumlah_pengisian_liter", "foto_evidence_drive"]])
-
-            # Build the HTML table
-            html_table = """
-            <style>
-                table {
-                    width: 100%;
-                    border-collapse: collapse;
-                    font-family: sans-serif;
-                }
-                th, td {
-                    text-align: left;
-                    padding: 8px;
-                    border: 1px solid #ddd;
-                    vertical-align: top;
-                }
-                tr:nth-child(even) {
-                    background-color: #f9f9f9;
-                }
-                a {
-                    color: #1f77b4;
-                    text-decoration: none;
-                }
-            </style>
-            <h4>📸 Tabel Riwayat Pengisian BBM (dengan Foto Evidence)</h4>
-            <table>
-                <thead>
-                    <tr>
-                        <th>Site ID</th>
-                        <th>Tanggal</th>
-                        <th>Jumlah Pengisian (L)</th>
-                        <th>Foto Evidence</th>
-                    </tr>
-                </thead>
-                <tbody>
-            """
-            
-            # Append rows without leading tabs/spaces
-            for _, row in df_hist.iterrows():
-                foto = row["foto_evidence"] if row["foto_evidence"] else "-"
-                html_table += f"""<tr>
-                    <td>{row['site_id']}</td>
-                    <td>{row['tanggal_pengisian']}</td>
-                    <td>{row['jumlah_pengisian_liter']}</td>
-                    <td>{foto}</td>
+
+        # Apply Site ID filter
+        df_hist = filter_rows(df_hist, {"site_id": active_filter(selected_site)})
+
+        # Urutkan berdasarkan tanggal_pengisian (terbaru di atas) dan site_id
+        df_hist = df_hist.sort_values(by=["tanggal_pengisian", "site_id"], ascending=[False, True])
+
+        # Format jadi hanya tanggal (untuk ditampilkan)
+        df_hist["tanggal_pengisian"] = df_hist["tanggal_pengisian"].dt.date
+
+        # Generate foto_evidence links column
+        if "foto_evidence_drive" in df_hist.columns:
+            df_hist["foto_evidence"] = df_hist["foto_evidence_drive"].apply(get_photo_links_drive)
+        else:
+            df_hist["foto_evidence"] = ""
+
+        # st.dataframe(df_hist[["area", "regional", "site_id", "site_name", "tanggal_pengisian", "jumlah_pengisian_liter", "foto_evidence_drive"]])
+
+        # Build the HTML table
+        html_table = """
+        <style>
+            table {
+                width: 100%;
+                border-collapse: collapse;
+                font-family: sans-serif;
+            }
+            th, td {
+                text-align: left;
+                padding: 8px;
+                border: 1px solid #ddd;
+                vertical-align: top;
+            }
+            tr:nth-child(even) {
+                background-color: #f9f9f9;
+            }
+            a {
+                color: #1f77b4;
+                text-decoration: none;
+            }
+        </style>
+        <h4>📸 Tabel Riwayat Pengisian BBM (dengan Foto Evidence)</h4>
+        <table>
+            <thead>
+                <tr>
+                    <th>Site ID</th>
+                    <th>Tanggal</th>
+                    <th>Jumlah Pengisian (L)</th>
+                    <th>Foto Evidence</th>
                 </tr>
-                """
-            
-            html_table += "</tbody></table>"
-            
-            # Render in Streamlit
-            st.markdown(html_table, unsafe_allow_html=True)
-            
-            # Create an Excel file from the DataFrame
+            </thead>
+            <tbody>
+        """
+
+        # Append rows without leading tabs/spaces
+        for _, row in df_hist.iterrows():
+            foto = row["foto_evidence"] if row["foto_evidence"] else "-"
+            html_table += f"""<tr>
+                <td>{row['site_id']}</td>
+                <td>{row['tanggal_pengisian']}</td>
+                <td>{row['jumlah_pengisian_liter']}</td>
+                <td>{foto}</td>
+            </tr>
+            """
+
+        html_table += "</tbody></table>"
+
+        # Render in Streamlit
+        st.markdown(html_table, unsafe_allow_html=True)
+
+        # Create an Excel file from the DataFrame
+        with timer("export.tracker_bbm.history", kind="export") as t:
             excel_buffer = BytesIO()
             with pd.ExcelWriter(excel_buffer, engine="xlsxwriter") as writer:
                 df_hist[[
                     "area", "regional", "site_id", "site_name", "tanggal_pengisian", "jumlah_pengisian_liter"
                 ]].to_excel(writer, index=False, sheet_name="Riwayat BBM")
+            t.rows, t.bytes = len(df_hist), excel_buffer.getbuffer().nbytes
 
-            # Add download button for Excel file
-            st.download_button(
-                label="Export Data as Excel File",
-                data=excel_buffer.getvalue(),
-                file_name="riwayat_bbm.xlsx",
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-            )
+        # Add download button for Excel file
+        st.download_button(
+            label="Export Data as Excel File",
+            data=excel_buffer.getvalue(),
+            file_name="riwayat_bbm.xlsx",
+            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        )
+
+    except Exception as e:
+        st.warning("Gagal menampilkan riwayat pengisian: " + str(e))
+
+# Page sections; only the selected one is executed on each run
+SECTIONS = {
+    "📝 Form Pengisian BBM": show_form,
+    "📊 Tracker Pengisian BBM": show_tracker,
+    "🗂️ Riwayat Pengisian BBM": show_history,
+}
+
+# Datasets each section needs before it can render (the tracker reads status snapshots)
+SECTION_DATASETS = {
+    "📝 Form Pengisian BBM": ["site_master"],
+    "📊 Tracker Pengisian BBM": [],
+    "🗂️ Riwayat Pengisian BBM": ["refills"],
+}
+
+def show():
+    st.title("\u26FD Tracker Pengisian BBM")
+    os.makedirs(STATIC_PHOTO_DIR, exist_ok=True)
 
-        except Exception as e:
-            st.warning("Gagal menampilkan riwayat pengisian: " + str(e))
+    selected_section = st.radio(
+        "Section", options=list(SECTIONS), horizontal=True,
+        label_visibility="collapsed", key="bbm_section"
+    )
+    if require_datasets(*SECTION_DATASETS[selected_section]):
+        SECTIONS[selected_section]()
@@ -29,4 +29,7 @@ def show_sidebar():
         if st.button("🏗️ Dapot Asset CDC", use_container_width=True):
             st.session_state.page = "🏗️ Dapot Asset CDC"
 
+        if st.button("🛰️ Site 360", use_container_width=True):
+            st.session_state.page = "🛰️ Site 360"
+
     return st.session_state.page
@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+
+from utils.anomaly import AnomalyDetector, BASELINE_DAYS, MIN_BASELINE_DAYS, MIN_DROP, MIN_STD, Z_THRESHOLD
+
+def make_melted(days=90, sites=6, seed=7):
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range("2025-01-01", periods=days, freq="D")
+    rows = []
+    for s in range(sites):
+        values = np.clip(rng.normal(99.0, 0.8, days), 0, 100)
+        values[rng.choice(days, 4, replace=False)] -= rng.uniform(5, 40, 4)
+        values[rng.choice(days, 3, replace=False)] = np.nan
+        for date, value in zip(dates, values):
+            rows.append({
+                "Site ID": f"SITE{s:02d}", "Site Name": f"Site {s}", "Area": "Area 1", "Regional": "R1",
+                "Site Class": "Gold", "Date": date, "Availability": value,
+            })
+    return pd.DataFrame(rows)
+
+def oracle_anomalies(melted_df):
+    """Anomalous (site, day, z-score), scored with a plain loop over every site-day."""
+    matrix = melted_df.pivot(index="Site ID", columns="Date", values="Availability")
+    matrix = matrix.reindex(columns=pd.date_range(matrix.columns.min(), matrix.columns.max(), freq="D"))
+    found = []
+    for site_id, row in matrix.iterrows():
+        values = row.to_numpy(dtype="float64")
+        for t, value in enumerate(values):
+            window = values[max(t - BASELINE_DAYS, 0):t]
+            window = window[~np.isnan(window)]
+            if np.isnan(value) or len(window) < MIN_BASELINE_DAYS:
+                continue
+            z = (value - window.mean()) / max(window.std(), MIN_STD)
+            if z <= -Z_THRESHOLD and window.mean() - value >= MIN_DROP:
+                found.append((site_id, matrix.columns[t], z))
+    return sorted(found)
+
+def detected(detector):
+    anomalies = detector.anomalies
+    return sorted(zip(anomalies["Site ID"], anomalies["Date"], anomalies["Z-Score"]))
+
+def assert_matches_oracle(detector, melted_df):
+    expected = oracle_anomalies(melted_df)
+    actual = detected(detector)
+    assert expected, "the synthetic data should contain anomalies"
+    assert [key[:2] for key in actual] == [key[:2] for key in expected]
+    np.testing.assert_allclose([key[2] for key in actual], [key[2] for key in expected], rtol=1e-9)
+
+def test_append_only_updates_match_a_full_recompute():
+    melted = make_melted()
+    cutoff = melted["Date"].min() + pd.Timedelta(days=59)
+
+    detector = AnomalyDetector()
+    detector.update(melted[melted["Date"] <= cutoff])
+    assert_matches_oracle(detector, melted[melted["Date"] <= cutoff])
+
+    detector.update(melted)
+    assert detector.days_scored == 90
+    assert_matches_oracle(detector, melted)
+
+def test_corrected_workbook_is_rescanned():
+    melted = make_melted()
+    detector = AnomalyDetector()
+    detector.update(melted)
+
+    corrected = melted.copy()
+    day = corrected["Date"] == corrected["Date"].min() + pd.Timedelta(days=40)
+    corrected.loc[day & (corrected["Site ID"] == "SITE03"), "Availability"] = 20.0
+    detector.update(corrected)
+
+    assert_matches_oracle(detector, corrected)
+    assert ("SITE03", corrected.loc[day, "Date"].iloc[0]) in [key[:2] for key in detected(detector)]
@@ -0,0 +1,52 @@
+import time
+
+import pandas as pd
+
+from utils.bbm_store import SQLiteRefillStore, MirroredRefillStore
+
+def write_seed_csv(tmp_path):
+    path = tmp_path / "pengisian_bbm_streamlit.csv"
+    path.write_text("site_id,tanggal_pengisian,jumlah_pengisian_liter\nBKG675,01-Jan-25,500\nTBH111,05-Feb-25,250.5\n")
+    return str(path)
+
+class FailingStore:
+    def __init__(self):
+        self.rows = []
+        self.fail = True
+
+    def append(self, row):
+        if self.fail:
+            raise ConnectionError("offline")
+        self.rows.append(row)
+
+    def close(self):
+        pass
+
+def test_values_read_back_after_seeding_and_appending(tmp_path):
+    store = SQLiteRefillStore(str(tmp_path / "refills.sqlite"), seed_csv=write_seed_csv(tmp_path))
+    store.append({"site_id": " KEP006 ", "tanggal_pengisian": "2025-10-05", "jumlah_pengisian_liter": "300"})
+
+    df = store.read()
+    assert df["site_id"].tolist() == ["BKG675", "TBH111", "KEP006"]
+    assert df["tanggal_pengisian"].tolist() == ["2025-01-01", "2025-02-05", "2025-10-05"]
+    assert pd.to_numeric(df["jumlah_pengisian_liter"]).tolist() == [500.0, 250.5, 300.0]
+    assert store.read(site_id="KEP006", since="2025-10-01")["jumlah_pengisian_liter"].tolist() == [300.0]
+
+def test_mirror_outbox_survives_restart(tmp_path):
+    path = str(tmp_path / "refills.sqlite")
+    mirror = FailingStore()
+    store = MirroredRefillStore(SQLiteRefillStore(path, seed_csv=None), mirror, retry_seconds=60)
+    store.append({"site_id": "BKG675", "tanggal_pengisian": "2025-10-05", "jumlah_pengisian_liter": 120})
+    assert store.pending() == 1
+    store.close()
+
+    mirror.fail = False
+    store = MirroredRefillStore(SQLiteRefillStore(path, seed_csv=None), mirror, retry_seconds=60)
+    deadline = time.monotonic() + 5
+    while store.pending() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert store.pending() == 0
+    assert mirror.rows == [{
+        "site_id": "BKG675", "tanggal_pengisian": "2025-10-05", "jumlah_pengisian_liter": 120.0, "foto_evidence_drive": "",
+    }]
+    store.close()
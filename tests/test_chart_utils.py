@@ -0,0 +1,54 @@
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.chart_utils import lttb_downsample, downsample_series
+
+def reference_lttb(x, y, n_out):
+    """Largest-triangle-three-buckets as published (Steinarsson, 2013), one point at a time."""
+    n = len(x)
+    every = (n - 2) / (n_out - 2)
+    kept = [0]
+    a = 0
+    for i in range(n_out - 2):
+        avg_start = math.floor((i + 1) * every) + 1
+        avg_end = min(math.floor((i + 2) * every) + 1, n)
+        avg_x = sum(x[avg_start:avg_end]) / (avg_end - avg_start)
+        avg_y = sum(y[avg_start:avg_end]) / (avg_end - avg_start)
+
+        best, best_area = None, -1.0
+        for j in range(math.floor(i * every) + 1, math.floor((i + 1) * every) + 1):
+            area = abs((x[a] - avg_x) * (y[j] - y[a]) - (x[a] - x[j]) * (avg_y - y[a]))
+            if area > best_area:
+                best, best_area = j, area
+        kept.append(best)
+        a = best
+    kept.append(n - 1)
+    return kept
+
+@pytest.mark.parametrize("n, n_out", [(10, 3), (100, 7), (1000, 50), (1237, 113), (5000, 400)])
+def test_lttb_matches_the_reference(n, n_out):
+    rng = np.random.default_rng(n)
+    x = np.sort(rng.uniform(0, 1000, n))
+    y = np.cumsum(rng.normal(0, 1, n))
+
+    kept = lttb_downsample(x, y, n_out)
+    assert kept.tolist() == reference_lttb(x.tolist(), y.tolist(), n_out)
+
+def test_lttb_keeps_everything_when_not_downsampling():
+    assert lttb_downsample(np.arange(5), np.arange(5), 5).tolist() == [0, 1, 2, 3, 4]
+    assert lttb_downsample(np.arange(5), np.arange(5), 2).tolist() == [0, 1, 2, 3, 4]
+
+def test_downsample_series_drops_missing_values_and_keeps_dates():
+    x = pd.date_range("2025-01-01", periods=500, freq="h").to_numpy()
+    y = np.sin(np.arange(500) / 10.0)
+    y[[0, 250, 499]] = np.nan
+
+    small_x, small_y = downsample_series(x, y, 60)
+    assert len(small_x) == len(small_y) == 60
+    assert small_x.dtype == x.dtype
+    assert not np.isnan(small_y).any()
+    assert small_x[0] == x[1] and small_x[-1] == x[498]
+    assert (np.diff(small_x) > np.timedelta64(0)).all()
@@ -0,0 +1,23 @@
+import os
+
+from streamlit.testing.v1 import AppTest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def render_dapot_table():
+    from my_pages.dapot import show_dapot_table
+    show_dapot_table()
+
+def test_rendering_the_table_keeps_the_shared_frame(monkeypatch):
+    monkeypatch.chdir(REPO_ROOT)
+    from utils.data_loader import load_dapot_df
+
+    at = AppTest.from_function(render_dapot_table, default_timeout=60)
+    at.run()
+    assert not at.exception
+    before = load_dapot_df().index.copy()
+
+    at.run()
+    assert not at.exception
+    assert load_dapot_df().index.equals(before)
+    assert at.dataframe[0].value.index[0] == 1
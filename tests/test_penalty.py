@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+
+from utils.penalty import (
+    penalty_rate, trailing_misses, project_penalties,
+    TARGET_BY_CLASS, PENALTY_TIERS, MAX_TIER_PENALTY, REPEAT_PENALTY_STEP
+)
+
+def oracle_rate(shortfall, prior_misses):
+    if np.isnan(shortfall):
+        return np.nan
+    if shortfall <= 0:
+        return 0.0
+    rate = next((rate for bound, rate in PENALTY_TIERS if shortfall <= bound), MAX_TIER_PENALTY)
+    return round(rate + REPEAT_PENALTY_STEP * prior_misses, 4)
+
+def oracle_trailing_misses(row):
+    count = 0
+    for missed in reversed(row):
+        if not missed:
+            break
+        count += 1
+    return count
+
+def test_penalty_rate_matches_the_tiers():
+    rng = np.random.default_rng(1)
+    bounds = [bound for bound, _ in PENALTY_TIERS]
+    shortfall = np.concatenate([rng.uniform(-0.01, 0.04, 200), bounds, [0.0, np.nan]])
+    prior = rng.integers(0, 4, len(shortfall))
+
+    expected = [oracle_rate(s, p) for s, p in zip(shortfall, prior)]
+    np.testing.assert_array_equal(penalty_rate(shortfall, prior), expected)
+
+def test_trailing_misses_matches_a_loop():
+    rng = np.random.default_rng(2)
+    missed = rng.random((50, 6)) < 0.6
+    assert trailing_misses(missed).tolist() == [oracle_trailing_misses(row) for row in missed]
+    assert trailing_misses(np.zeros((3, 0), dtype=bool)).tolist() == [0, 0, 0]
+
+def make_po():
+    rows = []
+    # (site, class, target in the PO, monthly availability Jan..Apr)
+    sites = [
+        ("S1", "Gold", 0.99, [0.98, 0.97, 0.995, 0.90]),
+        ("S2", "Silver", 0.975, [0.96, 0.97, 0.96, 0.90]),
+        ("S3", "Titanium", 0.95, [0.99, 0.94, 0.99, 0.90]),
+        ("S4", "Titanium", np.nan, [0.99, 0.99, 0.99, 0.90]),
+    ]
+    for site_id, site_class, target, availability in sites:
+        for month, value in zip(["JANUARI", "FEBRUARI", "MARET", "APRIL"], availability):
+            rows.append({
+                "Site Id": site_id, "Site Name": f"Site {site_id}", "Regional TI": "R1", "Class Site": site_class,
+                "Jumlah Periode (Bulan)": 1, "Nominal PO": 10_000_000, "Index BBM": 1.1,
+                "Target Availability (%)": target, "Avaibility": value, "Month": month, "Year": 2025,
+            })
+    return pd.DataFrame(rows)
+
+def make_melted():
+    dates = pd.date_range("2025-04-01", periods=10, freq="D")
+    daily = {"S1": 98.9, "S2": 96.0, "S3": 96.0, "S4": 97.0}
+    rows = [
+        {"Site ID": site_id, "Date": date, "Availability": value + (0.2 if i % 2 else -0.2)}
+        for site_id, value in daily.items() for i, date in enumerate(dates)
+    ]
+    # Days of March are not part of the April projection
+    rows.append({"Site ID": "S1", "Date": pd.Timestamp("2025-03-31"), "Availability": 10.0})
+    return pd.DataFrame(rows)
+
+def test_project_penalties_matches_the_rules():
+    po, melted = make_po(), make_melted()
+    month, result = project_penalties(po, melted)
+    assert month == pd.Period("2025-04", "M")
+    result = result.set_index("Site Id")
+
+    for site_id, site_po in po.groupby("Site Id"):
+        history = site_po.iloc[:3]
+        availability = melted[(melted["Site ID"] == site_id) & (melted["Date"] >= "2025-04-01")]["Availability"].mean() / 100
+        target = TARGET_BY_CLASS.get(site_po["Class Site"].iloc[0], site_po["Target Availability (%)"].iloc[-1])
+        prior = oracle_trailing_misses((history["Avaibility"] < history["Target Availability (%)"]).tolist())
+        rate = oracle_rate(target - availability, prior)
+        bast = round(1 * 10_000_000 * 1.1)
+
+        row = result.loc[site_id]
+        assert row["Days Counted"] == 10
+        assert np.isclose(row["Projected Availability"], availability)
+        assert row["Prior Missed Months"] == prior
+        np.testing.assert_equal(row["Target Availability (%)"], target)
+        np.testing.assert_equal(row["Persentase Penalty"], rate)
+        assert row["Nilai BAST"] == bast
+        np.testing.assert_equal(row["Nilai Penalty"], round(bast * rate) if not np.isnan(rate) else np.nan)
+
+    assert result["Ava Achievement"].to_dict() == {
+        "S1": "Not Achieved", "S2": "Not Achieved", "S3": "Achieved", "S4": "Unknown",
+    }
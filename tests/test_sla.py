@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+
+from utils.sla import SLAEngine, SLA_WINDOW, SLA_BREACH, SLA_AT_RISK, SLA_OK, SLA_NO_DATA
+
+def make_melted(days=75, sites=5, seed=3):
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range("2025-03-01", periods=days, freq="D")
+    rows = []
+    for s in range(sites):
+        target = [95.0, 98.0, 99.0, 99.5, 97.0][s]
+        values = np.clip(rng.normal(98.5, 1.5, days), 0, 100)
+        values[rng.choice(days, 8, replace=False)] = np.nan
+        if s == 4:
+            values[:] = np.nan  # a site without any value
+        for date, value in zip(dates, values):
+            rows.append({
+                "Site ID": f"SITE{s:02d}", "Site Name": f"Site {s}", "Area": "Area 1", "Regional": "R1",
+                "Site Class": "Gold", "Target AVA": target, "Date": date, "Availability": value,
+            })
+    # Missing rows (not just missing values) must leave gaps in the day axis
+    return pd.DataFrame(rows).drop(index=[10, 11, 12])
+
+def oracle_snapshot(melted_df, as_of):
+    """Trailing averages and breach counts of every site on as_of, with a plain loop."""
+    rows = {}
+    for site_id, site in melted_df.groupby("Site ID"):
+        target = site["Target AVA"].iloc[0]
+        daily = site.set_index("Date")["Availability"]
+        row = {}
+        for window in (7, 30):
+            values = daily[(daily.index > as_of - pd.Timedelta(days=window)) & (daily.index <= as_of)].dropna()
+            row[f"Avail {window}D"] = values.mean() if len(values) else np.nan
+            row[f"Breach Days {window}D"] = int((values < target).sum())
+        row["Breach Days Total"] = int((daily[daily.index <= as_of].dropna() < target).sum())
+
+        since = None
+        day = as_of
+        while day >= melted_df["Date"].min():
+            values = daily[(daily.index > day - pd.Timedelta(days=SLA_WINDOW)) & (daily.index <= day)].dropna()
+            if not len(values) or values.mean() >= target:
+                break
+            since = day
+            day -= pd.Timedelta(days=1)
+        row["Below Target Since"] = since.date() if since is not None else None
+
+        if np.isnan(row[f"Avail {SLA_WINDOW}D"]):
+            row["SLA Status"] = SLA_NO_DATA
+        elif row[f"Avail {SLA_WINDOW}D"] < target:
+            row["SLA Status"] = SLA_BREACH
+        elif row["Avail 7D"] < target:
+            row["SLA Status"] = SLA_AT_RISK
+        else:
+            row["SLA Status"] = SLA_OK
+        rows[site_id] = row
+    return pd.DataFrame.from_dict(rows, orient="index")
+
+def test_snapshot_matches_a_plain_loop():
+    melted = make_melted()
+    engine = SLAEngine(melted)
+    for as_of in ["2025-03-01", "2025-03-06", "2025-03-31", "2025-04-20", "2025-05-14"]:
+        as_of = pd.Timestamp(as_of)
+        expected = oracle_snapshot(melted, as_of)
+        snapshot = engine.snapshot(as_of).set_index("Site ID").loc[expected.index]
+
+        for column in ["Avail 7D", "Avail 30D"]:
+            np.testing.assert_allclose(snapshot[column].astype(float), expected[column].astype(float), rtol=1e-5)
+        for column in ["Breach Days 7D", "Breach Days 30D", "Breach Days Total"]:
+            assert snapshot[column].astype(int).tolist() == expected[column].tolist(), (as_of, column)
+        assert [d if pd.notna(d) else None for d in snapshot["Below Target Since"]] == expected["Below Target Since"].tolist()
+        assert snapshot["SLA Status"].tolist() == expected["SLA Status"].tolist()
+
+def test_snapshot_sorts_worst_first_and_no_data_last():
+    snapshot = SLAEngine(make_melted()).snapshot()
+    averages = snapshot["Avail 30D"]
+    assert averages.dropna().is_monotonic_increasing
+    assert snapshot["SLA Status"].iloc[-1] == SLA_NO_DATA
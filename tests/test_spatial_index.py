@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.spatial_index import SiteSpatialIndex, haversine_km
+
+def make_sites(n=2000, seed=5):
+    rng = np.random.default_rng(seed)
+    lat = rng.uniform(-11.0, 6.0, n)
+    lon = rng.uniform(95.0, 141.0, n)
+    # Dense cluster around Jakarta, where most radius queries land
+    lat[:300] = rng.normal(-6.2, 0.05, 300)
+    lon[:300] = rng.normal(106.8, 0.05, 300)
+    df = pd.DataFrame({"SITE ID": [f"S{i:05d}" for i in range(n)], "LATTITUDE": lat, "LONGITUDE": lon})
+    df.loc[[7, 8], "LATTITUDE"] = np.nan
+    return df
+
+QUERIES = [(-6.2, 106.8), (-6.9, 107.6), (3.6, 98.7), (-8.65, 115.2), (-2.5, 140.7), (1.0, 125.0), (-10.9, 95.1), (-30.0, 120.0)]
+
+def brute_force(df, lat, lon):
+    valid = df.dropna(subset=["LATTITUDE", "LONGITUDE"])
+    distances = haversine_km(lat, lon, valid["LATTITUDE"].to_numpy(), valid["LONGITUDE"].to_numpy())
+    return valid.assign(distance_km=distances).sort_values("distance_km", kind="stable")
+
+@pytest.mark.parametrize("cell_deg", [0.1, 0.5, 2.0])
+def test_nearest_matches_brute_force(cell_deg):
+    df = make_sites()
+    index = SiteSpatialIndex(df, cell_deg=cell_deg)
+    assert len(index) == len(df) - 2
+    for lat, lon in QUERIES:
+        expected = brute_force(df, lat, lon)
+        for k in (1, 5, 25):
+            result = index.nearest(lat, lon, k=k)
+            assert result["SITE ID"].tolist() == expected["SITE ID"].head(k).tolist(), (lat, lon, k)
+            np.testing.assert_allclose(result["distance_km"], expected["distance_km"].head(k))
+
+@pytest.mark.parametrize("cell_deg", [0.1, 0.5, 2.0])
+def test_within_radius_matches_brute_force(cell_deg):
+    df = make_sites()
+    index = SiteSpatialIndex(df, cell_deg=cell_deg)
+    for lat, lon in QUERIES:
+        expected = brute_force(df, lat, lon)
+        for radius_km in (2.0, 25.0, 300.0):
+            result = index.within_radius(lat, lon, radius_km)
+            assert result["SITE ID"].tolist() == expected.loc[expected["distance_km"] <= radius_km, "SITE ID"].tolist()
+
+def test_within_bbox_matches_brute_force():
+    df = make_sites()
+    index = SiteSpatialIndex(df)
+    result = index.within_bbox(-7.0, 106.0, -6.0, 108.0)
+    inside = df["LATTITUDE"].between(-7.0, -6.0) & df["LONGITUDE"].between(106.0, 108.0)
+    assert result["SITE ID"].tolist() == df.loc[inside, "SITE ID"].tolist()
+
+def test_nearest_on_an_empty_index():
+    index = SiteSpatialIndex(make_sites().iloc[7:9])
+    assert len(index) == 0
+    assert index.nearest(-6.2, 106.8).empty
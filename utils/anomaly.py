@@ -0,0 +1,228 @@
+# --- utils/anomaly.py ---
+"""
+Sudden availability drops across all sites.
+
+Every site-day is scored against a baseline of the same site's previous
+BASELINE_DAYS days: z = (availability - baseline mean) / baseline std. The
+baselines come from cumulative sums of x and x^2 along the day axis of a sites x
+days matrix, so all sites and days are scored in one pass of array operations.
+
+AnomalyDetector keeps the ranked list of anomalous site-days and only the last
+BASELINE_DAYS columns of the matrix. When the availability file gains new days,
+update() scores just those days against the kept tail instead of the whole history;
+when days it already scored were changed (a corrected workbook), it scores the file
+from scratch.
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils.data_loader import load_availability_data, dataset_version, AVAILABILITY_PATH
+from utils.perf import instrument
+
+BASELINE_DAYS = 30
+# Days with a value the baseline needs before a day is scored
+MIN_BASELINE_DAYS = 7
+Z_THRESHOLD = 3.0
+# Percentage points below the baseline mean a day must also fall to count
+MIN_DROP = 2.0
+# Floor on the baseline std, so a dip after a flat 100% history is not an infinite z-score
+MIN_STD = 0.5
+
+# Values are centered here before squaring, which keeps the x^2 sums small and the variance precise
+CENTER = 100.0
+
+SITE_COLUMNS = ["Site ID", "Site Name", "Area", "Regional", "Site Class"]
+ANOMALY_COLUMNS = SITE_COLUMNS + ["Date", "Availability", "Baseline", "Baseline Std", "Drop", "Z-Score"]
+
+def rolling_zscores(values, window=BASELINE_DAYS, start=0, min_days=MIN_BASELINE_DAYS):
+    """
+    Baseline of the window days before each day, and the day's z-score against it.
+
+    Args:
+        values: sites x days array of availability in %, NaN for missing days
+        window: Baseline length in days
+        start: First day column to score; earlier columns only feed the baselines
+        min_days: Fewer values than this in the window leave the day unscored (NaN)
+
+    Returns:
+        (baseline mean, baseline std, z-score), each sites x days[start:]
+    """
+    has_value = ~np.isnan(values)
+    centered = np.where(has_value, values - CENTER, 0.0)
+
+    # Prefix sums with a leading zero column: the window before day t is prefix[t] - prefix[t - window]
+    zero = np.zeros((len(values), 1))
+    sums = np.concatenate([zero, np.cumsum(centered, axis=1)], axis=1)
+    squares = np.concatenate([zero, np.cumsum(centered ** 2, axis=1)], axis=1)
+    counts = np.concatenate([zero, np.cumsum(has_value, axis=1)], axis=1)
+
+    days = np.arange(start, values.shape[1])
+    first = np.maximum(days - window, 0)
+    count = counts[:, days] - counts[:, first]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = (sums[:, days] - sums[:, first]) / count
+        variance = (squares[:, days] - squares[:, first]) / count - mean ** 2
+        enough = count >= min_days
+        mean = np.where(enough, mean, np.nan)
+        std = np.where(enough, np.sqrt(np.maximum(variance, 0.0)), np.nan)
+        z = (centered[:, days] - mean) / np.maximum(std, MIN_STD)
+    z[~has_value[:, days]] = np.nan
+    return mean + CENTER, std, z
+
+def site_day_checksum(site_ids, dates, values):
+    """
+    Order-independent checksum of site-day values: (rows, sum of row hashes).
+    Checksums of disjoint row sets combine by adding them element-wise.
+    """
+    hashes = pd.util.hash_pandas_object(
+        pd.DataFrame({"Site ID": site_ids, "Date": dates, "Availability": values}), index=False
+    )
+    return len(hashes), int(hashes.to_numpy().sum(dtype=np.uint64))
+
+class AnomalyDetector:
+    """
+    Ranked anomalous site-days (most negative z-score first), refreshed incrementally.
+
+    A day is anomalous when its z-score is at most -z_threshold and it is at least
+    min_drop points below the baseline mean. Days after last_date are scored
+    incrementally when the rows up to last_date are unchanged (same checksum);
+    otherwise the whole file is scored from scratch.
+    """
+
+    def __init__(self, window=BASELINE_DAYS, z_threshold=Z_THRESHOLD, min_drop=MIN_DROP):
+        self.window = window
+        self.z_threshold = z_threshold
+        self.min_drop = min_drop
+        self.lock = threading.Lock()
+        self.version = None
+        self.reset()
+
+    def reset(self):
+        """Forget every scored day."""
+        self.sites = pd.DataFrame(columns=SITE_COLUMNS)
+        self.anomalies = pd.DataFrame(columns=ANOMALY_COLUMNS)
+        self.last_date = None
+        self.days_scored = 0
+        self._tail = np.empty((0, 0))
+        self._checksum = (0, 0)
+
+    def update(self, melted_df):
+        """
+        Score the days of melted_df after last_date and merge their anomalies into the ranking
+        (all days, when rows on or before last_date differ from the ones scored).
+
+        Args:
+            melted_df: One row per site and date (see load_availability_data)
+
+        Returns:
+            Number of new anomalous site-days
+        """
+        availability = pd.to_numeric(melted_df["Availability"], errors="coerce")
+        df = melted_df.assign(Availability=availability).dropna(subset=["Site ID", "Date", "Availability"])
+        dates = pd.to_datetime(df["Date"]).dt.normalize()
+        if not len(dates):
+            return 0
+        if self.last_date is not None:
+            is_new = (dates > self.last_date).to_numpy()
+            scored = ~is_new
+            if site_day_checksum(
+                df["Site ID"].to_numpy()[scored], dates.to_numpy()[scored], df["Availability"].to_numpy()[scored]
+            ) != self._checksum:
+                # Days already scored were corrected or removed
+                self.reset()
+            else:
+                df, dates = df[is_new], dates[is_new]
+                if not len(dates):
+                    return 0
+
+        self._add_sites(df)
+        site_codes = pd.Index(self.sites["Site ID"]).get_indexer(df["Site ID"])
+
+        # New day columns, starting the day after the last scored one so gaps stay empty columns
+        start = self.last_date + pd.Timedelta(days=1) if self.last_date is not None else dates.min()
+        day_codes = (dates - start).dt.days.to_numpy()
+        new_dates = pd.date_range(start, periods=int(day_codes.max()) + 1, freq="D")
+        new_values = np.full((len(self.sites), len(new_dates)), np.nan)
+        new_values[site_codes, day_codes] = df["Availability"].to_numpy(dtype="float64")
+
+        tail = np.full((len(self.sites), self._tail.shape[1]), np.nan)
+        tail[:len(self._tail)] = self._tail
+        values = np.concatenate([tail, new_values], axis=1)
+
+        baseline, std, z = rolling_zscores(values, self.window, start=tail.shape[1])
+        with np.errstate(invalid="ignore"):
+            flagged = (z <= -self.z_threshold) & (baseline - new_values >= self.min_drop)
+        rows, cols = np.nonzero(flagged)
+
+        found = self.sites.iloc[rows].reset_index(drop=True)
+        found["Date"] = new_dates[cols]
+        found["Availability"] = new_values[rows, cols]
+        found["Baseline"] = baseline[rows, cols]
+        found["Baseline Std"] = std[rows, cols]
+        found["Drop"] = baseline[rows, cols] - new_values[rows, cols]
+        found["Z-Score"] = z[rows, cols]
+
+        ranked = pd.concat([self.anomalies, found], ignore_index=True) if len(self.anomalies) else found
+        self.anomalies = ranked.sort_values(["Z-Score", "Date"], ascending=[True, False], kind="stable").reset_index(drop=True)
+        self._tail = values[:, -self.window:]
+        self.last_date = new_dates[-1]
+        count, total = site_day_checksum(df["Site ID"].to_numpy(), dates.to_numpy(), df["Availability"].to_numpy())
+        self._checksum = (self._checksum[0] + count, (self._checksum[1] + total) % 2**64)
+        self.days_scored += len(new_dates)
+        return len(found)
+
+    def _add_sites(self, df):
+        """Append sites not seen before, keeping the existing row order of the matrix."""
+        new_sites = df.loc[~df["Site ID"].isin(self.sites["Site ID"]), [c for c in SITE_COLUMNS if c in df.columns]]
+        if len(new_sites):
+            new_sites = new_sites.drop_duplicates("Site ID").sort_values("Site ID")
+            frames = [self.sites, new_sites] if len(self.sites) else [new_sites]
+            self.sites = pd.concat(frames, ignore_index=True).reindex(columns=SITE_COLUMNS)
+
+def top_offenders(anomalies, n=20):
+    """
+    Sites with the most anomalous days in anomalies (worst z-score breaks ties).
+
+    Returns:
+        One row per site: Site ID, Site Name, Area, Regional, Anomalous Days,
+        Worst Z-Score, Largest Drop and Last Anomaly
+    """
+    if anomalies.empty:
+        return pd.DataFrame(columns=SITE_COLUMNS[:4] + ["Anomalous Days", "Worst Z-Score", "Largest Drop", "Last Anomaly"])
+    offenders = anomalies.groupby("Site ID", sort=False).agg(**{
+        "Site Name": ("Site Name", "first"),
+        "Area": ("Area", "first"),
+        "Regional": ("Regional", "first"),
+        "Anomalous Days": ("Date", "count"),
+        "Worst Z-Score": ("Z-Score", "min"),
+        "Largest Drop": ("Drop", "max"),
+        "Last Anomaly": ("Date", "max"),
+    })
+    offenders = offenders.sort_values(["Anomalous Days", "Worst Z-Score"], ascending=[False, True], kind="stable")
+    return offenders.head(n).reset_index()
+
+@instrument("compute.anomaly_update", kind="compute")
+def refresh_anomaly_detector(detector, version):
+    detector.update(load_availability_data())
+    detector.version = version
+
+@st.cache_resource(show_spinner=False)
+def _shared_anomaly_detector():
+    return AnomalyDetector()
+
+def get_anomaly_detector():
+    """
+    Detector shared by all sessions. When the availability file changes, only its new
+    days are scored before the detector is returned (all days, if old ones changed).
+    """
+    detector = _shared_anomaly_detector()
+    version = dataset_version(AVAILABILITY_PATH)
+    if detector.version != version:
+        with detector.lock:
+            if detector.version != version:
+                with st.spinner("Scanning availability for anomalies..."):
+                    refresh_anomaly_detector(detector, version)
+    return detector
@@ -0,0 +1,203 @@
+# --- utils/bbm_alerts.py ---
+import argparse
+import datetime
+import glob
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils.perf import instrument
+
+WARNING_THRESHOLD = 0.8
+CRITICAL_THRESHOLD = 0.9
+SNAPSHOT_DIR = "data/bbm_snapshots"
+SNAPSHOT_PREFIX = "bbm_status_"
+SNAPSHOT_TIME_FORMAT = "%Y%m%d_%H%M%S_%f"
+MAX_SNAPSHOTS = 48
+
+STATUS_LABELS = {
+    0: "🟢 Aman",
+    1: "🟠 Peringatan BBM Low (80%+)",
+    2: "🔴 Segera Isi BBM (90%+)",
+}
+
+def compute_bbm_status(df, now=None):
+    """
+    Compute the fuel status of every site from its latest refill.
+
+    Args:
+        df: Refill records merged with the site master (see load_bbm_refill_data)
+        now: Reference time for the usage estimate, defaults to the current time
+
+    Returns:
+        One row per site_id with liter_terpakai, persentase_float, tanggal_habis,
+        status_level (0 aman, 1 peringatan, 2 segera isi) and status_bbm.
+    """
+    now = pd.Timestamp.now() if now is None else pd.Timestamp(now)
+
+    df = df.assign(
+        jumlah_pengisian_liter=pd.to_numeric(df["jumlah_pengisian_liter"], errors="coerce"),
+        liter_per_hari=pd.to_numeric(df["liter_per_hari"], errors="coerce"),
+        tanggal_pengisian=pd.to_datetime(df["tanggal_pengisian"], errors="coerce"),
+    )
+
+    # Process latest record per site_id
+    df_latest = (
+        df.sort_values("tanggal_pengisian", ascending=False)
+          .groupby("site_id", as_index=False)
+          .first()
+    )
+
+    # Calculate tanggal_habis based on usage rate
+    df_latest["tanggal_habis"] = df_latest["tanggal_pengisian"] + pd.to_timedelta(
+        df_latest["jumlah_pengisian_liter"] / df_latest["liter_per_hari"], unit="D"
+    )
+
+    # Calculate liters used and percentage used
+    hari_berjalan = (now - df_latest["tanggal_pengisian"]).dt.days
+    df_latest["liter_terpakai"] = hari_berjalan * df_latest["liter_per_hari"]
+    df_latest["persentase_float"] = df_latest["liter_terpakai"] / df_latest["jumlah_pengisian_liter"]
+
+    persentase = df_latest["persentase_float"]
+    df_latest["status_level"] = np.select(
+        [persentase >= CRITICAL_THRESHOLD, persentase >= WARNING_THRESHOLD], [2, 1], default=0
+    )
+    df_latest["status_bbm"] = df_latest["status_level"].map(STATUS_LABELS)
+    return df_latest
+
+def crossed_thresholds(previous, current):
+    """
+    Return the sites in current whose status level went up compared to previous.
+
+    Sites that are missing from previous are treated as "Aman" there, so a new
+    site that already needs fuel is reported as well. Without a previous
+    snapshot there is nothing to compare against and the result is empty.
+    """
+    if current is None or previous is None:
+        return pd.DataFrame(columns=list(getattr(current, "columns", [])) + ["previous_status_bbm"])
+
+    previous_level = (
+        current["site_id"]
+        .map(previous.set_index("site_id")["status_level"])
+        .fillna(0)
+        .astype(int)
+    )
+
+    crossed = current[current["status_level"] > previous_level].copy()
+    crossed["previous_status_bbm"] = previous_level[crossed.index].map(STATUS_LABELS)
+    return crossed
+
+def save_snapshot(status_df, snapshot_dir=SNAPSHOT_DIR, computed_at=None, keep=MAX_SNAPSHOTS):
+    """Write a timestamped status snapshot and prune the oldest ones beyond keep."""
+    os.makedirs(snapshot_dir, exist_ok=True)
+    computed_at = computed_at or datetime.datetime.now()
+    file_name = f"{SNAPSHOT_PREFIX}{computed_at.strftime(SNAPSHOT_TIME_FORMAT)}.csv"
+    path = os.path.join(snapshot_dir, file_name)
+
+    # Write to a temp file first so readers never see a half-written snapshot
+    tmp_path = path + ".tmp"
+    status_df.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+    for old_path in list_snapshots(snapshot_dir)[:-keep]:
+        os.remove(old_path)
+    return path
+
+def list_snapshots(snapshot_dir=SNAPSHOT_DIR):
+    """Snapshot paths sorted from oldest to newest."""
+    return sorted(glob.glob(os.path.join(snapshot_dir, f"{SNAPSHOT_PREFIX}*.csv")))
+
+def read_snapshot(path):
+    """Read one snapshot file back into a DataFrame with its computed_at time."""
+    stamp = os.path.basename(path)[len(SNAPSHOT_PREFIX):-len(".csv")]
+    computed_at = datetime.datetime.strptime(stamp, SNAPSHOT_TIME_FORMAT)
+    df = pd.read_csv(path, parse_dates=["tanggal_pengisian", "tanggal_habis"])
+    return computed_at, df
+
+def load_latest_snapshots(snapshot_dir=SNAPSHOT_DIR):
+    """
+    Load the newest snapshot and the one before it.
+
+    Returns:
+        Tuple of (computed_at, latest_df, previous_df). Missing snapshots are None.
+    """
+    paths = list_snapshots(snapshot_dir)
+    if not paths:
+        return None, None, None
+
+    computed_at, latest = read_snapshot(paths[-1])
+    previous = read_snapshot(paths[-2])[1] if len(paths) > 1 else None
+    return computed_at, latest, previous
+
+class BBMAlertScheduler:
+    """
+    Background thread that recomputes the fuel status of all sites on an interval
+    and stores each result as a snapshot in snapshot_dir.
+    """
+
+    def __init__(self, load_fn, interval_seconds=900, snapshot_dir=SNAPSHOT_DIR):
+        self.load_fn = load_fn
+        self.interval_seconds = interval_seconds
+        self.snapshot_dir = snapshot_dir
+        self.last_error = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @instrument("job.bbm_alerts", kind="job")
+    def run_once(self):
+        """Load, compute and store one snapshot. Returns the snapshot path."""
+        with self._lock:
+            status_df = compute_bbm_status(self.load_fn())
+            return save_snapshot(status_df, self.snapshot_dir)
+
+    def refresh_now(self):
+        """Ask the background thread to recompute without waiting for the interval."""
+        self._wake.set()
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name="bbm-alert-scheduler", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+                self.last_error = None
+            except Exception as e:
+                self.last_error = e
+            self._wake.wait(self.interval_seconds)
+            self._wake.clear()
+
+if __name__ == "__main__":
+    # Headless usage: python -m utils.bbm_alerts --refills pengisian_bbm_streamlit.csv
+    from utils.data_loader import load_bbm_refill_data
+
+    parser = argparse.ArgumentParser(description="Compute BBM fuel status snapshots.")
+    parser.add_argument("--refills", help="Local refill CSV (default: read the Google Sheet)")
+    parser.add_argument("--snapshot-dir", default=SNAPSHOT_DIR)
+    parser.add_argument("--interval", type=int, default=0, help="Seconds between runs, 0 runs once")
+    args = parser.parse_args()
+
+    scheduler = BBMAlertScheduler(lambda: load_bbm_refill_data(args.refills), args.interval, args.snapshot_dir)
+    while True:
+        path = scheduler.run_once()
+        _, latest, previous = load_latest_snapshots(args.snapshot_dir)
+        crossed = crossed_thresholds(previous, latest)
+        print(f"Saved {path} ({len(latest)} sites, {len(crossed)} crossed a threshold)")
+        for _, row in crossed.iterrows():
+            print(f"  {row['site_id']}: {row['previous_status_bbm']} -> {row['status_bbm']}")
+        if args.interval <= 0:
+            break
+        time.sleep(args.interval)
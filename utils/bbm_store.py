@@ -0,0 +1,293 @@
+# --- utils/bbm_store.py ---
+"""
+Storage backends for the BBM refill records.
+
+    SheetsRefillStore     the Google Sheet (BBM_SHEET_ID / BBM_WORKSHEET_NAME)
+    SQLiteRefillStore     a local SQLite file indexed on site_id and tanggal_pengisian,
+                          seeded from pengisian_bbm_streamlit.csv when it is created
+    MirroredRefillStore   reads and writes a SQLiteRefillStore and replays every append
+                          to a second store on a background thread (e.g. the Sheet);
+                          appends not mirrored yet are kept in the database's outbox
+
+All of them have read() -> DataFrame of REFILL_COLUMNS, append(row dict) and close().
+The app's store is chosen with the CDCDASH_BBM_STORE environment variable:
+
+    sheets          Google Sheet only (default)
+    sqlite          local SQLite only, works offline
+    sqlite+sheets   local SQLite, mirrored to the Google Sheet
+"""
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+import pandas as pd
+import streamlit as st
+
+from utils.data_loader import BBM_SHEET_ID, BBM_WORKSHEET_NAME
+from utils.perf import instrument
+
+REFILL_COLUMNS = ["site_id", "tanggal_pengisian", "jumlah_pengisian_liter", "foto_evidence_drive"]
+
+STORE_ENV = "CDCDASH_BBM_STORE"
+DEFAULT_STORE = "sheets"
+LOCAL_DB_PATH = "data/bbm_refills.sqlite"
+SEED_CSV_PATH = "pengisian_bbm_streamlit.csv"
+MIRROR_RETRY_SECONDS = 30
+MIRROR_CLOSE_TIMEOUT_SECONDS = 5
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS refills (
+    id INTEGER PRIMARY KEY,
+    site_id TEXT NOT NULL,
+    tanggal_pengisian TEXT,
+    jumlah_pengisian_liter REAL,
+    foto_evidence_drive TEXT
+);
+CREATE INDEX IF NOT EXISTS refills_site_date ON refills (site_id, tanggal_pengisian);
+CREATE INDEX IF NOT EXISTS refills_date ON refills (tanggal_pengisian);
+CREATE TABLE IF NOT EXISTS mirror_outbox (
+    refill_id INTEGER PRIMARY KEY REFERENCES refills (id)
+);
+"""
+
+# Date formats of the refill records: the form writes ISO dates, the CSV export '01-Jan-25'
+DATE_FORMATS = ["ISO8601", "%d-%b-%y"]
+
+def _iso_date(value):
+    """'YYYY-MM-DD' for a refill date ('01-Jan-25', '2025-01-01', date, Timestamp), None when unparseable."""
+    if value is None or value == "":
+        return None
+    for date_format in DATE_FORMATS:
+        date = pd.to_datetime(value, errors="coerce", format=date_format)
+        if not pd.isna(date):
+            return date.strftime("%Y-%m-%d")
+    return None
+
+class SheetsRefillStore:
+    """Refills in a Google Sheet worksheet."""
+
+    def __init__(self, sheet_id=BBM_SHEET_ID, worksheet_name=BBM_WORKSHEET_NAME):
+        self.sheet_id = sheet_id
+        self.worksheet_name = worksheet_name
+
+    def read(self):
+        from utils.sheets_utils import read_sheet_as_dataframe
+        return read_sheet_as_dataframe(self.sheet_id, self.worksheet_name)
+
+    def append(self, row):
+        from utils.sheets_utils import append_row_to_sheet
+        append_row_to_sheet(self.sheet_id, self.worksheet_name, row)
+
+    def close(self):
+        pass
+
+    def __repr__(self):
+        return f"SheetsRefillStore({self.worksheet_name!r})"
+
+class SQLiteRefillStore:
+    """
+    Refills in a local SQLite database. One connection is shared by all threads
+    (serialized with a lock); WAL mode keeps appends to a single fsync-free write.
+    """
+
+    def __init__(self, path=LOCAL_DB_PATH, seed_csv=SEED_CSV_PATH):
+        """
+        Args:
+            path: Database file, created when missing (":memory:" for a throwaway store)
+            seed_csv: Refill CSV loaded into a new, empty database (None to start empty)
+        """
+        self.path = path
+        if path != ":memory:" and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._con = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        with self._lock:
+            self._con.execute("PRAGMA journal_mode=WAL")
+            self._con.execute("PRAGMA synchronous=NORMAL")
+            self._con.executescript(SCHEMA)
+            empty = self._con.execute("SELECT NOT EXISTS (SELECT 1 FROM refills)").fetchone()[0]
+        if empty and seed_csv and os.path.exists(seed_csv):
+            self.append_many(pd.read_csv(seed_csv).to_dict("records"))
+
+    @staticmethod
+    def _values(row):
+        # Plain Python types only: sqlite3 would store a numpy.int64 as a BLOB
+        liters = pd.to_numeric(row.get("jumlah_pengisian_liter"), errors="coerce")
+        photo = row.get("foto_evidence_drive")
+        return (
+            str(row.get("site_id", "")).strip(),
+            _iso_date(row.get("tanggal_pengisian")),
+            None if pd.isna(liters) else float(liters),
+            None if photo is None or pd.isna(photo) or photo == "" else str(photo),
+        )
+
+    def read(self, site_id=None, since=None, until=None):
+        """
+        Refills as a DataFrame of REFILL_COLUMNS (dates as 'YYYY-MM-DD' text), oldest first.
+
+        Args:
+            site_id: Only this site (index lookup)
+            since, until: Only refills on or after / on or before these dates
+        """
+        conditions, params = [], []
+        if site_id is not None:
+            conditions.append("site_id = ?")
+            params.append(site_id)
+        if since is not None:
+            conditions.append("tanggal_pengisian >= ?")
+            params.append(_iso_date(since))
+        if until is not None:
+            conditions.append("tanggal_pengisian <= ?")
+            params.append(_iso_date(until))
+        where = " WHERE " + " AND ".join(conditions) if conditions else ""
+        sql = f"SELECT {', '.join(REFILL_COLUMNS)} FROM refills{where} ORDER BY tanggal_pengisian, id"
+        with self._lock:
+            rows = self._con.execute(sql, params).fetchall()
+        return pd.DataFrame.from_records(rows, columns=REFILL_COLUMNS)
+
+    def append(self, row, outbox=False):
+        """
+        Insert one refill.
+
+        Args:
+            outbox: Also queue it in the mirror outbox (see MirroredRefillStore), in the same transaction
+
+        Returns:
+            Id of the new row
+        """
+        with self._lock:
+            self._con.execute("BEGIN")
+            try:
+                refill_id = self._con.execute(
+                    f"INSERT INTO refills ({', '.join(REFILL_COLUMNS)}) VALUES (?, ?, ?, ?)", self._values(row)
+                ).lastrowid
+                if outbox:
+                    self._con.execute("INSERT INTO mirror_outbox (refill_id) VALUES (?)", (refill_id,))
+            except Exception:
+                self._con.execute("ROLLBACK")
+                raise
+            self._con.execute("COMMIT")
+        return refill_id
+
+    def append_many(self, rows):
+        values = [self._values(row) for row in rows]
+        with self._lock:
+            self._con.execute("BEGIN")
+            try:
+                self._con.executemany(
+                    f"INSERT INTO refills ({', '.join(REFILL_COLUMNS)}) VALUES (?, ?, ?, ?)", values
+                )
+            except Exception:
+                self._con.execute("ROLLBACK")
+                raise
+            self._con.execute("COMMIT")
+
+    def outbox(self):
+        """Refills queued for the mirror, oldest first: [(id, row dict)]."""
+        with self._lock:
+            rows = self._con.execute(
+                f"SELECT id, {', '.join(REFILL_COLUMNS)} FROM refills"
+                " JOIN mirror_outbox ON mirror_outbox.refill_id = refills.id ORDER BY id"
+            ).fetchall()
+        return [(row[0], dict(zip(REFILL_COLUMNS, row[1:]))) for row in rows]
+
+    def mark_mirrored(self, refill_id):
+        with self._lock:
+            self._con.execute("DELETE FROM mirror_outbox WHERE refill_id = ?", (refill_id,))
+
+    def __len__(self):
+        with self._lock:
+            return self._con.execute("SELECT count(*) FROM refills").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._con.close()
+
+    def __repr__(self):
+        return f"SQLiteRefillStore({self.path!r})"
+
+class MirroredRefillStore:
+    """
+    Reads and appends go to primary, a SQLiteRefillStore; each append is also queued
+    in primary's outbox table and replayed to mirror on a background thread, in order.
+    A mirror append that fails is retried every retry_seconds, and the outbox is
+    replayed when the store is created, so neither a network outage nor a restart
+    loses an append.
+    """
+
+    def __init__(self, primary, mirror, retry_seconds=MIRROR_RETRY_SECONDS):
+        self.primary = primary
+        self.mirror = mirror
+        self.retry_seconds = retry_seconds
+        self.last_error = None
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._replay, name="bbm-store-mirror", daemon=True)
+        self._thread.start()
+
+    def read(self, *args, **kwargs):
+        return self.primary.read(*args, **kwargs)
+
+    def append(self, row):
+        refill_id = self.primary.append(row, outbox=True)
+        self._wake.set()
+        return refill_id
+
+    def pending(self):
+        """Appends not yet written to the mirror."""
+        return len(self.primary.outbox())
+
+    def _replay(self):
+        while not self._stopped.is_set():
+            self._wake.clear()
+            failed = False
+            for refill_id, row in self.primary.outbox():
+                if self._stopped.is_set():
+                    return
+                try:
+                    # Missing values as empty cells
+                    self.mirror.append({col: "" if value is None else value for col, value in row.items()})
+                except Exception as e:
+                    self.last_error = e
+                    failed = True
+                    break
+                self.primary.mark_mirrored(refill_id)
+                self.last_error = None
+            self._wake.wait(self.retry_seconds if failed else None)
+
+    def close(self):
+        """Stop the replay thread (appends still in the outbox are replayed on the next start) and close both stores."""
+        self._stopped.set()
+        self._wake.set()
+        self._thread.join(MIRROR_CLOSE_TIMEOUT_SECONDS)
+        self.primary.close()
+        self.mirror.close()
+
+    def __repr__(self):
+        return f"MirroredRefillStore({self.primary!r} -> {self.mirror!r})"
+
+def create_refill_store(kind=None):
+    """Store for a CDCDASH_BBM_STORE value (default: the environment variable, then 'sheets')."""
+    kind = kind or os.environ.get(STORE_ENV, DEFAULT_STORE)
+    if kind == "sheets":
+        return SheetsRefillStore()
+    if kind == "sqlite":
+        return SQLiteRefillStore()
+    if kind == "sqlite+sheets":
+        return MirroredRefillStore(SQLiteRefillStore(), SheetsRefillStore())
+    raise ValueError(f"Unknown {STORE_ENV} {kind!r}, expected 'sheets', 'sqlite' or 'sqlite+sheets'")
+
+@st.cache_resource(on_release=lambda store: store.close())
+def get_refill_store():
+    """The app's refill store, shared by all sessions."""
+    return create_refill_store()
+
+@instrument("store.refills.read", kind="store")
+def read_refills():
+    return get_refill_store().read()
+
+@instrument("store.refills.append", kind="store")
+def append_refill(row):
+    get_refill_store().append(row)
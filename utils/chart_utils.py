@@ -0,0 +1,64 @@
+# --- utils/chart_utils.py ---
+import numpy as np
+
+def lttb_downsample(x, y, n_out):
+    """
+    Downsample a series with the largest-triangle-three-buckets algorithm.
+
+    Keeps the first and last point and, for every bucket in between, the point
+    forming the largest triangle with the previously kept point and the average
+    of the next bucket. The visual shape of the line is preserved with far
+    fewer points.
+
+    Args:
+        x: Numeric x values, sorted ascending (datetimes as int64 nanoseconds)
+        y: Numeric y values, same length as x
+        n_out: Number of points to keep
+
+    Returns:
+        Array of indices into x/y for the kept points.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype="float64")
+    y = np.asarray(y, dtype="float64")
+
+    # Bucket edges for the n - 2 points between the fixed first and last point
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+
+    kept = np.empty(n_out, dtype=np.int64)
+    kept[0] = 0
+    kept[-1] = n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        next_start, next_end = end, edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+
+        # Twice the triangle area for each candidate in the bucket
+        area = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a])
+            - (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(np.argmax(area))
+        kept[i + 1] = a
+    return kept
+
+def downsample_series(x, y, max_points):
+    """
+    Apply LTTB to an x/y pair when it has more than max_points points.
+
+    Missing y values are dropped before downsampling. x may be a datetime
+    series; the returned values keep their original type.
+    """
+    if len(x) <= max_points:
+        return x, y
+
+    valid = ~np.isnan(np.asarray(y, dtype="float64"))
+    x, y = x[valid], y[valid]
+    x_num = x.astype("int64") if np.issubdtype(x.dtype, np.datetime64) else x
+    kept = lttb_downsample(x_num, y, max_points)
+    return x[kept], y[kept]
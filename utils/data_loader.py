@@ -1,17 +1,81 @@
 # --- utils/data_loader.py ---
 import pandas as pd
 import streamlit as st
+import functools
 import os
 import re
-
-def load_availability_data():
-    file_path = "data/CDC_Availability_2025_194.xlsx"
+from utils.perf import instrument
+from utils.excel_stream import open_workbook, read_sheet
+from utils.schema import (
+    normalize, AVAILABILITY_SCHEMA, PO_SCHEMA, DAPOT_SCHEMA, DAPOT_PAGE_SCHEMA, REFILL_SCHEMA, SITE_MASTER_SCHEMA
+)
+
+AVAILABILITY_PATH = "data/CDC_Availability_2025_194.xlsx"
+CDC_PO_PATH = "data/ESTIMASIPO2025.xlsx"
+DAPOT_PATH = "data/Dapot_Alpro_CDC_2025.xlsx"
+BBM_SHEET_ID = "13A8ckogwxlMYDXKXrW84h0XkWOIbIMUWiePK6uTRzfc"
+BBM_WORKSHEET_NAME = "pengisian_bbm"
+SITE_MASTER_PATH = "all_site_master.csv"
+
+# Loaded datasets are shared by every session (st.cache_resource) and must be treated
+# as read-only: filter with masks and derive with assign(). Copy-on-write (the default
+# from pandas 3) makes those derived frames share memory until something writes to them.
+if int(pd.__version__.split(".")[0]) < 3:
+    pd.set_option("mode.copy_on_write", True)
+
+# Version of each data file the app serves, once the dataset watcher has published one
+# (see utils/datasets.py). Unwatched files are served as they are on disk.
+_published_versions = {}
+
+def file_version(path):
+    """(path, modification time, size) of the file as it is on disk now."""
+    try:
+        stat = os.stat(path)
+        return (path, stat.st_mtime_ns, stat.st_size)
+    except OSError:
+        return (path, None, None)
+
+def publish_version(path, version):
+    """Serve version of path from now on (after its datasets have been loaded)."""
+    _published_versions[path] = version
+
+def dataset_version(*paths):
+    """
+    Cheap version stamp for one or more data files, based on modification time and size.
+    Changes whenever a served workbook is replaced, so it can be used as part of a cache key.
+    """
+    return tuple(_published_versions.get(path) or file_version(path) for path in paths)
+
+def versioned(path):
+    """
+    Key a cached loader on the served version of path: load() returns the data of the
+    served version, load.load_version(version) loads any version (ahead of publishing it).
+    """
+    def decorator(cached_loader):
+        @functools.wraps(cached_loader)
+        def load():
+            return cached_loader(dataset_version(path))
+        load.load_version = cached_loader
+        load.clear = cached_loader.clear
+        load.paths = (path,)
+        return load
+    return decorator
+
+# The loaders below take the file version only as their cache key; the two most recent
+# versions are kept, so the one being served stays cached while the next one loads.
+
+@versioned(AVAILABILITY_PATH)
+@st.cache_resource(max_entries=2)
+@instrument("loader.availability", kind="loader")
+def load_availability_data(version):
+    file_path = AVAILABILITY_PATH
+    # Raised rather than st.stop(): this also runs on the dataset watcher thread, which records the error
     try:
-        df = pd.read_excel(file_path, sheet_name="Ava CDC")
+        df = read_sheet(file_path, "Ava CDC")
     except Exception as e:
-        st.error(f"Failed to load CDC Availability data: {e}")
-        st.stop()
+        raise RuntimeError(f"Failed to load CDC Availability data: {e}") from e
 
+    df = normalize(df, AVAILABILITY_SCHEMA)
     melted_df = pd.melt(df, 
                         id_vars=['Area', 'Site ID', 'Regional', 'Site Name', 'NS', 'Cluster', 'On Service / Cut OFF', 'Site Class', 'Target AVA'],
                         var_name='Date', 
@@ -21,8 +85,11 @@ def load_availability_data():
     melted_df = melted_df.dropna(subset=['Date'])
     return melted_df
 
-def load_cdc_po_data():
-    file_path = "data/ESTIMASIPO2025.xlsx"
+@versioned(CDC_PO_PATH)
+@st.cache_resource(max_entries=2)
+@instrument("loader.po", kind="loader")
+def load_cdc_po_data(version):
+    file_path = CDC_PO_PATH
     filename = os.path.basename(file_path)
     match = re.search(r"\d{4}", filename)
     cdc_year = match.group(0) if match else "Unknown"
@@ -31,17 +98,20 @@ def load_cdc_po_data():
                        "JULI", "AGUSTUS", "SEPTEMBER", "OKTOBER", "NOVEMBER", "DESEMBER"]
 
     try:
-        xls = pd.ExcelFile(file_path)
-        available_sheets = xls.sheet_names
-        cdc_df_list = []
-        for month in expected_sheets:
-            if month in available_sheets:
-                df_month = pd.read_excel(xls, sheet_name=month, header=1)
-                df_month['Month'] = month
-                df_month['Year'] = cdc_year
-                cdc_df_list.append(df_month)
-
-        cdc_df = pd.concat(cdc_df_list, ignore_index=True)
+        book = open_workbook(file_path)
+        try:
+            available_sheets = book.sheetnames
+            cdc_df_list = []
+            for month in expected_sheets:
+                if month in available_sheets:
+                    df_month = read_sheet(book, month, header=1)
+                    df_month['Month'] = month
+                    df_month['Year'] = cdc_year
+                    cdc_df_list.append(df_month)
+        finally:
+            book.close()
+
+        cdc_df = normalize(pd.concat(cdc_df_list, ignore_index=True), PO_SCHEMA)
 
         if 'Avaibility' in cdc_df.columns and 'Target Availability (%)' in cdc_df.columns:
             cdc_df['Ava Achievement'] = cdc_df.apply(
@@ -57,51 +127,69 @@ def load_cdc_po_data():
 
     return cdc_df
 
-def load_dapot_alpro_data():
-    file_path = "data/Dapot_Alpro_CDC_2025.xlsx"
+@versioned(DAPOT_PATH)
+@st.cache_resource(max_entries=2)
+@instrument("loader.dapot", kind="loader")
+def load_dapot_alpro_data(version):
+    file_path = DAPOT_PATH
     sheet_names = ["Sumbagsel", "Sumbagteng", "Jawa Timur", "Bali Nusra", "Kalimantan", "Puma", "Sulawesi"]
 
     try:
-        xls = pd.ExcelFile(file_path)
-        dapot_df_list = []
-
-        for sheet in sheet_names:
-            if sheet in xls.sheet_names:
-                df_sheet = pd.read_excel(xls, sheet_name=sheet, header=1)  # Header is on the second row
-                df_sheet['Region'] = sheet  # Add sheet name as region identifier
-                
-                if "On Service / Cut OFF" in df_sheet.columns:
-                    col = "On Service / Cut OFF"
-
-                    # Standardize values: lower, strip, then map
-                    df_sheet[col] = (
-                        df_sheet[col]
-                        .astype(str)
-                        .str.strip()
-                        .str.lower()
-                        .replace({
-                            "on service": "On Service",
-                            "cut off": "Cut Off",
-                            "idle": "Cut Off"
-                        })
-                    )
-                
-                # Clean "Site Class"
-                if "Site Class" in df_sheet.columns:
-                    df_sheet["Site Class"] = (
-                        df_sheet["Site Class"]
-                        .astype(str)
-                        .str.strip()
-                        .str.title()  # Proper case formatting (e.g., "Silver", "Gold")
-                    )
-
-                df_sheet.rename(columns={"On Service / Cut OFF": "STATUS"}, inplace=True)
-                dapot_df_list.append(df_sheet)
-
-        dapot_df = pd.concat(dapot_df_list, ignore_index=True)
-        return dapot_df
+        book = open_workbook(file_path)
+        try:
+            dapot_df_list = []
+
+            for sheet in sheet_names:
+                if sheet in book.sheetnames:
+                    df_sheet = read_sheet(book, sheet, header=1)  # Header is on the second row
+                    df_sheet['Region'] = sheet  # Add sheet name as region identifier
+                    dapot_df_list.append(df_sheet)
+        finally:
+            book.close()
+
+        # STATUS ("On Service" / "Cut Off") and Site Class ("Gold", "Silver") cleaned once for all sheets
+        return normalize(pd.concat(dapot_df_list, ignore_index=True), DAPOT_SCHEMA)
 
     except Exception as e:
         st.error(f"Failed to load Dapot Alpro data: {e}")
         return pd.DataFrame()
 
+@instrument("loader.refills", kind="loader")
+def load_bbm_refill_data(refill_csv=None):
+    """
+    Load BBM refill records merged with the site master.
+
+    Reads the configured refill store by default (the Google Sheet unless CDCDASH_BBM_STORE
+    says otherwise, see utils/bbm_store.py). Pass refill_csv (e.g. "pengisian_bbm_streamlit.csv")
+    to read a local export instead, so the data can be loaded without credentials.
+    """
+    if refill_csv:
+        df_pengisian = pd.read_csv(refill_csv)
+    else:
+        from utils.bbm_store import read_refills
+        df_pengisian = read_refills()
+    df_pengisian = normalize(df_pengisian, REFILL_SCHEMA)
+
+    site_master = normalize(pd.read_csv(SITE_MASTER_PATH), SITE_MASTER_SCHEMA)
+
+    # Merge the two dataframes
+    return pd.merge(df_pengisian, site_master, on="site_id", how="left")
+
+# The refills come from the Google Sheet; the file part is the site master merged into them
+@versioned(SITE_MASTER_PATH)
+@st.cache_resource(max_entries=2)
+def load_bbm_data(version):
+    return load_bbm_refill_data()
+
+@versioned(DAPOT_PATH)
+@st.cache_resource(max_entries=2)
+def load_dapot_df(version):
+    """Dapot data with upper-case column names and numeric LATTITUDE / LONGITUDE (Dapot page layout)."""
+    # The Dapot data of this version, which may not be the served one yet while it preloads
+    return normalize(load_dapot_alpro_data.load_version(version), DAPOT_PAGE_SCHEMA)
+
+@versioned(SITE_MASTER_PATH)
+@st.cache_resource(max_entries=2)
+@instrument("loader.site_master", kind="loader")
+def load_site_master(version):
+    return normalize(pd.read_csv(SITE_MASTER_PATH), SITE_MASTER_SCHEMA)
@@ -0,0 +1,262 @@
+# --- utils/datasets.py ---
+import os
+import threading
+import time
+
+import streamlit as st
+
+from utils.data_loader import (
+    load_availability_data, load_cdc_po_data, load_dapot_alpro_data, load_site_master, load_bbm_data,
+    dataset_version, file_version, publish_version,
+    AVAILABILITY_PATH, CDC_PO_PATH, DAPOT_PATH, SITE_MASTER_PATH
+)
+from utils.file_watch import create_watcher
+from utils.kpi import get_kpi_rollups
+from utils.perf import timer
+
+# Cached loader of every dataset and the file it reads (None for the Google Sheet).
+# Warm-up runs them in this order; the BBM tracker is the default page, so its data goes first.
+DATASETS = {
+    "site_master": (load_site_master, SITE_MASTER_PATH),
+    "refills": (load_bbm_data, None),
+    "dapot": (load_dapot_alpro_data, DAPOT_PATH),
+    "po": (load_cdc_po_data, CDC_PO_PATH),
+    "availability": (load_availability_data, AVAILABILITY_PATH),
+}
+
+# Aggregates built from the loaded datasets at the end of the warm-up
+ROLLUPS = {
+    "kpi": get_kpi_rollups,
+}
+
+PENDING, LOADING, READY, FAILED, SKIPPED = "pending", "loading", "ready", "failed", "skipped"
+
+# A changed file is reloaded once it has stayed unchanged this long (large copies arrive in several writes)
+SETTLE_SECONDS = 1.0
+MAX_RELOAD_HISTORY = 50
+
+class DatasetWarmup:
+    """
+    Fills the dataset caches on a background thread.
+
+    Every loader in DATASETS is called once, so the cached datasets exist
+    before the first user asks for them; then every builder in ROLLUPS runs
+    over them. Sessions poll status() / is_ready() to decide between
+    rendering the page and showing a loading state.
+    """
+
+    def __init__(self, datasets=DATASETS, rollups=ROLLUPS):
+        self.datasets = datasets
+        self.rollups = rollups
+        self._lock = threading.Lock()
+        self._status = {
+            name: {"state": PENDING, "seconds": None, "error": None} for name in list(datasets) + list(rollups)
+        }
+        self._thread = None
+
+    def _update(self, name, **fields):
+        with self._lock:
+            self._status[name].update(fields)
+
+    def _run_step(self, name, func):
+        self._update(name, state=LOADING)
+        start = time.perf_counter()
+        try:
+            func()
+        except Exception as e:
+            self._update(name, state=FAILED, seconds=time.perf_counter() - start, error=str(e))
+        else:
+            self._update(name, state=READY, seconds=time.perf_counter() - start)
+
+    def run(self):
+        for name, (loader, path) in self.datasets.items():
+            if path and not os.path.exists(path):
+                self._update(name, state=SKIPPED, error=f"{path} not found")
+                continue
+            self._run_step(name, loader)
+
+        for name, build in self.rollups.items():
+            self._run_step(name, build)
+
+    def start(self):
+        """Start the warm-up thread (once) and return self."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self.run, name="dataset-warmup", daemon=True)
+            self._thread.start()
+        return self
+
+    def status(self):
+        """Copy of {dataset: {"state", "seconds", "error"}}."""
+        with self._lock:
+            return {name: dict(entry) for name, entry in self._status.items()}
+
+    def is_ready(self, *names):
+        """True when none of the named datasets is still pending or loading."""
+        with self._lock:
+            return all(self._status[name]["state"] not in (PENDING, LOADING) for name in names)
+
+@st.cache_resource
+def start_dataset_warmup():
+    """Warm-up shared by all sessions; started on the first script run of the server process."""
+    return DatasetWarmup().start()
+
+@st.fragment(run_every=1)
+def show_loading_state(names):
+    warmup = start_dataset_warmup()
+    if warmup.is_ready(*names):
+        st.rerun()
+
+    status = warmup.status()
+    done = sum(status[name]["state"] not in (PENDING, LOADING) for name in names)
+    st.info("⏳ Data sedang dimuat, halaman akan tampil otomatis setelah siap.")
+    st.progress(done / len(names), text=", ".join(f"{name}: {status[name]['state']}" for name in names))
+
+def require_datasets(*names):
+    """
+    Check that the named datasets are warmed up before a page section uses them.
+
+    Returns True when they are ready (or failed, so the section loads them itself
+    and shows the error). Otherwise renders a loading state that reruns the app
+    once they are ready and returns False.
+    """
+    if not names or start_dataset_warmup().is_ready(*names):
+        return True
+    show_loading_state(list(names))
+    return False
+
+class DatasetWatcher:
+    """
+    Hot-reloads the datasets of data files that change on disk.
+
+    A changed file's datasets are loaded on the watcher thread under the new file
+    version while every session keeps getting the version it had, then the new
+    version is published in one step and the ROLLUPS are rebuilt. When a dataset
+    read from the file fails to load (or loads no rows), the old version stays served.
+    """
+
+    def __init__(self, datasets=DATASETS, rollups=ROLLUPS, settle_seconds=SETTLE_SECONDS):
+        self.datasets = datasets
+        self.rollups = rollups
+        self.settle_seconds = settle_seconds
+        # Files the dataset loaders are versioned on (see data_loader.versioned)
+        self.paths = sorted({path for loader, _ in datasets.values() for path in getattr(loader, "paths", ())})
+        self._lock = threading.Lock()
+        self._history = []
+        self._watcher = None
+        self._thread = None
+        self._stopped = threading.Event()
+
+    def datasets_for(self, path):
+        """(datasets read from path, datasets that only merge it in) for a data file."""
+        primary = [name for name, (_, file_path) in self.datasets.items() if file_path == path]
+        dependent = [
+            name for name, (loader, file_path) in self.datasets.items()
+            if file_path != path and path in getattr(loader, "paths", ())
+        ]
+        return primary, dependent
+
+    def reload(self, path):
+        """
+        Load the datasets of path at its version on disk and publish that version.
+
+        Returns:
+            True when a new version was published
+        """
+        version = self._settled_version(path)
+        if version == dataset_version(path)[0]:
+            return False
+        start = time.perf_counter()
+        primary, dependent = self.datasets_for(path)
+        if version[1] is None:
+            self._record(path, SKIPPED, start, f"{path} not found, still serving the previous version")
+            return False
+
+        try:
+            for name in primary:
+                with timer(f"reload.{name}", kind="loader"):
+                    df = self.datasets[name][0].load_version(version)
+                if getattr(df, "empty", False):
+                    raise ValueError(f"{name}: no rows loaded")
+        except Exception as e:
+            self._record(path, FAILED, start, str(e))
+            return False
+
+        # Datasets that merge the file in are loaded ahead when possible, otherwise on first use;
+        # their failures (and the rollups') are kept in the history entry of the published version
+        errors = []
+        for name in dependent:
+            try:
+                self.datasets[name][0].load_version(version)
+            except Exception as e:
+                errors.append(f"{name}: {e}")
+
+        publish_version(path, version)
+        for name, build in self.rollups.items():
+            try:
+                build()
+            except Exception as e:
+                errors.append(f"{name}: {e}")
+        self._record(path, READY, start, "; ".join(errors) or None)
+        return True
+
+    def _settled_version(self, path):
+        """Version of path once it has stopped changing for settle_seconds."""
+        version = file_version(path)
+        while True:
+            time.sleep(self.settle_seconds)
+            latest = file_version(path)
+            if latest == version:
+                return version
+            version = latest
+
+    def _record(self, path, state, start, error):
+        with self._lock:
+            self._history.append({
+                "file": path, "state": state, "at": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "seconds": time.perf_counter() - start, "error": error,
+            })
+            del self._history[:-MAX_RELOAD_HISTORY]
+
+    def history(self):
+        """Reloads so far, oldest first: {"file", "state", "at", "seconds", "error"}."""
+        with self._lock:
+            return [dict(entry) for entry in self._history]
+
+    def run(self):
+        by_absolute_path = {os.path.abspath(path): path for path in self.paths}
+        try:
+            while not self._stopped.is_set():
+                for changed in self._watcher.changes(timeout=1.0):
+                    if self._stopped.is_set():
+                        break
+                    self.reload(by_absolute_path[changed])
+        finally:
+            self._watcher.close()
+
+    def start(self):
+        """Serve the files' current versions and start the watcher thread (once); returns self."""
+        if self._thread is None:
+            for path in self.paths:
+                publish_version(path, file_version(path))
+            self._watcher = create_watcher(self.paths)
+            self._thread = threading.Thread(target=self.run, name="dataset-watcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=5.0):
+        """Stop the watcher thread; it closes the file watcher on its way out."""
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    @property
+    def mode(self):
+        return type(self._watcher).__name__ if self._watcher is not None else None
+
+@st.cache_resource(on_release=lambda watcher: watcher.stop())
+def start_dataset_watcher():
+    """
+    Watcher shared by all sessions; started on the first script run of the server process
+    and stopped when the cache is cleared (the next run starts a new one).
+    """
+    return DatasetWatcher().start()
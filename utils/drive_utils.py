@@ -2,13 +2,18 @@ import io
 import base64
 import json
 from typing import Tuple, Union
-from google.oauth2 import service_account
-from googleapiclient.discovery import build
-from googleapiclient.http import MediaIoBaseUpload
 import streamlit as st
+from utils.perf import instrument, timer
+
+# The Google API client is imported inside the functions below: it is slow to
+# import and only needed when a photo is actually uploaded.
 
 @st.cache_resource
+@instrument("api.drive.auth", kind="api")
 def get_drive_service():
+    from google.oauth2 import service_account
+    from googleapiclient.discovery import build
+
     # Decode base64 string from Streamlit secrets
     base64_creds = st.secrets["GOOGLE_DRIVE_CREDS"]
     json_str = base64.b64decode(base64_creds).decode("utf-8")
@@ -41,6 +46,8 @@ def upload_photo_to_drive(
     Returns:
         Tuple of (file_id, webContentLink)
     """
+    from googleapiclient.http import MediaIoBaseUpload
+
     service = get_drive_service()
 
     # Read bytes from file_obj
@@ -55,20 +62,22 @@ def upload_photo_to_drive(
         "parents": [folder_id]
     }
 
-    file = service.files().create(
-        body=file_metadata,
-        media_body=media,
-        fields="id, webContentLink, webViewLink"
-    ).execute()
+    with timer("api.drive.upload", kind="api") as t:
+        t.bytes = len(file_bytes)
+        file = service.files().create(
+            body=file_metadata,
+            media_body=media,
+            fields="id, webContentLink, webViewLink"
+        ).execute()
 
-    # 👇 Make the file publicly viewable
-    service.permissions().create(
-        fileId=file.get("id"),
-        body={
-            "type": "anyone",
-            "role": "reader"
-        }
-    ).execute()
+        # 👇 Make the file publicly viewable
+        service.permissions().create(
+            fileId=file.get("id"),
+            body={
+                "type": "anyone",
+                "role": "reader"
+            }
+        ).execute()
 
     return file.get("id"), file.get("webContentLink")
 
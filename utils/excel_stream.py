@@ -0,0 +1,264 @@
+# --- utils/excel_stream.py ---
+"""
+Streaming Excel sheet reader with bounded memory.
+
+pd.read_excel collects every cell of a sheet as a Python object in a list of
+rows before it infers the column types, so the peak during a load is many
+times the final frame. read_sheet() iterates the sheet with openpyxl in
+read_only / values_only mode and appends each cell straight into a typed
+buffer for its column (8 bytes per number or date, one shared object per
+repeated string), then hands the buffers to pandas without another copy.
+
+The result matches pd.read_excel for the layouts used here: header on any row
+(header=1 for the ESTIMASIPO and Dapot sheets), blank rows kept as NaN rows,
+trailing blank rows and columns dropped, unnamed and duplicate headers named
+"Unnamed: i" / "name.1", whole floats read as int64 when nothing is missing.
+
+    python -m utils.excel_stream data/ESTIMASIPO2025.xlsx --sheet JANUARI --header 1 --compare
+"""
+import argparse
+import datetime
+import time
+import tracemalloc
+from array import array
+
+import numpy as np
+import pandas as pd
+
+# Strings read as missing values, as in pd.read_excel
+NA_STRINGS = frozenset([
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+    "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+])
+
+EPOCH = datetime.datetime(1970, 1, 1)
+ONE_MICROSECOND = datetime.timedelta(microseconds=1)
+NAT = np.iinfo(np.int64).min
+
+class _ColumnBuffer:
+    """
+    Values of one column. Starts typed by the first value seen: "number" (float64,
+    bools and ints included), "datetime" (int64 microseconds) or "object"; falls
+    back to "object" for good when a later value has another type.
+    """
+
+    def __init__(self, missing=0):
+        self.kind = None
+        self.values = None
+        self.missing = missing  # leading missing values, before the kind is known
+        self.all_integral = True
+        self.all_bool = True
+        self._strings = {}
+
+    def append(self, value):
+        if value is None or (isinstance(value, str) and value in NA_STRINGS):
+            self.append_missing()
+            return
+        kind = _kind_of(value)
+        if self.kind is None:
+            self._start(kind)
+        elif kind != self.kind and self.kind != "object":
+            self._to_object()
+
+        if self.kind == "number":
+            self.all_bool = self.all_bool and isinstance(value, bool)
+            self.all_integral = self.all_integral and float(value).is_integer()
+            self.values.append(float(value))
+        elif self.kind == "datetime":
+            self.values.append((value - EPOCH) // ONE_MICROSECOND)
+        else:
+            if isinstance(value, str):
+                value = self._strings.setdefault(value, value)
+            self.values.append(value)
+
+    def append_missing(self, count=1):
+        if self.kind is None:
+            self.missing += count
+        elif self.kind == "number":
+            self.values.extend([np.nan] * count)
+        elif self.kind == "datetime":
+            self.values.extend([NAT] * count)
+        else:
+            self.values.extend([np.nan] * count)
+
+    def truncate(self, length):
+        if self.kind is None:
+            self.missing = min(self.missing, length)
+        else:
+            del self.values[length:]
+
+    def __len__(self):
+        return self.missing if self.kind is None else len(self.values)
+
+    def _start(self, kind):
+        self.kind = kind
+        self.values = {"number": lambda: array("d"), "datetime": lambda: array("q")}.get(kind, list)()
+        missing, self.missing = self.missing, 0
+        if missing:
+            self.append_missing(missing)
+
+    def _to_object(self):
+        self.values = self.to_array().astype(object).tolist()
+        if self.kind == "datetime":
+            self.values = [np.nan if pd.isna(value) else value for value in self.values]
+        self.kind = "object"
+
+    def to_array(self):
+        """The buffer as a numpy array (zero-copy for numbers)."""
+        if self.kind is None:
+            return np.full(self.missing, np.nan)
+        if self.kind == "number":
+            values = np.frombuffer(self.values, dtype=np.float64)
+            has_missing = np.isnan(values).any()
+            if not has_missing and self.all_bool:
+                return values.astype(bool)
+            if not has_missing and self.all_integral:
+                return values.astype(np.int64)
+            return values
+        if self.kind == "datetime":
+            return np.frombuffer(self.values, dtype=np.int64).view("datetime64[us]")
+        result = np.empty(len(self.values), dtype=object)
+        result[:] = self.values
+        # Text that is all numbers (e.g. '2.5' next to 0.5) is read as numbers, as pd.read_excel does
+        try:
+            return pd.to_numeric(result) if len(result) else result
+        except (ValueError, TypeError):
+            return result
+
+def _kind_of(value):
+    if isinstance(value, (bool, int, float)):
+        return "number"
+    if isinstance(value, datetime.datetime):
+        return "datetime"
+    return "object"
+
+def _is_blank(value):
+    return value is None or value == ""
+
+def _row_width(row):
+    """Length of row without its trailing blank cells."""
+    width = len(row)
+    while width and _is_blank(row[width - 1]):
+        width -= 1
+    return width
+
+def _header_names(row):
+    """Column names from the header row: 'Unnamed: i' for blanks, 'name.1' for repeats."""
+    names, seen = [], {}
+    for i, value in enumerate(row):
+        name = f"Unnamed: {i}" if _is_blank(value) else value
+        if isinstance(name, str) and name in NA_STRINGS:
+            name = np.nan
+        if isinstance(name, float) and name.is_integer():
+            name = int(name)
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+def open_workbook(path):
+    """Workbook opened for streaming; pass it to read_sheet() to read several sheets."""
+    import openpyxl
+    return openpyxl.load_workbook(path, read_only=True, data_only=True, keep_links=False)
+
+def read_sheet(path_or_book, sheet_name=0, header=0):
+    """
+    One sheet as a DataFrame, streamed row by row into typed column buffers.
+
+    Args:
+        path_or_book: Workbook path, or a workbook from open_workbook()
+        sheet_name: Sheet name or position
+        header: Row (0-based) holding the column names; the rows above it are skipped
+
+    Returns:
+        DataFrame like pd.read_excel(path, sheet_name=sheet_name, header=header)
+    """
+    book = open_workbook(path_or_book) if isinstance(path_or_book, str) else path_or_book
+    try:
+        sheet = book.worksheets[sheet_name] if isinstance(sheet_name, int) else book[sheet_name]
+        rows = sheet.iter_rows(values_only=True)
+
+        # Rows above the header are skipped, but like pd.read_excel they still count for the width
+        header_row, skipped_width = (), 0
+        for i, row in enumerate(rows):
+            if i == header:
+                header_row = row
+                break
+            skipped_width = max(skipped_width, _row_width(row))
+
+        columns = []
+        n_rows = last_data_row = 0
+        for row in rows:
+            width = _row_width(row)
+            for j in range(len(columns), width):
+                columns.append(_ColumnBuffer(missing=n_rows))
+            for j in range(width):
+                columns[j].append(row[j])
+            for column in columns[width:]:
+                column.append_missing()
+            n_rows += 1
+            if width:
+                last_data_row = n_rows
+    finally:
+        if book is not path_or_book:
+            book.close()
+
+    # Trailing blank rows are dropped; the header may be wider than the data
+    header_width = _row_width(header_row)
+    for column in columns:
+        column.truncate(last_data_row)
+    while len(columns) < max(header_width, skipped_width):
+        columns.append(_ColumnBuffer(missing=last_data_row))
+
+    names = _header_names(list(header_row[:len(columns)]) + [None] * (len(columns) - header_width))
+    return pd.DataFrame({name: column.to_array() for name, column in zip(names, columns)})
+
+def peak_memory(func, *args, **kwargs):
+    """
+    Run func and measure the Python heap it used at its peak (tracemalloc).
+    Tracing slows the run down, so the seconds are only comparable to other traced runs.
+
+    Returns:
+        (result, peak bytes, seconds)
+    """
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    base = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    try:
+        result = func(*args, **kwargs)
+        seconds = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1] - base
+    finally:
+        if not was_tracing:
+            tracemalloc.stop()
+    return result, peak, seconds
+
+def main():
+    parser = argparse.ArgumentParser(description="Read a sheet with the streaming reader and report its peak memory.")
+    parser.add_argument("path", help="Workbook (.xlsx)")
+    parser.add_argument("--sheet", default=0, help="Sheet name (default: the first sheet)")
+    parser.add_argument("--header", type=int, default=0, help="Header row, 0-based (default: 0)")
+    parser.add_argument("--compare", action="store_true", help="Also measure pd.read_excel and check the results match")
+    args = parser.parse_args()
+
+    # Load the openpyxl modules first so their import doesn't count toward the peak
+    open_workbook(args.path).close()
+
+    df, peak, seconds = peak_memory(read_sheet, args.path, args.sheet, args.header)
+    frame_bytes = df.memory_usage(deep=True).sum()
+    print(f"read_sheet     {len(df):>8,} rows x {df.shape[1]:<4} {seconds:6.2f}s  peak {peak / 2**20:8.1f} MiB  frame {frame_bytes / 2**20:.1f} MiB")
+
+    if args.compare:
+        expected, peak, seconds = peak_memory(pd.read_excel, args.path, sheet_name=args.sheet, header=args.header)
+        print(f"pd.read_excel  {len(expected):>8,} rows x {expected.shape[1]:<4} {seconds:6.2f}s  peak {peak / 2**20:8.1f} MiB")
+        pd.testing.assert_frame_equal(df, expected)
+        print("Results match.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+# --- utils/figure_cache.py ---
+import threading
+from collections import OrderedDict
+
+import plotly.io as pio
+import streamlit as st
+
+from utils.perf import timer
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_MAX_ENTRIES = 256
+
+class FigureCache:
+    """
+    LRU cache of serialized Plotly figures.
+
+    Entries are keyed by (dataset version, figure type, filter tuple) and hold the
+    figure JSON. The least recently used entries are evicted once either the
+    entry count or the total JSON size goes over its limit.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            fig_json = self._entries.get(key)
+            if fig_json is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return fig_json
+
+    def put(self, key, fig_json):
+        size = len(fig_json)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self.total_bytes -= len(self._entries.pop(key))
+            self._entries[key] = fig_json
+            self.total_bytes += size
+            while self._entries and (self.total_bytes > self.max_bytes or len(self._entries) > self.max_entries):
+                _, evicted = self._entries.popitem(last=False)
+                self.total_bytes -= len(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+# Shared by all sessions of the server process
+@st.cache_resource
+def get_figure_cache():
+    return FigureCache()
+
+def cached_figure(dataset_version, figure_type, filters, build_fn):
+    """
+    Return the figure for (dataset_version, figure_type, filters), building it with
+    build_fn() only when it is not cached yet.
+
+    Args:
+        dataset_version: Version stamp of the data behind the figure (see dataset_version)
+        figure_type: Name of the chart, e.g. "monthly_trend"
+        filters: Tuple of the filter values the figure depends on
+        build_fn: Callable returning a plotly Figure
+
+    Returns:
+        plotly Figure
+    """
+    cache = get_figure_cache()
+    key = (dataset_version, figure_type, tuple(filters))
+
+    fig_json = cache.get(key)
+    if fig_json is None:
+        with timer(f"figure.{figure_type}", kind="figure") as t:
+            fig_json = pio.to_json(build_fn(), validate=False)
+            t.bytes = len(fig_json)
+        cache.put(key, fig_json)
+    return pio.from_json(fig_json, skip_invalid=True)
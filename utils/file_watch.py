@@ -0,0 +1,118 @@
+# --- utils/file_watch.py ---
+"""
+Change notifications for a fixed set of files.
+
+InotifyWatcher uses Linux inotify (through ctypes, no extra package) on the
+files' directories, so replacing a file by rename is seen as well as writing
+it in place. PollingWatcher compares modification time and size every few
+seconds and works everywhere. create_watcher() picks inotify when it is
+available.
+
+    watcher = create_watcher(["data/ESTIMASIPO2025.xlsx", "all_site_master.csv"])
+    while True:
+        for path in watcher.changes(timeout=1.0):
+            ...
+"""
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+
+from utils.data_loader import file_version
+
+POLL_INTERVAL_SECONDS = 2.0
+
+# <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = getattr(os, "O_CLOEXEC", 0o2000000)
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, len (then len bytes of name)
+
+class PollingWatcher:
+    """Reports a file as changed when its modification time or size differs from the last poll."""
+
+    def __init__(self, paths, interval=POLL_INTERVAL_SECONDS):
+        self.paths = [os.path.abspath(path) for path in paths]
+        self.interval = interval
+        self._versions = {path: file_version(path) for path in self.paths}
+
+    def changes(self, timeout=None):
+        """Paths changed since the last call, waiting up to timeout seconds (one poll interval by default)."""
+        time.sleep(self.interval if timeout is None else min(timeout, self.interval))
+        changed = set()
+        for path in self.paths:
+            version = file_version(path)
+            if version != self._versions[path]:
+                self._versions[path] = version
+                changed.add(path)
+        return changed
+
+    def close(self):
+        pass
+
+class InotifyWatcher:
+    """Reports the watched files named in inotify events on their directories."""
+
+    def __init__(self, paths):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.paths = [os.path.abspath(path) for path in paths]
+        self._fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        # {watch descriptor: directory}, {directory: watched file names}
+        self._directories = {}
+        self._names = {}
+        for path in self.paths:
+            directory, name = os.path.split(path)
+            if directory not in self._names:
+                wd = libc.inotify_add_watch(self._fd, os.fsencode(directory), WATCH_MASK)
+                if wd < 0:
+                    os.close(self._fd)
+                    raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {directory}")
+                self._directories[wd] = directory
+                self._names[directory] = set()
+            self._names[directory].add(name)
+
+    def changes(self, timeout=None):
+        """Paths changed since the last call, waiting up to timeout seconds for the first event."""
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return set()
+        changed = set()
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, cookie, length = EVENT_HEADER.unpack_from(data, offset)
+                offset += EVENT_HEADER.size
+                name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+                offset += length
+                directory = self._directories.get(wd)
+                if directory is not None and name in self._names[directory]:
+                    changed.add(os.path.join(directory, name))
+        return changed
+
+    def close(self):
+        os.close(self._fd)
+
+def create_watcher(paths, interval=POLL_INTERVAL_SECONDS):
+    """InotifyWatcher on Linux when inotify can be set up, otherwise a PollingWatcher."""
+    if sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(paths)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(paths, interval)
@@ -0,0 +1,73 @@
+# --- utils/import_report.py ---
+"""
+Import-time report for the dashboard pages.
+
+Runs `python -X importtime` in a fresh interpreter for every page module and
+prints how long the page takes to import on top of Streamlit, plus its most
+expensive direct imports.
+
+    python -m utils.import_report
+    python -m utils.import_report --top 10 my_pages.tracker_bbm
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+PAGE_MODULES = ["my_pages.availability", "my_pages.tracker_bbm", "my_pages.dapot", "my_pages.site360"]
+
+# Imported before the page so their cost is not attributed to it
+BASELINE_MODULES = ["streamlit", "pandas", "sidebar"]
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LINE_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$")
+
+def parse_importtime(stderr):
+    """Parse -X importtime output into (self_us, cumulative_us, depth, module) tuples."""
+    entries = []
+    for line in stderr.splitlines():
+        match = LINE_RE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            entries.append((int(self_us), int(cumulative_us), len(indent) // 2, module))
+    return entries
+
+def measure_import(module, baseline=BASELINE_MODULES):
+    """
+    Import module in a fresh interpreter after the baseline modules.
+
+    Returns:
+        Tuple of (total_ms, [(direct import, cumulative_ms), ...]) for module.
+    """
+    code = "".join(f"import {name}; " for name in baseline) + f"import {module}"
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True, text=True, cwd=REPO_ROOT
+    )
+    entries = parse_importtime(proc.stderr)
+
+    # Children are printed before their parent; the page's direct imports are the
+    # depth-1 entries between the previous top-level entry and the page itself.
+    for i, (_, cumulative_us, depth, name) in enumerate(entries):
+        if depth == 0 and name == module:
+            start = max((j for j in range(i) if entries[j][2] == 0), default=-1) + 1
+            children = [(child, cum / 1000) for _, cum, d, child in entries[start:i] if d == 1]
+            return cumulative_us / 1000, sorted(children, key=lambda item: -item[1])
+
+    raise RuntimeError(f"Could not import {module}:\n{proc.stderr[-2000:]}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Report import time of the dashboard pages.")
+    parser.add_argument("modules", nargs="*", default=PAGE_MODULES)
+    parser.add_argument("--top", type=int, default=5, help="Direct imports to list per page")
+    args = parser.parse_args()
+
+    for module in args.modules:
+        total_ms, children = measure_import(module)
+        print(f"{module:<28} {total_ms:8.1f} ms")
+        for child, child_ms in children[:args.top]:
+            print(f"    {child:<40} {child_ms:8.1f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+# --- utils/kpi.py ---
+"""
+Area / Regional KPI rollups.
+
+The headline numbers (average availability, share of sites achieving target,
+total Nominal PO and penalty, low-fuel sites) are aggregated once per
+(level, group, month) when the datasets are loaded, instead of over the
+site-level rows on every page run. KPIRollups.get() is then a dict lookup.
+
+Levels are "All" (group "All"), "Area" and "Regional". Availability and PO
+KPIs are per month and rebuilt when their files change; the fuel counts are the
+current BBM status, so they are kept per group without a month and taken from
+the newest status snapshot of the BBM alert scheduler.
+"""
+import copy
+import time
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils.bbm_alerts import compute_bbm_status, list_snapshots, read_snapshot
+from utils.data_loader import (
+    load_availability_data, load_cdc_po_data, load_bbm_data, load_site_master,
+    dataset_version, AVAILABILITY_PATH, CDC_PO_PATH, SITE_MASTER_PATH
+)
+from utils.perf import instrument
+from utils.reports import add_month_year
+
+ALL = "All"
+LEVELS = ("All", "Area", "Regional")
+
+MONTHLY_KPIS = ["Avg Availability", "Sites", "Sites Achieved", "Target Achievement", "Nominal PO", "Nilai Penalty"]
+FUEL_KPIS = ["Low Fuel Sites", "Critical Fuel Sites"]
+
+# Without a status snapshot the fuel counts are recomputed this often (the scheduler's interval)
+FUEL_REFRESH_SECONDS = 900
+
+def _rollup(df, value_columns, by_month=True, **aggregations):
+    """
+    Aggregate df at every level.
+
+    Args:
+        df: Rows with 'Area' and 'Regional' columns (and 'Month' when by_month)
+        aggregations: Named aggregations, as for DataFrame.groupby().agg()
+
+    Returns:
+        One row per Level, Group (and Month) with the aggregated columns
+    """
+    month = ["Month"] if by_month else []
+    frames = []
+    for level in LEVELS:
+        group = pd.Series(ALL, index=df.index) if level == ALL else df[level]
+        rolled = df.assign(Group=group).groupby(["Group"] + month, sort=True).agg(**aggregations)
+        frames.append(rolled.reset_index().assign(Level=level))
+    result = pd.concat(frames, ignore_index=True)
+    return result[["Level", "Group"] + month + list(value_columns)]
+
+def availability_rollup(melted_df):
+    """Avg Availability (of the daily values), Sites, Sites Achieved and Target Achievement per level and month."""
+    availability = pd.to_numeric(melted_df["Availability"], errors="coerce")
+    df = melted_df.assign(Availability=availability).dropna(subset=["Site ID", "Availability"])
+    df = df.assign(Month=pd.to_datetime(df["Date"]).dt.to_period("M"))
+
+    # Site-months first: a site achieves target when its monthly mean reaches Target AVA
+    site_months = df.groupby(["Site ID", "Month"], sort=False).agg(
+        Area=("Area", "first"), Regional=("Regional", "first"),
+        Target=("Target AVA", "first"), Total=("Availability", "sum"), Days=("Availability", "count")
+    ).reset_index()
+    target = pd.to_numeric(site_months["Target"], errors="coerce")
+    site_months["Achieved"] = (site_months["Total"] / site_months["Days"] >= target).astype(int)
+
+    rolled = _rollup(
+        site_months, ["Total", "Days", "Sites", "Sites Achieved"],
+        Total=("Total", "sum"), Days=("Days", "sum"),
+        Sites=("Site ID", "nunique"), **{"Sites Achieved": ("Achieved", "sum")}
+    )
+    rolled["Avg Availability"] = rolled["Total"] / rolled["Days"]
+    rolled["Target Achievement"] = rolled["Sites Achieved"] / rolled["Sites"]
+    return rolled.drop(columns=["Total", "Days"])
+
+def po_rollup(cdc_df, site_master):
+    """Total Nominal PO and Nilai Penalty per level and month (Area from the site master)."""
+    area_by_site = site_master.drop_duplicates("site_id").set_index("site_id")["area"]
+    po = add_month_year(cdc_df)
+    po = po.assign(
+        Area=po["Site Id"].map(area_by_site),
+        Regional=po["Regional TI"],
+        Month=pd.PeriodIndex.from_fields(year=po["Year"].astype(int), month=po["Month_Num"], freq="M"),
+        **{col: pd.to_numeric(po[col], errors="coerce") for col in ["Nominal PO", "Nilai Penalty"]}
+    )
+    return _rollup(
+        po, ["Nominal PO", "Nilai Penalty"],
+        **{"Nominal PO": ("Nominal PO", "sum"), "Nilai Penalty": ("Nilai Penalty", "sum")}
+    )
+
+def fuel_rollup(status_df):
+    """Current Low Fuel Sites (warning or critical) and Critical Fuel Sites per level."""
+    if status_df.empty:
+        return pd.DataFrame(columns=["Level", "Group"] + FUEL_KPIS)
+    status = status_df.assign(
+        Area=status_df["area"], Regional=status_df["regional"],
+        low=(status_df["status_level"] >= 1).astype(int), critical=(status_df["status_level"] >= 2).astype(int)
+    )
+    return _rollup(
+        status, FUEL_KPIS, by_month=False,
+        **{"Low Fuel Sites": ("low", "sum"), "Critical Fuel Sites": ("critical", "sum")}
+    )
+
+class KPIRollups:
+    """
+    Materialized KPI tables with constant-time lookups.
+
+    Attributes:
+        monthly: One row per Level, Group and Month with MONTHLY_KPIS
+        fuel: One row per Level and Group with FUEL_KPIS (see with_fuel)
+        months: Months with any KPI, oldest first
+        regionals_by_area: {area: sorted regionals}, for the header filters
+    """
+
+    def __init__(self, availability, po, regionals_by_area, fuel=None):
+        keys = ["Level", "Group", "Month"]
+        monthly = availability.merge(po, on=keys, how="outer")
+        self.monthly = monthly.reindex(columns=keys + MONTHLY_KPIS).sort_values(keys, kind="stable").reset_index(drop=True)
+        self.months = sorted(self.monthly["Month"].dropna().unique())
+        self.regionals_by_area = regionals_by_area
+
+        self._monthly = {
+            (level, group, month): record
+            for level, group, month, record in zip(
+                self.monthly["Level"], self.monthly["Group"], self.monthly["Month"],
+                self.monthly[MONTHLY_KPIS].to_dict("records")
+            )
+        }
+        self._set_fuel(fuel if fuel is not None else fuel_rollup(pd.DataFrame()))
+
+    def _set_fuel(self, fuel):
+        self.fuel = fuel
+        self._fuel = {
+            (level, group): record
+            for level, group, record in zip(fuel["Level"], fuel["Group"], fuel[FUEL_KPIS].to_dict("records"))
+        }
+
+    def with_fuel(self, fuel):
+        """Copy sharing the monthly KPIs, with the fuel KPIs of fuel (a fuel_rollup)."""
+        rollups = copy.copy(self)
+        rollups._set_fuel(fuel)
+        return rollups
+
+    def get(self, area=None, regional=None, month=None):
+        """
+        KPIs of one group and month; None or "All" selects the wider level.
+
+        Returns:
+            {kpi: value} with MONTHLY_KPIS and FUEL_KPIS, NaN where there is no data
+        """
+        if regional not in (None, ALL):
+            key = ("Regional", regional)
+        elif area not in (None, ALL):
+            key = ("Area", area)
+        else:
+            key = (ALL, ALL)
+        month = pd.Period(month, "M") if month is not None else (self.months[-1] if self.months else None)
+
+        empty = dict.fromkeys(MONTHLY_KPIS + FUEL_KPIS, np.nan)
+        return {**empty, **self._monthly.get(key + (month,), {}), **self._fuel.get(key, {})}
+
+def build_kpi_rollups(melted_df, cdc_df, site_master, status_df=None):
+    """KPIRollups from the availability, PO and site master frames (and the BBM status, if given)."""
+    hierarchy = pd.concat([
+        melted_df[["Area", "Regional"]],
+        site_master[["area", "regional"]].set_axis(["Area", "Regional"], axis=1),
+    ]).dropna().drop_duplicates()
+    regionals_by_area = {
+        area: sorted(group["Regional"].unique().tolist()) for area, group in hierarchy.groupby("Area")
+    }
+    return KPIRollups(
+        availability_rollup(melted_df), po_rollup(cdc_df, site_master), regionals_by_area,
+        fuel_rollup(status_df) if status_df is not None else None
+    )
+
+@instrument("compute.kpi_rollups", kind="compute")
+def load_kpi_rollups():
+    return build_kpi_rollups(load_availability_data(), load_cdc_po_data(), load_site_master())
+
+def fuel_status_key():
+    """Newest BBM status snapshot path, or the current FUEL_REFRESH_SECONDS slot when there is none."""
+    paths = list_snapshots()
+    return paths[-1] if paths else int(time.time() // FUEL_REFRESH_SECONDS)
+
+def load_fuel_status(key):
+    """BBM status of every site: the snapshot at path key, computed from the refills otherwise."""
+    if isinstance(key, str):
+        try:
+            return read_snapshot(key)[1]
+        except (OSError, ValueError):
+            pass  # pruned in the meantime
+    try:
+        return compute_bbm_status(load_bbm_data())
+    except Exception:
+        return pd.DataFrame()
+
+@st.cache_resource(show_spinner="Building KPI rollups...", max_entries=2)
+def _cached_kpi_rollups(version):
+    return load_kpi_rollups()
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def _cached_fuel_rollup(key):
+    return fuel_rollup(load_fuel_status(key))
+
+def get_kpi_rollups():
+    """
+    Rollups shared by all sessions: the monthly KPIs are rebuilt when a data file changes,
+    the fuel counts when the BBM alert scheduler writes a new status snapshot.
+    """
+    rollups = _cached_kpi_rollups(dataset_version(AVAILABILITY_PATH, CDC_PO_PATH, SITE_MASTER_PATH))
+    return rollups.with_fuel(_cached_fuel_rollup(fuel_status_key()))
+
+def clear_kpi_rollups():
+    """Drop the cached rollups."""
+    _cached_kpi_rollups.clear()
+    _cached_fuel_rollup.clear()
+
+@st.fragment
+def show_kpi_strip():
+    """
+    KPI header for one Area / Regional and month, read from the rollups.
+    Renders nothing while the dataset warm-up is still building them; when the
+    warm-up failed to, they are built here.
+    """
+    from utils.datasets import start_dataset_warmup, PENDING, LOADING
+
+    if start_dataset_warmup().status().get("kpi", {}).get("state") in (PENDING, LOADING):
+        return
+    try:
+        rollups = get_kpi_rollups()
+    except Exception as e:
+        st.caption(f"⚠️ KPI tidak tersedia: {e}")
+        return
+    if not rollups.months:
+        return
+
+    with st.container(border=True):
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            selected_area = st.selectbox("Area", options=[ALL] + sorted(rollups.regionals_by_area), key="kpi_area")
+        with col2:
+            regionals = rollups.regionals_by_area.get(selected_area) or sorted(
+                {regional for regionals in rollups.regionals_by_area.values() for regional in regionals}
+            )
+            selected_regional = st.selectbox("Regional", options=[ALL] + regionals, key="kpi_regional")
+        with col3:
+            selected_month = st.selectbox(
+                "Month", options=rollups.months[::-1], format_func=lambda month: month.strftime("%b %Y"),
+                key="kpi_month"
+            )
+
+        kpis = rollups.get(selected_area, selected_regional, selected_month)
+        metric_cols = st.columns(5)
+        metric_cols[0].metric("Avg Availability", "-" if pd.isna(kpis["Avg Availability"]) else f"{kpis['Avg Availability']:.2f}%")
+        metric_cols[1].metric(
+            "Sites Achieved Target",
+            "-" if pd.isna(kpis["Target Achievement"]) else f"{kpis['Target Achievement']:.0%}",
+            help="Sites whose monthly average availability reached their Target AVA"
+        )
+        metric_cols[2].metric("Nominal PO", "-" if pd.isna(kpis["Nominal PO"]) else f"Rp {kpis['Nominal PO']:,.0f}")
+        metric_cols[3].metric("Nilai Penalty", "-" if pd.isna(kpis["Nilai Penalty"]) else f"Rp {kpis['Nilai Penalty']:,.0f}")
+        metric_cols[4].metric(
+            "Low Fuel Sites (now)", "-" if pd.isna(kpis["Low Fuel Sites"]) else f"{kpis['Low Fuel Sites']:,.0f}",
+            help="Sites at 80%+ of their last refill; the critical (90%+) ones are in the delta",
+            delta=None if pd.isna(kpis["Critical Fuel Sites"]) else f"{kpis['Critical Fuel Sites']:,.0f} critical",
+            delta_color="inverse"
+        )
@@ -0,0 +1,150 @@
+# --- utils/penalty.py ---
+"""
+Month-to-date penalty projection.
+
+'Persentase Penalty' and 'Nilai Penalty' in ESTIMASIPO are filled in once a month
+closes. project_penalties() estimates them for the current month from the daily
+availability so far, for every site in one batch: a grouped mean over the daily
+rows joined to each site's latest PO terms, then the penalty rules below as
+vectorized array operations.
+
+Rules, as used in ESTIMASIPO2025.xlsx:
+    Target Availability   by Class Site (TARGET_BY_CLASS), else the latest PO row's target
+    Nilai BAST            ROUND(Jumlah Periode x Nominal PO x Index BBM)
+    Nilai Penalty         ROUND(Nilai BAST x Persentase Penalty)
+    Persentase Penalty    by how far availability falls short of target (PENALTY_TIERS),
+                          plus REPEAT_PENALTY_STEP for every consecutive earlier month
+                          the site missed its target
+"""
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils.data_loader import (
+    load_availability_data, load_cdc_po_data, dataset_version, AVAILABILITY_PATH, CDC_PO_PATH
+)
+from utils.perf import instrument
+from utils.reports import add_month_year
+
+TARGET_BY_CLASS = {"Diamond": 0.994, "Platinum": 0.994, "Gold": 0.99, "Silver": 0.975, "Bronze": 0.975}
+
+# (shortfall up to, penalty): shortfall is target minus availability, as a fraction
+PENALTY_TIERS = [(0.005, 0.05), (0.01, 0.10), (0.02, 0.15)]
+MAX_TIER_PENALTY = 0.25
+REPEAT_PENALTY_STEP = 0.05
+
+# Latest PO terms carried into the projection
+PO_COLUMNS = [
+    'Site Id', 'Site Name', 'Regional TI', 'Class Site', 'Jumlah Periode (Bulan)', 'Nominal PO', 'Index BBM',
+    'Target Availability (%)'
+]
+
+def penalty_rate(shortfall, prior_misses=0):
+    """
+    Persentase Penalty for arrays of shortfall (target - availability) and the number
+    of consecutive earlier months without achievement.
+    """
+    shortfall = np.asarray(shortfall, dtype="float64")
+    bounds, rates = zip(*PENALTY_TIERS)
+    base = np.select(
+        [shortfall <= 0] + [shortfall <= bound for bound in bounds],
+        [0.0] + list(rates),
+        default=MAX_TIER_PENALTY,
+    )
+    base = np.where(np.isnan(shortfall), np.nan, base)
+    return np.round(np.where(base > 0, base + REPEAT_PENALTY_STEP * np.asarray(prior_misses), base), 4)
+
+def trailing_misses(missed):
+    """
+    Consecutive missed months at the end of each row.
+
+    Args:
+        missed: sites x months boolean array, oldest month first
+    """
+    missed = np.asarray(missed, dtype=bool)
+    if missed.ndim != 2 or not missed.shape[1]:
+        return np.zeros(len(missed), dtype=int)
+    last_ok = np.where(missed, -1, np.arange(missed.shape[1])).max(axis=1)
+    return missed.shape[1] - 1 - last_ok
+
+def project_penalties(cdc_df, melted_df, month=None):
+    """
+    Projected availability and penalty of every site for one month.
+
+    Args:
+        cdc_df: PO rows (see load_cdc_po_data)
+        melted_df: Daily availability rows (see load_availability_data)
+        month: Month to project (Timestamp or 'YYYY-MM'); default the latest month with daily data
+
+    Returns:
+        (month as Period, one row per site with PO terms, Days Counted, Projected Availability,
+        Target Availability (%), Prior Missed Months, Persentase Penalty, Nilai BAST,
+        Nilai Penalty, Nilai BAST dikurangi Penalty and Ava Achievement: 'Unknown' when the
+        site has no target or no availability value)
+    """
+    dates = pd.to_datetime(melted_df['Date'])
+    month = pd.Period(month, 'M') if month is not None else dates.max().to_period('M')
+
+    # Month-to-date mean availability per site (daily data is in %, PO in fractions)
+    in_month = (dates >= month.start_time) & (dates <= month.end_time)
+    mtd = (
+        melted_df.loc[in_month.to_numpy()]
+        .groupby('Site ID')['Availability']
+        .agg(['mean', 'count'])
+        .rename(columns={'mean': 'Projected Availability', 'count': 'Days Counted'})
+    )
+    mtd['Projected Availability'] = mtd['Projected Availability'] / 100
+
+    # Latest PO terms before the projected month, and the run of missed months leading up to it
+    po = add_month_year(cdc_df)
+    po = po.assign(Period=pd.PeriodIndex.from_fields(
+        year=po['Year'].astype(int), month=po['Month_Num'], freq='M'
+    ))
+    po = po[po['Period'] <= month]
+    history = po[po['Period'] < month]
+    latest = po.drop_duplicates('Site Id', keep='last').set_index('Site Id')
+    latest = latest[[col for col in PO_COLUMNS if col != 'Site Id']]
+
+    missed = (
+        history.assign(missed=history['Avaibility'] < history['Target Availability (%)'])
+        .pivot_table(index='Site Id', columns='Period', values='missed', aggfunc='max', fill_value=False)
+    )
+    prior_misses = pd.Series(trailing_misses(missed.to_numpy()), index=missed.index)
+    latest['Prior Missed Months'] = prior_misses.reindex(latest.index).fillna(0).astype(int)
+
+    result = latest.join(mtd, how='inner')
+    # Classes without a rule keep the target of their PO row
+    result['Target Availability (%)'] = result['Class Site'].map(TARGET_BY_CLASS).fillna(
+        pd.to_numeric(result['Target Availability (%)'], errors='coerce')
+    )
+
+    shortfall = (result['Target Availability (%)'] - result['Projected Availability']).to_numpy()
+    result['Persentase Penalty'] = penalty_rate(shortfall, result['Prior Missed Months'].to_numpy())
+    result['Nilai BAST'] = (
+        result['Jumlah Periode (Bulan)'] * result['Nominal PO'] * result['Index BBM']
+    ).round(0)
+    result['Nilai Penalty'] = (result['Nilai BAST'] * result['Persentase Penalty']).round(0)
+    result['Nilai BAST dikurangi Penalty'] = result['Nilai BAST'] - result['Nilai Penalty']
+    result['Ava Achievement'] = np.select(
+        [
+            result['Target Availability (%)'].isna() | result['Projected Availability'].isna(),
+            result['Projected Availability'] >= result['Target Availability (%)'],
+        ],
+        ['Unknown', 'Achieved'],
+        default='Not Achieved',
+    )
+
+    result = result.rename_axis('Site Id').reset_index()
+    return month, result.sort_values('Nilai Penalty', ascending=False, kind='stable').reset_index(drop=True)
+
+@instrument("compute.penalty_projection", kind="compute")
+def build_penalty_projection():
+    return project_penalties(load_cdc_po_data(), load_availability_data())
+
+@st.cache_resource(show_spinner="Projecting penalties...", max_entries=2)
+def _cached_penalty_projection(version):
+    return build_penalty_projection()
+
+def get_penalty_projection():
+    """(month, projection) shared by all sessions, recomputed when the PO or availability file changes."""
+    return _cached_penalty_projection(dataset_version(AVAILABILITY_PATH, CDC_PO_PATH))
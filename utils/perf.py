@@ -0,0 +1,209 @@
+# --- utils/perf.py ---
+"""
+Lightweight performance instrumentation.
+
+Loaders, API calls, page sections, figure builds and exports are wrapped with
+`instrument` / `timer`. Each call costs one perf_counter pair and a locked deque
+append; percentiles are only computed when the metrics are read, so this stays
+on in production.
+
+Metrics are shown in the hidden admin panel (open the app with `?admin=perf&key=<admin key>`)
+and written periodically to METRICS_JSON_PATH and METRICS_PROM_PATH (Prometheus
+text format) by the exporter thread.
+"""
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+
+import streamlit as st
+
+WINDOW = 512  # samples kept per metric for the rolling percentiles
+PERCENTILES = (50, 90, 99)
+METRICS_JSON_PATH = "data/metrics.json"
+METRICS_PROM_PATH = "data/metrics.prom"
+EXPORT_INTERVAL_SECONDS = 30
+
+class _Metric:
+    __slots__ = ("kind", "count", "errors", "total_seconds", "max_seconds", "rows", "bytes", "samples")
+
+    def __init__(self, kind):
+        self.kind = kind
+        self.count = 0
+        self.errors = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.rows = 0
+        self.bytes = 0
+        self.samples = deque(maxlen=WINDOW)
+
+def _percentile(sorted_samples, pct):
+    if not sorted_samples:
+        return None
+    index = min(len(sorted_samples) - 1, int(round(pct / 100 * (len(sorted_samples) - 1))))
+    return sorted_samples[index]
+
+class MetricsRegistry:
+    """Thread-safe store of timings and row/byte counters, keyed by metric name."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics = {}
+
+    def record(self, name, kind, seconds, rows=None, nbytes=None, error=False):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = _Metric(kind)
+            metric.count += 1
+            metric.errors += bool(error)
+            metric.total_seconds += seconds
+            metric.max_seconds = max(metric.max_seconds, seconds)
+            metric.rows += rows or 0
+            metric.bytes += nbytes or 0
+            metric.samples.append(seconds)
+
+    def reset(self):
+        with self._lock:
+            self._metrics.clear()
+
+    def snapshot(self):
+        """
+        Current metrics, one dict per metric name sorted by name.
+
+        Returns:
+            List of dicts with name, kind, count, errors, rows, bytes, mean/max and
+            p50/p90/p99 of the last WINDOW calls (seconds).
+        """
+        with self._lock:
+            items = [
+                (name, m.kind, m.count, m.errors, m.total_seconds, m.max_seconds, m.rows, m.bytes, sorted(m.samples))
+                for name, m in self._metrics.items()
+            ]
+
+        rows = []
+        for name, kind, count, errors, total, max_seconds, n_rows, n_bytes, samples in sorted(items):
+            row = {
+                "name": name, "kind": kind, "count": count, "errors": errors,
+                "rows": n_rows, "bytes": n_bytes,
+                "mean_s": total / count if count else None, "max_s": max_seconds,
+                "sum_s": total,
+            }
+            for pct in PERCENTILES:
+                row[f"p{pct}_s"] = _percentile(samples, pct)
+            rows.append(row)
+        return rows
+
+    def to_prometheus(self):
+        """Metrics in the Prometheus text exposition format."""
+        lines = [
+            "# HELP cdcdash_duration_seconds Call duration over the last calls.",
+            "# TYPE cdcdash_duration_seconds summary",
+        ]
+        counters = {"errors": [], "rows": [], "bytes": []}
+        for row in self.snapshot():
+            labels = f'name="{row["name"]}",kind="{row["kind"]}"'
+            for pct in PERCENTILES:
+                lines.append(f'cdcdash_duration_seconds{{{labels},quantile="{pct / 100}"}} {row[f"p{pct}_s"]:.6f}')
+            lines.append(f"cdcdash_duration_seconds_sum{{{labels}}} {row['sum_s']:.6f}")
+            lines.append(f"cdcdash_duration_seconds_count{{{labels}}} {row['count']}")
+            for counter in counters:
+                counters[counter].append(f"cdcdash_{counter}_total{{{labels}}} {row[counter]}")
+
+        for counter, samples in counters.items():
+            lines.append(f"# TYPE cdcdash_{counter}_total counter")
+            lines.extend(samples)
+        return "\n".join(lines) + "\n"
+
+    def write(self, json_path=METRICS_JSON_PATH, prom_path=METRICS_PROM_PATH):
+        """Write the JSON and Prometheus files (each replaced atomically)."""
+        outputs = [
+            (json_path, json.dumps({"generated_at": time.time(), "metrics": self.snapshot()}, indent=2)),
+            (prom_path, self.to_prometheus()),
+        ]
+        for path, text in outputs:
+            if not path:
+                continue
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(tmp_path, path)
+
+# Process-wide registry used by instrument() and timer()
+REGISTRY = MetricsRegistry()
+
+def _size_of(result):
+    """(rows, bytes) of a call result, where that is cheap to know."""
+    if hasattr(result, "shape") and hasattr(result, "memory_usage"):
+        return len(result), int(result.memory_usage(index=False).sum())
+    if isinstance(result, (bytes, bytearray, str)):
+        return None, len(result)
+    return None, None
+
+class timer:
+    """
+    Context manager that records the duration of its block.
+
+    Set `rows` / `bytes` on the returned object to count them as well:
+
+        with timer("export.bbm_history", kind="export") as t:
+            data = build_excel()
+            t.bytes = len(data)
+    """
+
+    def __init__(self, name, kind="misc", registry=None):
+        self.name = name
+        self.kind = kind
+        self.registry = registry or REGISTRY
+        self.rows = None
+        self.bytes = None
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # Streamlit's rerun/stop signals are BaseExceptions, not errors
+        error = exc_type is not None and issubclass(exc_type, Exception)
+        self.registry.record(self.name, self.kind, time.perf_counter() - self._start, self.rows, self.bytes, error)
+        return False
+
+def instrument(name, kind="misc"):
+    """
+    Decorator that times every call of the function. Rows and bytes are counted
+    automatically when it returns a DataFrame, bytes or str.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with timer(name, kind) as t:
+                result = func(*args, **kwargs)
+                t.rows, t.bytes = _size_of(result)
+            return result
+        return wrapper
+    return decorator
+
+def export_metrics_forever(interval_seconds=EXPORT_INTERVAL_SECONDS, stop_event=None):
+    stop_event = stop_event or threading.Event()
+    while not stop_event.wait(interval_seconds):
+        try:
+            REGISTRY.write()
+        except OSError:
+            pass
+
+@st.cache_resource(on_release=lambda stop_event: stop_event.set())
+def start_metrics_exporter():
+    """
+    Write the metrics files every EXPORT_INTERVAL_SECONDS, once per server process.
+    Clearing the cache stops the exporter thread (the next run starts a new one).
+    """
+    stop_event = threading.Event()
+    thread = threading.Thread(
+        target=export_metrics_forever, kwargs={"stop_event": stop_event},
+        name="metrics-exporter", daemon=True
+    )
+    thread.start()
+    return stop_event
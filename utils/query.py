@@ -0,0 +1,331 @@
+# --- utils/query.py ---
+"""
+Filter + aggregate queries over the loaded datasets.
+
+QueryEngine registers DataFrames as tables and answers select / aggregate /
+distinct queries with pandas frames as results. When the optional duckdb
+package is installed the queries run in an in-process DuckDB database (the
+frames are registered as Arrow tables); otherwise the same queries run as
+pandas masks and groupbys, with the same results.
+
+    engine = QueryEngine({"availability": load_availability_data()})
+    engine.aggregate(
+        "availability",
+        by=["Regional", TimeBucket("Date", "month", "Month")],
+        metrics={"avg_availability": ("Availability", "mean")},
+        where={"Area": "Area1", "Date": Between("2025-01-01", "2025-03-31")},
+    )
+
+Filters (where) map a column to:
+    None                 no filter (the pages' "All" / "Show All")
+    scalar               column == value
+    list / tuple / set   column in values
+    Between(lo, hi)      lo <= column <= hi, either bound may be None
+"""
+import threading
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils.data_loader import (
+    load_availability_data, load_cdc_po_data, load_dapot_alpro_data, load_site_master,
+    dataset_version, AVAILABILITY_PATH, CDC_PO_PATH, DAPOT_PATH, SITE_MASTER_PATH
+)
+from utils.perf import timer
+
+BACKENDS = ("duckdb", "pandas")
+
+# Aggregate name -> (pandas groupby function, DuckDB SQL template)
+AGGREGATES = {
+    "mean": ("mean", "avg({col})"),
+    "sum": ("sum", "sum({col})"),
+    "min": ("min", "min({col})"),
+    "max": ("max", "max({col})"),
+    "count": ("count", "count({col})"),
+    "nunique": ("nunique", "count(DISTINCT {col})"),
+}
+
+# date_trunc units supported by TimeBucket, with the matching pandas period
+TIME_UNITS = {"day": "D", "month": "M", "year": "Y"}
+
+class Between:
+    """Inclusive range filter; a bound of None leaves that side open."""
+
+    def __init__(self, low=None, high=None):
+        self.low = low
+        self.high = high
+
+    def __repr__(self):
+        return f"Between({self.low!r}, {self.high!r})"
+
+class TimeBucket:
+    """Group-by key that truncates a datetime column to the start of its day/month/year."""
+
+    def __init__(self, column: str, unit: str = "month", name: Optional[str] = None):
+        if unit not in TIME_UNITS:
+            raise ValueError(f"Unknown time unit {unit!r}, expected one of {list(TIME_UNITS)}")
+        self.column = column
+        self.unit = unit
+        self.name = name or column
+
+    def __repr__(self):
+        return f"TimeBucket({self.column!r}, {self.unit!r}, {self.name!r})"
+
+GroupKey = Union[str, TimeBucket]
+Metric = Tuple[str, str]
+
+def _quote(name):
+    return '"' + str(name).replace('"', '""') + '"'
+
+def _param(value):
+    return value.to_pydatetime() if isinstance(value, pd.Timestamp) else value
+
+def active_filter(value, all_labels=("All", "Show All")):
+    """Filter value for a page selectbox choice: None when "All" / "Show All" is selected."""
+    return None if value in all_labels else value
+
+def filter_rows(df, where):
+    """
+    Rows of df matching where, selected with one combined mask.
+
+    Returns df itself when no filter is active, so unfiltered views cost nothing;
+    otherwise a new frame (copy-on-write, so never write through to the shared data).
+    """
+    active = {column: value for column, value in (where or {}).items() if value is not None}
+    if not active:
+        return df
+    mask = np.ones(len(df), dtype=bool)
+    for column, value in active.items():
+        values = df[column]
+        if isinstance(value, Between):
+            if value.low is not None:
+                mask &= (values >= value.low).to_numpy(dtype=bool, na_value=False)
+            if value.high is not None:
+                mask &= (values <= value.high).to_numpy(dtype=bool, na_value=False)
+        elif isinstance(value, (list, tuple, set)):
+            mask &= values.isin(list(value)).to_numpy(dtype=bool)
+        else:
+            mask &= (values == value).to_numpy(dtype=bool, na_value=False)
+    return df[mask]
+
+def _columnar(df):
+    """
+    Arrow view of df for DuckDB to scan (much faster than scanning pandas string
+    columns). Falls back to the frame itself when a column has mixed types.
+    """
+    try:
+        import pyarrow as pa
+        return pa.Table.from_pandas(df, preserve_index=False)
+    except Exception:
+        return df
+
+def _import_duckdb():
+    """The duckdb module, or None when it is not installed. Imported on first use, as it takes ~50 ms."""
+    try:
+        import duckdb
+    except ImportError:  # optional: queries fall back to pandas
+        return None
+    return duckdb
+
+def _key_name(key):
+    return key.name if isinstance(key, TimeBucket) else key
+
+class QueryEngine:
+    """
+    Tables registered by name, queried through select(), aggregate() and distinct().
+
+    Safe to share between sessions: DuckDB queries are serialized on one connection,
+    and registered frames are never modified.
+    """
+
+    def __init__(self, frames: Optional[Dict[str, pd.DataFrame]] = None, backend: Optional[str] = None,
+                 loaders: Optional[Dict[str, Callable[[], pd.DataFrame]]] = None):
+        """
+        Args:
+            frames: {table name: DataFrame} to register
+            backend: "duckdb" or "pandas"; default duckdb when it is installed
+            loaders: {table name: function returning the DataFrame}, registered on first use
+        """
+        duckdb = _import_duckdb() if backend in (None, "duckdb") else None
+        backend = backend or ("duckdb" if duckdb is not None else "pandas")
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown query backend {backend!r}, expected one of {BACKENDS}")
+        if backend == "duckdb" and duckdb is None:
+            raise ImportError("The duckdb backend needs the duckdb package (pip install duckdb)")
+        self.backend = backend
+        self.tables = {}
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._loaders = dict(loaders or {})
+        self._con = duckdb.connect() if backend == "duckdb" else None
+        for name, df in (frames or {}).items():
+            self.register(name, df)
+
+    def register(self, name: str, df: pd.DataFrame):
+        """Add or replace table name."""
+        with self._lock:
+            self.tables[name] = df
+            if self._con is not None:
+                self._con.register(name, _columnar(df))
+
+    @property
+    def table_names(self) -> List[str]:
+        return sorted(set(self.tables) | set(self._loaders))
+
+    def columns(self, table: str) -> List[str]:
+        return list(self._table(table).columns)
+
+    def select(self, table: str, where: Optional[dict] = None,
+               columns: Optional[Sequence[str]] = None, order_by: Optional[Sequence[str]] = None,
+               limit: Optional[int] = None) -> pd.DataFrame:
+        """
+        Rows of table matching where.
+
+        Args:
+            columns: Columns to return (default: all)
+            order_by: Columns to sort by, ascending
+            limit: Maximum number of rows
+        """
+        df = self._table(table)
+        if self._con is None:
+            result = filter_rows(df, where)
+            if columns is not None:
+                result = result[list(columns)]
+            if order_by:
+                result = result.sort_values(list(order_by), kind="stable")
+            if limit is not None:
+                result = result.head(limit)
+            return result.reset_index(drop=True)
+
+        select_list = ", ".join(_quote(col) for col in columns) if columns is not None else "*"
+        where_sql, params = self._where_sql(where)
+        sql = f"SELECT {select_list} FROM {_quote(table)}{where_sql}"
+        if order_by:
+            sql += " ORDER BY " + ", ".join(_quote(col) for col in order_by)
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        return self._execute(sql, params)
+
+    def aggregate(self, table: str, by: Sequence[GroupKey], metrics: Dict[str, Metric],
+                  where: Optional[dict] = None) -> pd.DataFrame:
+        """
+        Group the matching rows of table and aggregate them.
+
+        Args:
+            by: Group-by columns or TimeBuckets; rows with a missing key are dropped
+            metrics: {output column: (column, aggregate)}, aggregate one of AGGREGATES
+
+        Returns:
+            One row per group, sorted by the group keys
+        """
+        for column, func in metrics.values():
+            if func not in AGGREGATES:
+                raise ValueError(f"Unknown aggregate {func!r}, expected one of {list(AGGREGATES)}")
+        df = self._table(table)
+        key_names = [_key_name(key) for key in by]
+
+        if self._con is None:
+            df = filter_rows(df, where)
+            keys = {}
+            for key in by:
+                if isinstance(key, TimeBucket):
+                    keys[key.name] = (
+                        pd.to_datetime(df[key.column], errors="coerce")
+                        .dt.to_period(TIME_UNITS[key.unit]).dt.start_time
+                    )
+                else:
+                    keys[key] = df[key]
+            grouped = df.assign(**keys).groupby(key_names, sort=True)
+            return grouped.agg(**{
+                out: (column, AGGREGATES[func][0]) for out, (column, func) in metrics.items()
+            }).reset_index()
+
+        key_sql = []
+        for key in by:
+            if isinstance(key, TimeBucket):
+                key_sql.append(f"date_trunc('{key.unit}', {_quote(key.column)})")
+            else:
+                key_sql.append(_quote(key))
+        select_list = [f"{sql} AS {_quote(name)}" for sql, name in zip(key_sql, key_names)]
+        select_list += [
+            AGGREGATES[func][1].format(col=_quote(column)) + f" AS {_quote(out)}"
+            for out, (column, func) in metrics.items()
+        ]
+        where_sql, params = self._where_sql(where, extra=[f"{sql} IS NOT NULL" for sql in key_sql])
+        positions = ", ".join(str(i + 1) for i in range(len(key_sql)))
+        sql = (f"SELECT {', '.join(select_list)} FROM {_quote(table)}{where_sql}"
+               f" GROUP BY {positions} ORDER BY {positions}")
+        return self._execute(sql, params)
+
+    def distinct(self, table: str, column: str, where: Optional[dict] = None) -> list:
+        """Sorted non-missing values of column among the matching rows (e.g. filter options)."""
+        df = self._table(table)
+        if self._con is None:
+            return sorted(filter_rows(df, where)[column].dropna().unique().tolist())
+        where_sql, params = self._where_sql(where, extra=[f"{_quote(column)} IS NOT NULL"])
+        result = self._execute(f"SELECT DISTINCT {_quote(column)} FROM {_quote(table)}{where_sql}", params)
+        return sorted(result[column].tolist())
+
+    def _table(self, table):
+        if table not in self.tables and table in self._loaders:
+            with self._load_lock:
+                if table not in self.tables:
+                    self.register(table, self._loaders[table]())
+        try:
+            return self.tables[table]
+        except KeyError:
+            raise KeyError(f"Table {table!r} is not registered") from None
+
+    def _execute(self, sql, params):
+        with timer("query.duckdb", kind="query") as t:
+            with self._lock:
+                result = self._con.execute(sql, params).df()
+            t.rows = len(result)
+        return result
+
+    @staticmethod
+    def _where_sql(where, extra=()):
+        """(' WHERE ...', params) for where plus extra SQL conditions."""
+        conditions, params = list(extra), []
+        for column, value in (where or {}).items():
+            if value is None:
+                continue
+            col = _quote(column)
+            if isinstance(value, Between):
+                if value.low is not None:
+                    conditions.append(f"{col} >= ?")
+                    params.append(_param(value.low))
+                if value.high is not None:
+                    conditions.append(f"{col} <= ?")
+                    params.append(_param(value.high))
+            elif isinstance(value, (list, tuple, set)):
+                if not value:
+                    conditions.append("FALSE")
+                    continue
+                conditions.append(f"{col} IN ({', '.join(['?'] * len(value))})")
+                params.extend(_param(v) for v in value)
+            else:
+                conditions.append(f"{col} = ?")
+                params.append(_param(value))
+        return (" WHERE " + " AND ".join(conditions) if conditions else ""), params
+
+def build_query_engine(backend=None):
+    """Engine over the file datasets (availability, po, dapot, site_master), each loaded on first query."""
+    return QueryEngine(backend=backend, loaders={
+        "availability": load_availability_data,
+        "po": load_cdc_po_data,
+        "dapot": load_dapot_alpro_data,
+        "site_master": load_site_master,
+    })
+
+@st.cache_resource(show_spinner="Preparing query engine...", max_entries=2)
+def _cached_query_engine(version):
+    return build_query_engine()
+
+def get_query_engine():
+    """Query engine shared by all sessions, rebuilt when a data file changes."""
+    return _cached_query_engine(
+        dataset_version(AVAILABILITY_PATH, CDC_PO_PATH, DAPOT_PATH, SITE_MASTER_PATH)
+    )
@@ -0,0 +1,157 @@
+# --- utils/report_batch.py ---
+"""
+Headless monthly report batch: the Availability Summary, CDC PO extract and BBM
+status workbooks for every Area and every Regional, written in parallel.
+
+The datasets are loaded once with the app's loaders (no Streamlit server needed),
+split per group, and each workbook is built and written by a worker process with
+the same table functions the pages use (utils.reports).
+
+    python -m utils.report_batch --out reports/2025-07
+    python -m utils.report_batch --out reports --refills pengisian_bbm_streamlit.csv --workers 4
+
+Output layout:
+
+    <out>/area/<Area>/availability_summary.xlsx
+    <out>/area/<Area>/cdc_po.xlsx
+    <out>/area/<Area>/bbm_status.xlsx
+    <out>/regional/<Regional>/...
+"""
+import argparse
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from utils.reports import (
+    availability_summary_pivot, bbm_status_table, cdc_po_extract,
+    write_availability_summary_excel, write_excel, BBM_STATUS_COLUMNS
+)
+
+# Group levels and the column holding the group in every report frame
+GROUP_LEVELS = {"area": "Area", "regional": "Regional"}
+
+def _build_availability_summary(df):
+    return availability_summary_pivot(df)
+
+def _build_cdc_po(df):
+    return cdc_po_extract(df)
+
+def _build_bbm_status(df):
+    df = bbm_status_table(df)
+    return df[[col for col in BBM_STATUS_COLUMNS if col in df.columns]]
+
+# {report: (file name, table builder, writer)}
+REPORTS = {
+    "availability_summary": ("availability_summary.xlsx", _build_availability_summary, write_availability_summary_excel),
+    "cdc_po": ("cdc_po.xlsx", _build_cdc_po, lambda df, path: write_excel(df, path, "Filtered Data")),
+    "bbm_status": ("bbm_status.xlsx", _build_bbm_status, lambda df, path: write_excel(df, path, "BBM Data")),
+}
+
+def safe_name(value):
+    """Group value as a directory name ('Bali Nusra' -> 'Bali_Nusra')."""
+    return re.sub(r"[^\w.-]+", "_", str(value)).strip("_") or "Unknown"
+
+def load_report_data(refill_csv=None, as_of=None):
+    """
+    Load the report datasets, each with 'Area' and 'Regional' columns to group on.
+
+    Args:
+        refill_csv: Local refill CSV; default reads the Google Sheet
+        as_of: Timestamp the BBM status is computed at (default: now)
+
+    Returns:
+        {report: DataFrame}
+    """
+    from utils.bbm_alerts import compute_bbm_status
+    from utils.data_loader import load_availability_data, load_cdc_po_data, load_bbm_refill_data, load_site_master
+
+    site_master = load_site_master()
+    area_by_site = site_master.drop_duplicates("site_id").set_index("site_id")["area"]
+
+    # PO rows only carry 'Regional TI'; the area comes from the site master
+    cdc_po = load_cdc_po_data()
+    cdc_po = cdc_po.assign(
+        Area=cdc_po["Site Id"].map(area_by_site),
+        Regional=cdc_po["Regional TI"]
+    )
+
+    status = compute_bbm_status(load_bbm_refill_data(refill_csv), now=as_of)
+    status = status.assign(Area=status["area"], Regional=status["regional"])
+
+    return {
+        "availability_summary": load_availability_data(),
+        "cdc_po": cdc_po,
+        "bbm_status": status,
+    }
+
+def plan_tasks(frames, out_dir, levels=GROUP_LEVELS):
+    """(report, output path, group rows) for every report, level and group value."""
+    tasks = []
+    for report, df in frames.items():
+        file_name = REPORTS[report][0]
+        for level, column in levels.items():
+            for value, group in df.groupby(column, sort=True):
+                path = os.path.join(out_dir, level, safe_name(value), file_name)
+                tasks.append((report, path, group))
+    return tasks
+
+def write_report(report, path, df):
+    """
+    Build and write one workbook (runs in a worker process).
+
+    Returns:
+        (path, rows written, seconds)
+    """
+    start = time.perf_counter()
+    _, build, write = REPORTS[report]
+    table = build(df)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    write(table, path)
+    return path, len(table), time.perf_counter() - start
+
+def run_batch(out_dir, workers=None, refill_csv=None, as_of=None, reports=None):
+    """
+    Generate every per-area and per-regional workbook into out_dir.
+
+    Returns:
+        List of (path, rows, seconds), one per workbook written
+    """
+    frames = load_report_data(refill_csv, as_of)
+    if reports:
+        frames = {name: df for name, df in frames.items() if name in reports}
+    tasks = plan_tasks(frames, out_dir)
+
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(write_report, *task): task[1] for task in tasks}
+        for future in as_completed(futures):
+            results.append(future.result())
+    return sorted(results)
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate the per-area and per-regional Excel reports.")
+    parser.add_argument("--out", required=True, help="Output directory")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--refills", help="Local refill CSV (default: read the Google Sheet)")
+    parser.add_argument("--as-of", help="Compute the BBM status at this date (default: now)")
+    parser.add_argument("--reports", nargs="+", choices=list(REPORTS), help="Only these reports (default: all)")
+    args = parser.parse_args()
+
+    as_of = pd.Timestamp(args.as_of) if args.as_of else None
+    start = time.perf_counter()
+    try:
+        results = run_batch(args.out, args.workers, args.refills, as_of, args.reports)
+    except Exception as e:
+        print(f"Report batch failed: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    for path, rows, seconds in results:
+        print(f"{os.path.relpath(path, args.out):<60} {rows:>7,} rows {seconds:6.2f}s")
+    print(f"{len(results)} workbooks written to {args.out} in {time.perf_counter() - start:.1f}s")
+
+if __name__ == "__main__":
+    main()
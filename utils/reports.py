@@ -0,0 +1,127 @@
+# --- utils/reports.py ---
+"""
+Report tables shared by the pages and the headless report batch
+(utils/report_batch.py). Nothing here depends on Streamlit.
+"""
+import pandas as pd
+
+MONTH_TRANSLATION = {
+    'JANUARI': 'January', 'FEBRUARI': 'February', 'MARET': 'March',
+    'APRIL': 'April', 'MEI': 'May', 'JUNI': 'June', 'JULI': 'July',
+    'AGUSTUS': 'August', 'SEPTEMBER': 'September', 'OKTOBER': 'October',
+    'NOVEMBER': 'November', 'DESEMBER': 'December'
+}
+
+# Columns of the CDC Monthly (PO) table and export
+CDC_EXPORT_COLUMNS = [
+    'No', 'Month_Year', 'Regional TI', 'Site Id', 'Site Name', 'Daya PO',
+    'Periode Tagihan (Awal)', 'Periode Tagihan (Akhir)', 'Jumlah Periode (Bulan)',
+    'Nominal PO', 'Index BBM', 'Class Site', 'Target Availability (%)', 'Avaibility',
+    'Persentase Penalty', 'Nilai Penalty', 'Nilai BAST', 'Nilai BAST dikurangi Penalty',
+    'Ava Achievement'
+]
+
+# Index columns of the availability summary pivot
+SUMMARY_INDEX_COLUMNS = ['Area', 'Regional', 'Site ID', 'Site Name', 'Target AVA']
+
+# Columns of the BBM status table and export
+BBM_STATUS_COLUMNS = [
+    "area", "regional", "site_id", "site_name", "tanggal_pengisian",
+    "jumlah_pengisian_liter", "liter_per_hari", "liter_terpakai",
+    "persentase_terpakai", "tanggal_habis", "status_bbm"
+]
+
+def add_month_year(cdc_df):
+    """Add Month_Eng, Month_Num and Month_Year ("January - 2025") and sort chronologically."""
+    month_eng = cdc_df['Month'].str.upper().map(MONTH_TRANSLATION)
+    cdc_df = cdc_df.assign(
+        Month_Eng=month_eng,
+        Month_Num=pd.to_datetime(month_eng, format='%B').dt.month,
+        Month_Year=month_eng + " - " + cdc_df['Year'].astype(str)
+    )
+    return cdc_df.sort_values(by=['Year', 'Month_Num'])
+
+def cdc_po_extract(cdc_df):
+    """CDC PO rows in the column layout of the CDC Monthly Summary export."""
+    cdc_df = add_month_year(cdc_df)
+    return cdc_df[[col for col in CDC_EXPORT_COLUMNS if col in cdc_df.columns]]
+
+def _format_month_columns(columns):
+    """Format pivot columns as 'Apr-25' etc."""
+    formatted_columns = []
+    for col in columns:
+        try:
+            if isinstance(col, (str, pd.Timestamp)):
+                formatted_columns.append(pd.to_datetime(col).to_period('M').strftime('%b-%y'))
+            elif isinstance(col, pd.Period):
+                formatted_columns.append(col.strftime('%b-%y'))
+            else:
+                formatted_columns.append(str(col))
+        except Exception:
+            formatted_columns.append(str(col))
+    return formatted_columns
+
+def availability_summary_pivot(melted_df):
+    """
+    Monthly average availability per site (the INAP summary).
+
+    Returns:
+        One row per site with No, the SUMMARY_INDEX_COLUMNS and one column per month ('Jan-25', ...)
+    """
+    df = melted_df.assign(Month_Year=pd.to_datetime(melted_df['Date'], errors='coerce').dt.to_period('M'))
+
+    monthly_summary = df.groupby(SUMMARY_INDEX_COLUMNS + ['Month_Year']).agg(
+        avg_availability=('Availability', 'mean')
+    ).reset_index()
+    return pivot_monthly_summary(monthly_summary)
+
+def pivot_monthly_summary(monthly_summary):
+    """
+    Pivot monthly averages (SUMMARY_INDEX_COLUMNS, Month_Year, avg_availability) into
+    the summary layout of availability_summary_pivot.
+    """
+    pivot = monthly_summary.pivot_table(
+        index=SUMMARY_INDEX_COLUMNS,
+        columns='Month_Year',
+        values='avg_availability'
+    ).reset_index()
+
+    pivot = pivot.round(2)
+    pivot.columns = _format_month_columns(pivot.columns)
+    pivot.reset_index(drop=True, inplace=True)
+    pivot.insert(0, 'No', range(1, len(pivot) + 1))
+    return pivot
+
+def bbm_status_table(status_df):
+    """
+    BBM status rows for display and export (see compute_bbm_status), with the
+    usage as a percentage string and dates without time.
+    """
+    return status_df.assign(
+        persentase_terpakai=status_df["persentase_float"].apply(
+            lambda x: f"{x:.2%}" if pd.notnull(x) else "-"
+        ),
+        tanggal_pengisian=status_df["tanggal_pengisian"].dt.date,
+        tanggal_habis=status_df["tanggal_habis"].dt.date
+    )
+
+def write_excel(df, target, sheet_name):
+    """Write df to target (path or buffer) as a single-sheet workbook."""
+    with pd.ExcelWriter(target, engine="xlsxwriter") as writer:
+        df.to_excel(writer, index=False, sheet_name=sheet_name)
+
+def write_availability_summary_excel(pivot, target):
+    """Write the availability summary pivot with two decimals on the month columns."""
+    with pd.ExcelWriter(target, engine='xlsxwriter') as writer:
+        pivot.to_excel(writer, index=False, sheet_name='Summary')
+
+        workbook  = writer.book
+        worksheet = writer.sheets['Summary']
+
+        # Define format for two decimal places
+        two_dec_format = workbook.add_format({'num_format': '0.00'})
+
+        # Apply format to data columns (starting from 6th column = index 5)
+        for col_num, value in enumerate(pivot.columns.values):
+            if col_num >= 5:  # skip Area, Regional, Site ID, Site Name, Target AVA
+                worksheet.set_column(col_num, col_num, 12, two_dec_format)
@@ -0,0 +1,111 @@
+# --- utils/schema.py ---
+"""
+Declarative cleanup of the loaded datasets.
+
+Every dataset has a spec that its loader applies once, right after reading, so
+the cached frame the pages receive is already clean and typed and no page
+repeats the string processing on a rerun. A spec is a dict of these steps,
+applied in this order (all optional, columns missing from the frame are skipped):
+
+    columns      "strip", "upper" or "lower": applied to every column name (always stripped)
+    text         {column: case}: strip the text, then "lower", "upper", "title" or None
+                 to keep the case. Missing values stay missing.
+    values       {column: {value after the text step: canonical value}}
+    coordinates  [columns]: drop quotes and spaces (e.g. "'-6.2"), parse as numbers
+    dtypes       {column: "numeric" or "datetime"}: unparseable values become missing
+    rename       {old name: new name}
+
+    dapot_df = normalize(dapot_df, DAPOT_SCHEMA)
+"""
+import pandas as pd
+
+AVAILABILITY_SCHEMA = {
+    "text": {"Site ID": None},
+}
+
+PO_SCHEMA = {
+    "text": {"Site Id": None, "Class Site": "title"},
+}
+
+DAPOT_SCHEMA = {
+    "text": {"Site ID": None, "On Service / Cut OFF": "lower", "Site Class": "title"},
+    "values": {"On Service / Cut OFF": {"on service": "On Service", "cut off": "Cut Off", "idle": "Cut Off"}},
+    "rename": {"On Service / Cut OFF": "STATUS"},
+}
+
+# Dapot page layout of the Dapot data (load_dapot_df)
+DAPOT_PAGE_SCHEMA = {
+    "columns": "upper",
+    "coordinates": ["LATTITUDE", "LONGITUDE"],
+}
+
+REFILL_SCHEMA = {
+    "text": {"site_id": None},
+    "dtypes": {"tanggal_pengisian": "datetime", "jumlah_pengisian_liter": "numeric"},
+}
+
+SITE_MASTER_SCHEMA = {
+    "text": {"site_id": None},
+}
+
+COLUMN_CASES = {"strip": str.strip, "upper": str.upper, "lower": str.lower}
+
+def clean_text(values, case=None, mapping=None):
+    """
+    Stripped (and re-cased, then mapped) text of a column.
+
+    Args:
+        values: Series; non-text values are converted with str()
+        case: "lower", "upper", "title" or None
+        mapping: {cleaned value: canonical value}, other values are kept
+
+    Returns:
+        Series of str with the same index, missing values left missing
+    """
+    text = values.astype("str").where(values.notna()).str.strip()
+    if case:
+        text = getattr(text.str, case)()
+    if mapping:
+        text = text.replace(mapping)
+    return text
+
+def parse_coordinates(values):
+    """Numeric coordinates from text such as "'-6.2143" (numeric columns are returned as they are)."""
+    if pd.api.types.is_numeric_dtype(values):
+        return values
+    text = values.astype("str").str.replace("'", "", regex=False).str.strip()
+    return pd.to_numeric(text, errors="coerce")
+
+PARSERS = {
+    "numeric": lambda values: pd.to_numeric(values, errors="coerce"),
+    "datetime": lambda values: pd.to_datetime(values, errors="coerce"),
+}
+
+def normalize(df, spec):
+    """
+    Apply a dataset spec (see the module docstring) to df.
+
+    Returns:
+        New DataFrame; df itself is not modified
+    """
+    if "columns" in spec:
+        case = COLUMN_CASES[spec["columns"]]
+        df = df.rename(columns=lambda col: case(str(col).strip()))
+
+    values = spec.get("values", {})
+    cleaned = {}
+    for col in dict.fromkeys([*spec.get("text", {}), *values]):
+        if col in df.columns:
+            cleaned[col] = clean_text(df[col], spec.get("text", {}).get(col), values.get(col))
+    for col in spec.get("coordinates", []):
+        if col in df.columns:
+            cleaned[col] = parse_coordinates(df[col])
+    for col, dtype in spec.get("dtypes", {}).items():
+        if col in df.columns:
+            cleaned[col] = PARSERS[dtype](cleaned.get(col, df[col]))
+    if cleaned:
+        df = df.assign(**cleaned)
+
+    if "rename" in spec:
+        df = df.rename(columns=spec["rename"])
+    return df
@@ -4,12 +4,16 @@ import base64
 import json
 import streamlit as st
 import pandas as pd
-import gspread
-from google.oauth2.service_account import Credentials
+from utils.perf import instrument
 
 # Use @st.cache_resource so we don't re-authenticate every time
 @st.cache_resource
+@instrument("api.sheets.auth", kind="api")
 def get_gspread_client():
+    # gspread and google-auth are imported here so pages that never touch Sheets don't pay for them
+    import gspread
+    from google.oauth2.service_account import Credentials
+
     # Decode base64 string from Streamlit secrets
     base64_creds = st.secrets["GOOGLE_DRIVE_CREDS"]
     json_str = base64.b64decode(base64_creds).decode("utf-8")
@@ -24,6 +28,7 @@ def get_gspread_client():
     )
     return gspread.authorize(credentials)
 
+@instrument("api.sheets.append", kind="api")
 def append_row_to_sheet(sheet_id, worksheet_name, row_data):
     client = get_gspread_client()
     sh = client.open_by_key(sheet_id)
@@ -36,6 +41,7 @@ def append_row_to_sheet(sheet_id, worksheet_name, row_data):
 
     worksheet.append_row(row_data, value_input_option="USER_ENTERED")
 
+@instrument("api.sheets.read", kind="api")
 def read_sheet_as_dataframe(sheet_id: str, worksheet_name: str) -> pd.DataFrame:
     client = get_gspread_client()
     sheet = client.open_by_key(sheet_id)
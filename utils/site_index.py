@@ -0,0 +1,97 @@
+# --- utils/site_index.py ---
+
+import pandas as pd
+import streamlit as st
+
+from utils.data_loader import (
+    load_availability_data, load_cdc_po_data, load_dapot_alpro_data, load_bbm_data, load_site_master,
+    dataset_version, AVAILABILITY_PATH, CDC_PO_PATH, DAPOT_PATH, SITE_MASTER_PATH
+)
+
+# Site key column of every dataset in the join index
+SITE_KEY_COLUMNS = {
+    "availability": "Site ID",
+    "po": "Site Id",
+    "dapot": "Site ID",
+    "refills": "site_id",
+    "site_master": "site_id",
+}
+
+def normalize_site_key(values):
+    """Normalized site key: stripped, upper-cased string. Missing values stay missing."""
+    return pd.Series(values, copy=False).astype("string").str.strip().str.upper()
+
+class SiteJoinIndex:
+    """
+    Row positions of every site in every dataset, keyed by the normalized site key.
+
+    Built once; lookup() then returns a site's rows with a dictionary lookup and an
+    iloc take instead of a boolean filter over the full frame.
+    """
+
+    def __init__(self, frames):
+        """
+        Args:
+            frames: {dataset name: DataFrame}. The key column of each dataset is
+                taken from SITE_KEY_COLUMNS.
+        """
+        self.frames = {}
+        self._positions = {}
+        for name, df in frames.items():
+            key_col = SITE_KEY_COLUMNS[name]
+            if df is None or df.empty or key_col not in df.columns:
+                continue
+            keys = normalize_site_key(df[key_col]).reset_index(drop=True)
+            self.frames[name] = df
+            self._positions[name] = keys.groupby(keys, dropna=True).indices
+
+    @property
+    def site_keys(self):
+        """Sorted keys of all sites found in any dataset."""
+        return sorted(set().union(*(positions.keys() for positions in self._positions.values())))
+
+    def datasets_for(self, site_key):
+        return [name for name, positions in self._positions.items() if site_key in positions]
+
+    def lookup(self, dataset, site_key):
+        """Rows of dataset for site_key (empty frame when the site or dataset is missing)."""
+        df = self.frames.get(dataset)
+        if df is None:
+            return pd.DataFrame()
+        positions = self._positions[dataset].get(normalize_site_key([site_key]).iloc[0])
+        if positions is None:
+            return df.iloc[0:0]
+        return df.iloc[positions]
+
+def build_site_join_index(include_refills=True):
+    """Load every dataset and build the join index over them."""
+    frames = {
+        "po": load_cdc_po_data(),
+        "dapot": load_dapot_alpro_data(),
+        "site_master": load_site_master(),
+    }
+    # The other datasets are still joined when the availability workbook cannot be read
+    try:
+        frames["availability"] = load_availability_data()
+    except RuntimeError:
+        pass
+    if include_refills:
+        try:
+            frames["refills"] = load_bbm_data()
+        except Exception:
+            frames["refills"] = pd.DataFrame()
+    return SiteJoinIndex(frames)
+
+@st.cache_resource(show_spinner="Building site index...", max_entries=2)
+def _cached_site_join_index(version):
+    return build_site_join_index()
+
+def get_site_join_index():
+    """Join index shared by all sessions, rebuilt when a data file changes."""
+    return _cached_site_join_index(
+        dataset_version(AVAILABILITY_PATH, CDC_PO_PATH, DAPOT_PATH, SITE_MASTER_PATH)
+    )
+
+def clear_site_join_index():
+    """Drop the cached index, e.g. after a new BBM refill was saved."""
+    _cached_site_join_index.clear()
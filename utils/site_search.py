@@ -0,0 +1,190 @@
+# --- utils/site_search.py ---
+import bisect
+import re
+from collections import Counter
+from difflib import SequenceMatcher
+
+import pandas as pd
+import streamlit as st
+
+from utils.data_loader import (
+    load_availability_data, load_cdc_po_data, load_dapot_alpro_data, load_site_master, dataset_version,
+    AVAILABILITY_PATH, CDC_PO_PATH, DAPOT_PATH, SITE_MASTER_PATH
+)
+
+# (source name, site id column, site name column) for every dataset that is indexed
+SEARCH_SOURCES = [
+    ("Availability", "Site ID", "Site Name"),
+    ("PO", "Site Id", "Site Name"),
+    ("Dapot", "Site ID", "Site Name"),
+    ("Site Master", "site_id", "site_name"),
+]
+
+MAX_CANDIDATES = 50
+MAX_PREFIX_CANDIDATES = 200
+
+def _trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class SiteSearchIndex:
+    """
+    Search index over site IDs and site names.
+
+    Built once from all datasets. A sorted token list answers prefix lookups and a
+    trigram index finds fuzzy candidates; only those candidates are ranked with
+    difflib, so a query never scans the DataFrames.
+    """
+
+    def __init__(self, records):
+        """
+        Args:
+            records: Iterable of (site_id, site_name, source) tuples. The same site
+                may appear several times with different names or sources.
+        """
+        sites = {}
+        for site_id, site_name, source in records:
+            if pd.isna(site_id) or not str(site_id).strip():
+                continue
+            key = str(site_id).strip().upper()
+            entry = sites.setdefault(key, {"names": [], "sources": []})
+            if pd.notna(site_name) and str(site_name).strip() and str(site_name).strip() not in entry["names"]:
+                entry["names"].append(str(site_name).strip())
+            if source not in entry["sources"]:
+                entry["sources"].append(source)
+
+        self.site_ids = list(sites)
+        self._doc_by_id = {site_id: doc for doc, site_id in enumerate(self.site_ids)}
+        self.names = [sites[key]["names"] for key in self.site_ids]
+        self.sources = [sites[key]["sources"] for key in self.site_ids]
+        self._texts = [
+            [site_id.lower()] + [name.lower() for name in names]
+            for site_id, names in zip(self.site_ids, self.names)
+        ]
+
+        tokens = []
+        trigram_postings = {}
+        for doc, texts in enumerate(self._texts):
+            doc_tokens = set()
+            for text in texts:
+                doc_tokens.add(text)
+                doc_tokens.update(re.split(r"[\s_\-./]+", text))
+            tokens.extend((token, doc) for token in doc_tokens if token)
+            for gram in set().union(*(_trigrams(text) for text in texts)):
+                trigram_postings.setdefault(gram, []).append(doc)
+
+        tokens.sort()
+        self._prefix_tokens = [token for token, _ in tokens]
+        self._prefix_docs = [doc for _, doc in tokens]
+        self._trigrams = trigram_postings
+
+    def __len__(self):
+        return len(self.site_ids)
+
+    def _prefix_matches(self, query, allowed_docs=None):
+        docs = set()
+        i = bisect.bisect_left(self._prefix_tokens, query)
+        while (i < len(self._prefix_tokens) and len(docs) < MAX_PREFIX_CANDIDATES
+               and self._prefix_tokens[i].startswith(query)):
+            if allowed_docs is None or self._prefix_docs[i] in allowed_docs:
+                docs.add(self._prefix_docs[i])
+            i += 1
+        return docs
+
+    def search(self, query, limit=10, allowed=None):
+        """
+        Rank sites against query.
+
+        Args:
+            allowed: Only rank these site keys (stripped, upper-case), e.g. a page's
+                current options; candidates are limited to them before they are cut
+
+        Returns:
+            DataFrame with site_id, site_name, sources and score (highest first).
+        """
+        query = query.strip().lower()
+        if not query:
+            return pd.DataFrame(columns=["site_id", "site_name", "sources", "score"])
+
+        allowed_docs = None
+        if allowed is not None:
+            allowed_docs = {self._doc_by_id[key] for key in allowed if key in self._doc_by_id}
+        prefix_docs = self._prefix_matches(query, allowed_docs)
+        overlap = Counter()
+        for gram in _trigrams(query):
+            postings = self._trigrams.get(gram, ())
+            overlap.update(postings if allowed_docs is None else [doc for doc in postings if doc in allowed_docs])
+        candidates = set(doc for doc, _ in overlap.most_common(MAX_CANDIDATES)) | prefix_docs
+
+        results = []
+        for doc in candidates:
+            texts = self._texts[doc]
+            score = max(SequenceMatcher(None, query, text).ratio() for text in texts)
+            if texts[0] == query:
+                score += 2.0
+            elif texts[0].startswith(query):
+                score += 1.0
+            elif doc in prefix_docs:
+                score += 0.5
+            elif any(query in text for text in texts):
+                score += 0.25
+            results.append((score, doc))
+
+        results.sort(key=lambda item: (-item[0], self.site_ids[item[1]]))
+        return pd.DataFrame([
+            {
+                "site_id": self.site_ids[doc],
+                "site_name": self.names[doc][0] if self.names[doc] else "",
+                "sources": ", ".join(self.sources[doc]),
+                "score": round(score, 3),
+            }
+            for score, doc in results[:limit]
+        ], columns=["site_id", "site_name", "sources", "score"])
+
+def build_site_search_index(frames):
+    """
+    Build a SiteSearchIndex from {source name: DataFrame} using the column
+    names in SEARCH_SOURCES. Missing or empty frames are skipped.
+    """
+    records = []
+    for source, id_col, name_col in SEARCH_SOURCES:
+        df = frames.get(source)
+        if df is None or df.empty or id_col not in df.columns:
+            continue
+        names = df[name_col] if name_col in df.columns else pd.Series(None, index=df.index)
+        pairs = pd.DataFrame({"id": df[id_col], "name": names}).drop_duplicates()
+        records.extend((site_id, site_name, source) for site_id, site_name in pairs.itertuples(index=False))
+    return SiteSearchIndex(records)
+
+@st.cache_resource(show_spinner="Building site search index...", max_entries=2)
+def _cached_site_search_index(version):
+    frames = {
+        "PO": load_cdc_po_data(),
+        "Dapot": load_dapot_alpro_data(),
+        "Site Master": load_site_master(),
+    }
+    # The other sources are still searchable when the availability workbook cannot be read
+    try:
+        frames["Availability"] = load_availability_data()
+    except RuntimeError:
+        pass
+    return build_site_search_index(frames)
+
+def get_site_search_index():
+    """Search index over all datasets, rebuilt when any of the source files changes."""
+    return _cached_site_search_index(
+        dataset_version(AVAILABILITY_PATH, CDC_PO_PATH, DAPOT_PATH, SITE_MASTER_PATH)
+    )
+
+def filter_site_options(query, options, limit=20):
+    """
+    Narrow a list of site ID options to the best matches for query, best first.
+    Returns options unchanged when query is empty.
+    """
+    if not query or not query.strip():
+        return list(options)
+
+    by_key = {str(option).strip().upper(): option for option in options}
+    matches = get_site_search_index().search(query, limit=limit, allowed=by_key)
+    ranked = [by_key[site_id] for site_id in matches["site_id"] if site_id in by_key]
+    return ranked[:limit]
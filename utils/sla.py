@@ -0,0 +1,163 @@
+# --- utils/sla.py ---
+"""
+Rolling SLA compliance over the daily availability data.
+
+The melted availability rows are laid out once as a sites x days matrix. Trailing
+window averages and breach-day counts for every site and every day then come from
+cumulative sums along the day axis: the window ending on day t is
+cumsum[t] - cumsum[t - window], so the cost does not grow with the window size and
+is one pass over the matrix however long the history gets.
+"""
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils.data_loader import load_availability_data, dataset_version, AVAILABILITY_PATH
+from utils.perf import instrument
+
+WINDOWS = (7, 30)
+# The window that decides the SLA status; the shorter one only raises an early warning
+SLA_WINDOW = 30
+
+SLA_BREACH, SLA_AT_RISK, SLA_OK, SLA_NO_DATA = "🔴 Breach", "🟠 At Risk", "🟢 OK", "⚪ No Data"
+
+# Site attributes carried into the per-site results
+SITE_COLUMNS = ["Site ID", "Site Name", "Area", "Regional", "Site Class", "Target AVA"]
+
+def _window_sum(cumsum, window):
+    """Trailing window sums along axis 1 from a cumulative sum (window shorter at the start)."""
+    result = cumsum.copy()
+    result[:, window:] -= cumsum[:, :-window]
+    return result
+
+class SLAEngine:
+    """
+    Trailing availability, breach days and breach start dates for every site and day.
+
+    Days without a value are left out of the averages (not counted as 0% or 100%).
+    A breach day is a day whose availability is below the site's Target AVA.
+    """
+
+    def __init__(self, melted_df, windows=WINDOWS):
+        """
+        Args:
+            melted_df: One row per site and date (see load_availability_data)
+            windows: Trailing window lengths in days
+        """
+        self.windows = tuple(windows)
+        df = melted_df.dropna(subset=["Site ID", "Date"])
+
+        site_codes, site_ids = pd.factorize(df["Site ID"], sort=True)
+        self.sites = (
+            df[[col for col in SITE_COLUMNS if col in df.columns]]
+            .drop_duplicates("Site ID")
+            .set_index("Site ID")
+            .reindex(pd.Index(site_ids, name="Site ID"))
+            .reset_index()
+        )
+
+        dates = pd.to_datetime(df["Date"]).dt.normalize()
+        start = dates.min() if len(dates) else pd.Timestamp.today().normalize()
+        day_codes = (dates - start).dt.days.to_numpy()
+        n_days = int(day_codes.max()) + 1 if len(day_codes) else 0
+        self.dates = pd.date_range(start, periods=n_days, freq="D")
+
+        values = np.full((len(site_ids), n_days), np.nan)
+        values[site_codes, day_codes] = pd.to_numeric(df["Availability"], errors="coerce").to_numpy(dtype="float64")
+        self.daily = values
+
+        target = pd.to_numeric(self.sites["Target AVA"], errors="coerce").to_numpy(dtype="float64")
+        self.target = target
+
+        has_value = ~np.isnan(values)
+        breach = has_value & (values < target[:, None])
+
+        value_cumsum = np.cumsum(np.where(has_value, values, 0.0), axis=1)
+        count_cumsum = np.cumsum(has_value, axis=1, dtype=np.int32)
+        breach_cumsum = np.cumsum(breach, axis=1, dtype=np.int32)
+
+        self.rolling = {}
+        self.breach_days = {}
+        with np.errstate(invalid="ignore", divide="ignore"):
+            for window in self.windows:
+                counts = _window_sum(count_cumsum, window)
+                # float32 / int16 keep years of history for thousands of sites small
+                self.rolling[window] = np.where(
+                    counts > 0, _window_sum(value_cumsum, window) / counts, np.nan
+                ).astype(np.float32)
+                self.breach_days[window] = _window_sum(breach_cumsum, window).astype(np.int16)
+        self.breach_days_total = breach_cumsum
+
+        # Index of the first day of the current run of trailing-SLA_WINDOW averages below
+        # target: the day after the last compliant (or empty) day, per site and day
+        below = self.rolling[SLA_WINDOW] < target[:, None]
+        day_index = np.arange(n_days)
+        last_ok = np.maximum.accumulate(np.where(below, -1, day_index).astype(np.int32), axis=1)
+        self._below_since = np.where(below, last_ok + 1, -1).astype(np.int32)
+
+    def day_index(self, as_of=None):
+        """Column of as_of (default: the last day), clipped to the data range."""
+        if not len(self.dates):
+            raise ValueError("No availability data")
+        if as_of is None:
+            return len(self.dates) - 1
+        index = (pd.Timestamp(as_of).normalize() - self.dates[0]).days
+        return int(min(max(index, 0), len(self.dates) - 1))
+
+    def snapshot(self, as_of=None):
+        """
+        SLA status of every site on as_of.
+
+        Returns:
+            One row per site: SITE_COLUMNS, Availability (that day), Avail 7D, Avail 30D,
+            Breach Days 7D, Breach Days 30D, Breach Days Total, Below Target Since and
+            SLA Status, sorted with the worst trailing availability first.
+        """
+        t = self.day_index(as_of)
+        result = self.sites.copy()
+        result["Availability"] = self.daily[:, t]
+        for window in self.windows:
+            result[f"Avail {window}D"] = self.rolling[window][:, t]
+        for window in self.windows:
+            result[f"Breach Days {window}D"] = self.breach_days[window][:, t]
+        result["Breach Days Total"] = self.breach_days_total[:, t]
+
+        since = self._below_since[:, t]
+        result["Below Target Since"] = pd.Series(self.dates[np.maximum(since, 0)]).where(since >= 0).dt.date
+
+        short_window = min(self.windows)
+        sla_avail = result[f"Avail {SLA_WINDOW}D"]
+        result["SLA Status"] = np.select(
+            [
+                sla_avail.isna(),
+                sla_avail < self.target,
+                result[f"Avail {short_window}D"] < self.target,
+            ],
+            [SLA_NO_DATA, SLA_BREACH, SLA_AT_RISK],
+            default=SLA_OK,
+        )
+        return result.sort_values(f"Avail {SLA_WINDOW}D", na_position="last", kind="stable").reset_index(drop=True)
+
+    def site_history(self, site_id):
+        """Daily availability, trailing averages and target of one site (empty when unknown)."""
+        positions = np.flatnonzero(self.sites["Site ID"].to_numpy() == site_id)
+        if not len(positions):
+            return pd.DataFrame()
+        row = positions[0]
+        history = pd.DataFrame({"Date": self.dates, "Availability": self.daily[row]})
+        for window in self.windows:
+            history[f"Avail {window}D"] = self.rolling[window][row]
+        history["Target AVA"] = self.target[row]
+        return history
+
+@instrument("compute.sla_engine", kind="compute")
+def build_sla_engine():
+    return SLAEngine(load_availability_data())
+
+@st.cache_resource(show_spinner="Computing SLA compliance...", max_entries=2)
+def _cached_sla_engine(version):
+    return build_sla_engine()
+
+def get_sla_engine():
+    """SLA engine shared by all sessions, recomputed when the availability file changes."""
+    return _cached_sla_engine(dataset_version(AVAILABILITY_PATH))
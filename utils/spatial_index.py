@@ -0,0 +1,146 @@
+# --- utils/spatial_index.py ---
+import numpy as np
+import pandas as pd
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = 111.195
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance in km, vectorized over numpy arrays."""
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+class SiteSpatialIndex:
+    """
+    Grid index over site coordinates.
+
+    Sites are bucketed into square lat/lon cells of cell_deg degrees once at build
+    time. Nearest-site, radius and bounding-box queries then only compute
+    distances for sites in the cells around the query point.
+    """
+
+    def __init__(self, df, lat_col="LATTITUDE", lon_col="LONGITUDE", id_col="SITE ID", cell_deg=0.5):
+        valid = df[lat_col].notna() & df[lon_col].notna()
+        self.sites = df.loc[valid].reset_index(drop=True)
+        self.lat = self.sites[lat_col].to_numpy(dtype="float64")
+        self.lon = self.sites[lon_col].to_numpy(dtype="float64")
+        self.ids = self.sites[id_col].to_numpy()
+        self.id_col = id_col
+        self.cell_deg = cell_deg
+
+        # Smallest cell width in km over the indexed latitudes, used to bound ring searches
+        max_abs_lat = np.abs(self.lat).max() if len(self.lat) else 0.0
+        self._min_cell_km = cell_deg * KM_PER_DEGREE * np.cos(np.radians(min(max_abs_lat + cell_deg, 89.0)))
+
+        # Group row positions by cell
+        cell_y = np.floor(self.lat / cell_deg).astype(np.int64)
+        cell_x = np.floor(self.lon / cell_deg).astype(np.int64)
+        order = np.lexsort((cell_x, cell_y))
+        keys = np.stack([cell_y[order], cell_x[order]], axis=1)
+        boundaries = np.flatnonzero(np.any(np.diff(keys, axis=0) != 0, axis=1)) + 1
+        self._cells = {
+            (int(chunk_keys[0][0]), int(chunk_keys[0][1])): chunk
+            for chunk_keys, chunk in zip(np.split(keys, boundaries), np.split(order, boundaries))
+            if len(chunk)
+        }
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _cell_of(self, lat, lon):
+        return int(np.floor(lat / self.cell_deg)), int(np.floor(lon / self.cell_deg))
+
+    def _candidates(self, y_range, x_range):
+        chunks = [
+            self._cells[(y, x)]
+            for y in y_range
+            for x in x_range
+            if (y, x) in self._cells
+        ]
+        return np.concatenate(chunks) if chunks else np.empty(0, dtype=np.int64)
+
+    def _ring(self, cy, cx, r):
+        if r == 0:
+            return self._candidates([cy], [cx])
+        ring = [self._candidates([cy - r, cy + r], range(cx - r, cx + r + 1)),
+                self._candidates(range(cy - r + 1, cy + r), [cx - r, cx + r])]
+        return np.concatenate(ring)
+
+    def _result(self, positions, distances):
+        order = np.argsort(distances, kind="stable")
+        result = self.sites.iloc[positions[order]].copy()
+        result.insert(0, "distance_km", distances[order])
+        return result
+
+    def nearest(self, lat, lon, k=5):
+        """The k closest sites to (lat, lon), sorted by distance_km."""
+        k = min(k, len(self))
+        if k <= 0:
+            return self._result(np.empty(0, dtype=np.int64), np.empty(0))
+
+        cy, cx = self._cell_of(lat, lon)
+        max_ring = int(np.ceil(180 / self.cell_deg))
+        found = []
+        for r in range(max_ring + 1):
+            found.append(self._ring(cy, cx, r))
+            positions = np.concatenate(found)
+            if len(positions) >= k:
+                distances = haversine_km(lat, lon, self.lat[positions], self.lon[positions])
+                kth = np.partition(distances, k - 1)[k - 1]
+                # Anything outside ring r is at least r cells away
+                if kth <= r * self._min_cell_km:
+                    break
+        positions = np.concatenate(found)
+        distances = haversine_km(lat, lon, self.lat[positions], self.lon[positions])
+        top = np.argsort(distances, kind="stable")[:k]
+        return self._result(positions[top], distances[top])
+
+    def within_radius(self, lat, lon, radius_km):
+        """All sites within radius_km of (lat, lon), sorted by distance_km."""
+        lat_span = radius_km / KM_PER_DEGREE
+        lon_span = radius_km / (KM_PER_DEGREE * max(np.cos(np.radians(min(abs(lat) + lat_span, 89.0))), 1e-6))
+        positions = self._bbox_positions(lat - lat_span, lon - lon_span, lat + lat_span, lon + lon_span)
+        distances = haversine_km(lat, lon, self.lat[positions], self.lon[positions])
+        keep = distances <= radius_km
+        return self._result(positions[keep], distances[keep])
+
+    def _bbox_positions(self, min_lat, min_lon, max_lat, max_lon):
+        y0, x0 = self._cell_of(min_lat, min_lon)
+        y1, x1 = self._cell_of(max_lat, max_lon)
+        positions = self._candidates(range(y0, y1 + 1), range(x0, x1 + 1))
+        inside = (
+            (self.lat[positions] >= min_lat) & (self.lat[positions] <= max_lat)
+            & (self.lon[positions] >= min_lon) & (self.lon[positions] <= max_lon)
+        )
+        return positions[inside]
+
+    def within_bbox(self, min_lat, min_lon, max_lat, max_lon):
+        """All sites inside the bounding box, in index order."""
+        return self.sites.iloc[np.sort(self._bbox_positions(min_lat, min_lon, max_lat, max_lon))]
+
+    def clusters(self, zoom, cells_per_tile=8):
+        """
+        Server-side marker clustering for a web-map zoom level.
+
+        Sites are grouped on a grid that gets finer as zoom increases
+        (360 / 2**zoom / cells_per_tile degrees). Each group becomes one marker at
+        the mean position of its sites.
+
+        Returns:
+            DataFrame with lat, lon, count and label (the site ID for single-site clusters).
+        """
+        if not len(self):
+            return pd.DataFrame(columns=["lat", "lon", "count", "label"])
+
+        size = 360.0 / (2 ** zoom) / cells_per_tile
+        keys = np.stack([np.floor(self.lat / size), np.floor(self.lon / size)], axis=1)
+        _, group, counts = np.unique(keys, axis=0, return_inverse=True, return_counts=True)
+        group = group.ravel()
+
+        lat = np.bincount(group, weights=self.lat) / counts
+        lon = np.bincount(group, weights=self.lon) / counts
+        first = np.full(len(counts), -1)
+        first[group[::-1]] = np.arange(len(group))[::-1]
+        labels = np.where(counts == 1, self.ids[first].astype(str), counts.astype(str) + " sites")
+        return pd.DataFrame({"lat": lat, "lon": lon, "count": counts, "label": labels})
@@ -0,0 +1,48 @@
+# --- utils/table_style.py ---
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+# Above this many cells tables skip pandas Styler and render with st.column_config instead
+STYLER_MAX_CELLS = 40000
+
+ACHIEVED_STYLE = 'background-color: #C4D79B; color: black'
+NOT_ACHIEVED_STYLE = 'background-color: #FFB7B7; color: black'
+
+# st.column_config formats of the CDC PO columns (CDC Monthly, penalty projection, Site 360)
+CDC_COLUMN_FORMATS = {
+    'Target Availability (%)': 'percent',
+    'Avaibility': 'percent',
+    'Persentase Penalty': 'percent',
+    'Nominal PO': 'Rp %,d',
+    'Nilai Penalty': 'Rp %,d',
+    'Nilai BAST': 'Rp %,d',
+    'Nilai BAST dikurangi Penalty': 'Rp %,d'
+}
+
+def use_styler(df, max_cells=STYLER_MAX_CELLS):
+    """True when df is small enough to render through pandas Styler."""
+    return df.size <= max_cells
+
+def availability_style_matrix(df, value_columns, target_column='Target AVA'):
+    """
+    Build the cell style matrix for Styler.apply(axis=None) in one vectorized step.
+
+    Cells in value_columns are green when they reach the row's target and red when
+    they do not. Empty cells and all other columns stay unstyled.
+    """
+    styles = np.full(df.shape, '', dtype=object)
+    if value_columns:
+        values = df[value_columns].to_numpy(dtype='float64')
+        target = df[target_column].to_numpy(dtype='float64')[:, None]
+        value_styles = np.where(values >= target, ACHIEVED_STYLE, NOT_ACHIEVED_STYLE)
+        value_styles[np.isnan(values)] = ''
+        styles[:, df.columns.get_indexer(value_columns)] = value_styles
+    return pd.DataFrame(styles, index=df.index, columns=df.columns)
+
+def number_column_config(formats):
+    """
+    Map {column: format} to st.column_config.NumberColumn entries.
+    Formats use the st.column_config syntax, e.g. "percent" or "Rp %,d".
+    """
+    return {col: st.column_config.NumberColumn(col, format=fmt) for col, fmt in formats.items()}